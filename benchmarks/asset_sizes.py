@@ -0,0 +1,116 @@
+"""
+Static asset size and first-paint benchmark.
+
+Compares the www pages with their CSS and JS inlined as sources (how they were
+served before the asset build) against the built pages: minified stylesheet
+inlined, script loaded deferred from its fingerprinted build in public/dist.
+Reports raw, gzip and brotli bytes, and a first-paint estimate for a first and
+a repeat visit from a simple network model: one round trip per sequential
+render-blocking request plus transfer time. The HTML is fetched on every
+visit; fingerprinted builds come from the browser cache on repeat visits and
+deferred scripts never block first paint.
+
+Needs no site; run `python -m olya_bootstrap.build_assets` first.
+    
+    python benchmarks/asset_sizes.py
+    python benchmarks/asset_sizes.py --rtt-ms 40 --kbps 10000
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from olya_bootstrap.assets import ASSETS_URL, PUBLIC_PATH, get_asset_manifest, olya_asset_url, olya_inline_asset
+from olya_bootstrap.build_assets import brotli
+
+WWW_PATH = os.path.join(os.path.dirname(PUBLIC_PATH), "www")
+PAGES = ["index.html", "whiteboard.html"]
+
+# Pages are compressed on the fly, like nginx's gzip default
+HTML_GZIP_LEVEL = 6
+
+STYLE = re.compile(r"""<style>\{\{ olya_inline_asset\('([^']+)'\) \}\}</style>""")
+SCRIPT = re.compile(r"""<script defer src="\{\{ olya_asset_url\('([^']+)'\) \}\}"></script>""")
+
+def read(path, mode="r"):
+    with open(path, mode) as f:
+        return f.read()
+
+def get_sizes(content, gzip_level=HTML_GZIP_LEVEL):
+    content = content.encode() if isinstance(content, str) else content
+    return {
+        "bytes": len(content),
+        "gzip_bytes": len(gzip.compress(content, gzip_level)),
+        "brotli_bytes": len(brotli.compress(content)) if brotli else None
+    }
+
+def get_build_sizes(path):
+    """Sizes of the fingerprinted build of a public/ asset, from the files on disk"""
+    build = os.path.join(PUBLIC_PATH, get_asset_manifest()[path])
+    return {
+        "bytes": os.path.getsize(build),
+        "gzip_bytes": os.path.getsize(f"{build}.gz"),
+        "brotli_bytes": os.path.getsize(f"{build}.br") if os.path.exists(f"{build}.br") else None
+    }
+
+def inline_sources(template):
+    """The page as it was served before the build: sources inlined into the HTML"""
+    template = STYLE.sub(lambda m: f"<style>\n{read(os.path.join(PUBLIC_PATH, m.group(1)))}</style>", template)
+    return SCRIPT.sub(lambda m: f"<script>\n{read(os.path.join(PUBLIC_PATH, m.group(1)))}</script>", template)
+
+def render_page(template):
+    template = STYLE.sub(lambda m: f"<style>{olya_inline_asset(m.group(1))}</style>", template)
+    return SCRIPT.sub(lambda m: f'<script defer src="{olya_asset_url(m.group(1))}"></script>', template)
+
+def first_paint_ms(args, requests):
+    """Sequential render-blocking requests of `bytes` each: a round trip plus transfer time apiece"""
+    return round(sum(args.rtt_ms + size * 8 / args.kbps for size in requests), 1)
+
+def measure_page(args, name):
+    template = read(os.path.join(WWW_PATH, name))
+    before = get_sizes(inline_sources(template))
+    html = get_sizes(render_page(template))
+    scripts = {path: get_build_sizes(path) for path in SCRIPT.findall(template)}
+    
+    return {
+        "before": before,
+        "after": {
+            "html": html,
+            "scripts": scripts,
+            "first_visit_gzip_bytes": html["gzip_bytes"] + sum(sizes["gzip_bytes"] for sizes in scripts.values()),
+            "repeat_visit_gzip_bytes": html["gzip_bytes"]
+        },
+        "first_paint_ms": {
+            "before": first_paint_ms(args, [before["gzip_bytes"]]),
+            "after": first_paint_ms(args, [html["gzip_bytes"]])
+        }
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt-ms", type=float, default=150, help="Round-trip time (default 150, slow 4G)")
+    parser.add_argument("--kbps", type=float, default=1600, help="Downlink in kbit/s (default 1600, slow 4G)")
+    args = parser.parse_args()
+    
+    if not get_asset_manifest():
+        sys.exit("No asset build found, run python -m olya_bootstrap.build_assets first")
+    
+    results = {
+        "network": {"rtt_ms": args.rtt_ms, "kbps": args.kbps},
+        "pages": {name: measure_page(args, name) for name in PAGES},
+        # Served on every desk and web page through app_include_css / web_include_css
+        "olya.css": {
+            "before": get_sizes(read(os.path.join(PUBLIC_PATH, "css/olya.css"))),
+            "after": get_build_sizes("css/olya.css"),
+            "url": f"{ASSETS_URL}/{get_asset_manifest()['css/olya.css']}"
+        }
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
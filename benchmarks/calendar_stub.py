@@ -0,0 +1,163 @@
+"""
+Local HTTP stub of the Google Calendar v3 events API.
+
+Supports events insert/patch/delete and Google batch requests
+(POST /batch/calendar/v3), with optional injected latency and errors so the
+dispatch layer's retries, backoff and circuit breaker can be exercised.
+
+Run it standalone (`python calendar_stub.py --port 8765 --error-rate 0.2`) and
+set `google_calendar_api_url` to http://127.0.0.1:8765/ in site config, or start
+it in-process with `start_stub_server()` from a benchmark or test.
+"""
+
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STATUS_REASONS = {200: "OK", 204: "No Content", 403: "Forbidden", 404: "Not Found",
+    429: "Too Many Requests", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class StubSettings:
+    """Fault injection knobs, shared by every request the server handles"""
+    def __init__(self, latency_ms=0, error_rate=0.0, error_status=503, fail_next=0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_next = fail_next
+        self.requests = 0
+        self.lock = threading.Lock()
+    
+    def next_error(self):
+        """Return an error status to inject for this call, or None"""
+        with self.lock:
+            self.requests += 1
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return self.error_status
+        return self.error_status if random.random() < self.error_rate else None
+
+def make_event(body, event_id=None):
+    event = json.loads(body or b"{}")
+    event["id"] = event_id or event.get("id") or secrets.token_hex(13)
+    event["conferenceData"] = {
+        "entryPoints": [{
+            "entryPointType": "video",
+            "uri": f"https://meet.google.com/{secrets.token_hex(5)}"
+        }]
+    }
+    return event
+
+def handle_call(settings, method, path, body):
+    """Answer one Calendar API call; returns (status, payload or None)"""
+    error = settings.next_error()
+    if error:
+        return error, {"error": {"code": error, "message": "Injected error"}}
+    
+    event_id = path.split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+    if method == "POST":
+        return 200, make_event(body)
+    if method in ("PATCH", "PUT"):
+        return 200, make_event(body, event_id)
+    if method == "DELETE":
+        return 204, None
+    return 404, {"error": {"code": 404, "message": "Not found"}}
+
+class CalendarStubHandler(BaseHTTPRequestHandler):
+    settings = StubSettings()
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+    
+    def send_payload(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        if body:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def handle_method(self):
+        body = self.read_body()
+        if self.settings.latency_ms:
+            time.sleep(self.settings.latency_ms / 1000)
+        
+        if self.command == "POST" and self.path.startswith("/batch"):
+            return self.handle_batch(body)
+        
+        status, payload = handle_call(self.settings, self.command, self.path, body)
+        self.send_payload(status, json.dumps(payload).encode() if payload is not None else b"")
+    
+    do_POST = do_PATCH = do_PUT = do_DELETE = handle_method
+    
+    def handle_batch(self, body):
+        """Parse a multipart/mixed batch and answer every part"""
+        content_type = self.headers.get("Content-Type", "")
+        message = BytesParser().parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        boundary = f"batch_{secrets.token_hex(8)}"
+        parts = []
+        
+        for part in message.get_payload():
+            content_id = (part.get("Content-ID") or "").strip("<>")
+            request = part.get_payload(decode=False)
+            request = request if isinstance(request, str) else request[0].as_string()
+            head, _, call_body = request.replace("\r\n", "\n").partition("\n\n")
+            method, path = head.split("\n", 1)[0].split(" ")[:2]
+            
+            status, payload = handle_call(self.settings, method, path, call_body.encode())
+            payload = json.dumps(payload) if payload is not None else ""
+            parts.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {STATUS_REASONS.get(status, 'Error')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n"
+                f"{payload}\r\n"
+            )
+        
+        response = "".join(parts) + f"--{boundary}--\r\n"
+        self.send_payload(200, response.encode(), f"multipart/mixed; boundary={boundary}")
+
+def start_stub_server(port=0, **settings):
+    """
+    Start the stub on a background thread.
+    
+    Keyword arguments (latency_ms, error_rate, error_status, fail_next) set up
+    fault injection; change them later through `server.settings`.
+    
+    Returns:
+        tuple: (server, base_url)
+    """
+    handler = type("CalendarStub", (CalendarStubHandler,), {"settings": StubSettings(**settings)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.settings = handler.settings
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+    
+    server, url = start_stub_server(args.port, latency_ms=args.latency_ms,
+        error_rate=args.error_rate, error_status=args.error_status)
+    print(f"Calendar API stub listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Calendar sync benchmark.
+
+Seeds 100k lessons, then changes a handful of one teacher's lessons and
+compares re-fetching the teacher's calendar window through
+get_lesson_calendar_data with one sync_lesson_calendar delta call.
+Payload sizes are reported as JSON bytes.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frappe
+
+import utils
+
+def main():
+    parser = utils.get_parser(__doc__)
+    parser.add_argument("--lessons", type=int, default=100_000)
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--window-days", type=int, default=90)
+    args = parser.parse_args()
+    utils.connect(args)
+    
+    if args.cleanup:
+        utils.cleanup()
+        return
+    
+    if utils.lesson_count() < args.lessons:
+        utils.seed_teachers(10)
+        utils.seed_students(1000, 10)
+        utils.seed_lessons(args.lessons, 1000, 10)
+    
+    from olya_bootstrap.api.calendar import get_lesson_calendar_data
+    from olya_bootstrap.api.sync import sync_lesson_calendar
+    
+    teacher = utils.teacher_email(0)
+    start = frappe.utils.add_days(frappe.utils.nowdate(), -args.window_days // 2)
+    end = frappe.utils.add_days(start, args.window_days)
+    
+    token = sync_lesson_calendar(teacher=teacher, start=start, end=end)["sync_token"]
+    frappe.db.sql("""
+        update `tabESL Lesson` set modified = now(6)
+        where teacher = %s and name like %s
+        limit %s
+    """, (teacher, f"{utils.BENCH_PREFIX}%", args.changes))
+    frappe.db.commit()
+    
+    def full_fetch():
+        return get_lesson_calendar_data(teacher=teacher, start=start, end=end)
+    
+    def delta_sync():
+        return sync_lesson_calendar(sync_token=token, teacher=teacher)
+    
+    results = {
+        "full_fetch": utils.measure(full_fetch, args.repeat),
+        "delta_sync": utils.measure(delta_sync, args.repeat),
+        "full_fetch_bytes": len(json.dumps(full_fetch(), default=str)),
+        "delta_sync_bytes": len(json.dumps(delta_sync(), default=str)),
+        "delta_events": len(delta_sync()["events"])
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Seeded synthetic data generator for teachers, students and lessons.
+
+Scales are 1k, 100k and 1m lessons, with students and teachers in
+proportion. The same scale and seed always produce the same rows, so results
+from different releases are comparable. Works against a bench site
+(`--site`) and against the offline SQLite stand-in used by offline.py.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frappe
+
+import utils
+
+SCALES = {
+    "1k": {"lessons": 1_000, "students": 50, "teachers": 5},
+    "100k": {"lessons": 100_000, "students": 5_000, "teachers": 200},
+    "1m": {"lessons": 1_000_000, "students": 50_000, "teachers": 2_000}
+}
+
+# Students that also get a User with the ESL Student role, for the student portal
+STUDENT_USERS = 10
+
+def generate(scale, seed=42):
+    """Seed teachers, students and lessons for `scale`; returns the row counts"""
+    counts = SCALES[scale]
+    utils.seed_teachers(counts["teachers"])
+    utils.seed_students(counts["students"], counts["teachers"])
+    seed_student_users(min(STUDENT_USERS, counts["students"]))
+    utils.seed_lessons(counts["lessons"], counts["students"], counts["teachers"], seed=seed)
+    return dict(counts)
+
+def student_email(index):
+    return f"bench-student-{index}@example.com"
+
+def seed_student_users(count):
+    """Give the first `count` seeded students a User holding the ESL Student role"""
+    now = frappe.utils.now()
+    users, roles = [], []
+    for i in range(count):
+        email = student_email(i)
+        users.append((email, email, "Bench", f"Student {i}", f"Bench Student {i}", 1, "Website User", now, now, "Administrator", "Administrator"))
+        roles.append((f"{utils.BENCH_PREFIX}SR-{i}", email, "User", "roles", "ESL Student", now, now, "Administrator", "Administrator"))
+    
+    frappe.db.bulk_insert("User",
+        ["name", "email", "first_name", "last_name", "full_name", "enabled", "user_type", "creation", "modified", "owner", "modified_by"],
+        users, ignore_duplicates=True)
+    frappe.db.bulk_insert("Has Role",
+        ["name", "parent", "parenttype", "parentfield", "role", "creation", "modified", "owner", "modified_by"],
+        roles, ignore_duplicates=True)
+    frappe.db.commit()
+
+def main():
+    parser = utils.get_parser(__doc__)
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    utils.connect(args)
+    
+    if args.cleanup:
+        utils.cleanup()
+        return
+    
+    print(json.dumps(generate(args.scale, args.seed), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Per-call overhead of Google Calendar event creation, before and after the
+client pool, measured against the local Calendar API stub.
+
+"before" rebuilds credentials and the service (discovery document included)
+on every call like create_google_meet_real used to; "after" reuses the
+worker's CalendarClientPool.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frappe
+
+import utils
+from calendar_stub import start_stub_server
+
+EVENT = {
+    "summary": "Bench Lesson",
+    "start": {"dateTime": "2030-01-01T10:00:00+00:00", "timeZone": "UTC"},
+    "end": {"dateTime": "2030-01-01T11:00:00+00:00", "timeZone": "UTC"}
+}
+
+def insert_without_pool(api_url):
+    from google.auth.credentials import AnonymousCredentials
+    from googleapiclient.discovery import build
+    
+    from olya_bootstrap.api.calendar import get_google_credentials
+    
+    get_google_credentials()
+    service = build("calendar", "v3", credentials=AnonymousCredentials(), client_options={"api_endpoint": api_url})
+    return service.events().insert(calendarId="primary", body=EVENT, conferenceDataVersion=1).execute()
+
+def insert_with_pool():
+    from olya_bootstrap.integrations.google_calendar import get_calendar_service
+    
+    service = get_calendar_service()
+    return service.events().insert(calendarId="primary", body=EVENT, conferenceDataVersion=1).execute()
+
+def main():
+    parser = utils.get_parser(__doc__)
+    args = parser.parse_args()
+    utils.connect(args)
+    
+    server, api_url = start_stub_server()
+    frappe.conf.google_calendar_api_url = api_url
+    frappe.conf.google_service_account_json = None
+    
+    try:
+        insert_with_pool()
+        results = {
+            "before": utils.measure(lambda: insert_without_pool(api_url), args.repeat * 10),
+            "after": utils.measure(insert_with_pool, args.repeat * 10)
+        }
+    finally:
+        server.shutdown()
+    
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+ICS feed benchmark.
+
+Seeds one teacher with 100k lessons and compares, over the whole history:
+- the JSON calendar endpoint (every event built in memory),
+- the streamed ICS feed (unbuffered cursor, chunked output),
+- the ETag check that answers an unchanged feed with 304.
+Peak Python memory is measured with tracemalloc.
+"""
+
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frappe
+
+import utils
+
+HEAVY_TEACHER = "bench-teacher-feed@example.com"
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def main():
+    parser = utils.get_parser(__doc__)
+    parser.add_argument("--lessons", type=int, default=100_000)
+    args = parser.parse_args()
+    utils.connect(args)
+    
+    if args.cleanup:
+        utils.cleanup()
+        return
+    
+    if frappe.db.count("ESL Lesson", {"teacher": HEAVY_TEACHER}) < args.lessons:
+        utils.seed_teachers(1)
+        utils.seed_students(500, 1)
+        utils.seed_lessons(args.lessons, 500, 1, teacher_of=HEAVY_TEACHER)
+    
+    from olya_bootstrap.api.calendar import get_calendar_events
+    from olya_bootstrap.api.feeds import get_feed_etag, get_feed_filters, iter_feed
+    
+    # Cover the whole seeded history rather than the default rolling window
+    values = get_feed_filters(HEAVY_TEACHER)
+    values["start"] = frappe.utils.add_days(values["start"], -3650)
+    values["end"] = frappe.utils.add_days(values["end"], 3650)
+    
+    def json_events():
+        return json.dumps(get_calendar_events(teacher=HEAVY_TEACHER, start=values["start"], end=values["end"]))
+    
+    def ics_stream():
+        size = 0
+        for chunk in iter_feed(frappe.local.site, frappe.local.sites_path, values):
+            size += len(chunk)
+        return size
+    
+    results = {
+        "lessons": frappe.db.count("ESL Lesson", {"teacher": HEAVY_TEACHER}),
+        "json_events": utils.measure(json_events, args.repeat),
+        "ics_stream": utils.measure(ics_stream, args.repeat),
+        "etag_only": utils.measure(lambda: get_feed_etag(values), args.repeat),
+        "json_events_peak_bytes": peak_memory(json_events),
+        "ics_stream_peak_bytes": peak_memory(ics_stream),
+        "ics_size_bytes": ics_stream()
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
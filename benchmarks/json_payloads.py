@@ -0,0 +1,72 @@
+"""
+Calendar and portal JSON payload benchmark.
+
+Seeds one teacher with lessons and compares, at 1k and 10k calendar events:
+- frappe's default serialization of the FullCalendar events (json.dumps),
+- the compact mode of get_lesson_calendar_data (orjson when installed,
+  status colours sent once), without and with gzip.
+Reports payload bytes and serialization time; the portal payload of the
+teacher is measured the same way.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frappe
+
+import utils
+
+HEAVY_TEACHER = "bench-teacher-payload@example.com"
+EVENT_COUNTS = (1_000, 10_000)
+
+def measure_payload(build, repeat):
+    """Latency of build() and the size of the bytes it returns"""
+    return {**utils.measure(build, repeat), "bytes": len(build())}
+
+def main():
+    parser = utils.get_parser(__doc__)
+    args = parser.parse_args()
+    utils.connect(args)
+    
+    if args.cleanup:
+        utils.cleanup()
+        return
+    
+    if frappe.db.count("ESL Lesson", {"teacher": HEAVY_TEACHER}) < max(EVENT_COUNTS):
+        utils.seed_teachers(1)
+        utils.seed_students(500, 1)
+        utils.seed_lessons(max(EVENT_COUNTS), 500, 1, teacher_of=HEAVY_TEACHER)
+    
+    from olya_bootstrap.api.calendar import compact_calendar_events, get_calendar_events
+    from olya_bootstrap.portal.menu import build_user_portal_data
+    from olya_bootstrap.responses import encode_compact, orjson
+    
+    def default_json(data):
+        return frappe.as_json({"message": data}, indent=None, separators=(",", ":")).encode()
+    
+    all_events = get_calendar_events(teacher=HEAVY_TEACHER)
+    results = {"serializer": "orjson" if orjson else "json"}
+    
+    for count in EVENT_COUNTS:
+        events = all_events[:count]
+        # Stripping the colours happens in place, on a copy so `events` stays intact
+        compact = compact_calendar_events([dict(event) for event in events])
+        results[f"calendar_{len(events)}_events"] = {
+            "default": measure_payload(lambda: default_json(events), args.repeat),
+            "compact": measure_payload(lambda: encode_compact(compact)[0], args.repeat),
+            "compact_gzip": measure_payload(lambda: encode_compact(compact, True)[0], args.repeat)
+        }
+    
+    portal = build_user_portal_data(HEAVY_TEACHER)
+    results["portal"] = {
+        "default": measure_payload(lambda: default_json(portal), args.repeat),
+        "compact": measure_payload(lambda: encode_compact(portal)[0], args.repeat),
+        "compact_gzip": measure_payload(lambda: encode_compact(portal, True)[0], args.repeat)
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
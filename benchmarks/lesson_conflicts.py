@@ -0,0 +1,57 @@
+"""
+Conflict detection benchmark.
+
+Seeds one teacher with thousands of lessons and times the per-save overlap
+query (get_lesson_conflicts) and a 52-lesson batch check (find_batch_conflicts).
+"""
+
+import json
+import os
+import sys
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frappe
+
+import utils
+
+HEAVY_TEACHER = "bench-teacher-heavy@example.com"
+
+def main():
+    parser = utils.get_parser(__doc__)
+    parser.add_argument("--lessons", type=int, default=5_000)
+    args = parser.parse_args()
+    utils.connect(args)
+    
+    if args.cleanup:
+        utils.cleanup()
+        return
+    
+    if frappe.db.count("ESL Lesson", {"teacher": HEAVY_TEACHER}) < args.lessons:
+        utils.seed_teachers(1)
+        utils.seed_students(100, 1)
+        utils.seed_lessons(args.lessons, 100, 1, teacher_of=HEAVY_TEACHER)
+    
+    from olya_bootstrap.conflicts import find_batch_conflicts, get_lesson_conflicts
+    
+    slot = frappe.utils.now_datetime().replace(minute=0, second=0, microsecond=0) + timedelta(days=30)
+    weekly = [
+        {"scheduled_time": slot + timedelta(weeks=week), "duration": 60, "teacher": HEAVY_TEACHER, "student": utils.student_name(0)}
+        for week in range(52)
+    ]
+    
+    results = {
+        "single_slot": utils.measure(
+            lambda: get_lesson_conflicts(slot, 60, teacher=HEAVY_TEACHER, student=utils.student_name(0)),
+            args.repeat * 20
+        ),
+        "batch_52": utils.measure(lambda: find_batch_conflicts(weekly), args.repeat),
+        "single_slot_plan": utils.explain(utils.capture_queries(
+            lambda: get_lesson_conflicts(slot, 60, teacher=HEAVY_TEACHER)
+        )[0])
+    }
+    print(json.dumps(results, indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Query-plan benchmark for the ESL Lesson access paths.
+
+Seeds synthetic lessons (1M by default), then runs every endpoint that reads
+lessons twice: once without the composite indexes and once with them. For
+each query issued by an endpoint it prints the EXPLAIN plan and the endpoint
+latency, followed by a JSON summary.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frappe
+
+import utils
+
+def get_endpoints():
+    """Endpoint callables keyed by name, bound to a seeded teacher and student"""
+    from olya_bootstrap.api.calendar import get_lesson_calendar_data, get_teacher_dashboard_data
+    from olya_bootstrap.portal.menu import get_student_portal_data, get_teacher_portal_data
+    
+    teacher = utils.teacher_email(0)
+    student = utils.student_name(0)
+    student_email = frappe.db.get_value("ESL Student", student, "email")
+    today = frappe.utils.getdate()
+    month_start = frappe.utils.get_first_day(today)
+    month_end = frappe.utils.add_days(frappe.utils.get_last_day(today), 1)
+    
+    return {
+        "get_lesson_calendar_data": lambda: get_lesson_calendar_data(teacher=teacher, start=str(month_start), end=str(month_end)),
+        "get_teacher_dashboard_data": lambda: get_teacher_dashboard_data(teacher),
+        "get_teacher_portal_data": lambda: get_teacher_portal_data(teacher),
+        "get_student_portal_data": lambda: get_student_portal_data(student_email),
+        "ESLStudent.get_lessons": lambda: frappe.get_doc("ESL Student", student).get_lessons()
+    }
+
+def drop_indexes():
+    from olya_bootstrap.doctype.esl_lesson.esl_lesson import LESSON_INDEXES
+    
+    existing = {row.Key_name for row in frappe.db.sql("show index from `tabESL Lesson`", as_dict=True)}
+    for columns in LESSON_INDEXES:
+        index_name = "_".join(columns) + "_index"
+        if index_name in existing:
+            frappe.db.sql_ddl(f"alter table `tabESL Lesson` drop index `{index_name}`")
+
+def create_indexes():
+    from olya_bootstrap.doctype.esl_lesson.esl_lesson import on_doctype_update
+    
+    on_doctype_update()
+
+def run_endpoints(label, repeat):
+    results = {}
+    for name, endpoint in get_endpoints().items():
+        queries = [q for q in utils.capture_queries(endpoint) if q.lstrip().lower().startswith("select")]
+        plans = [{"query": q, "explain": utils.explain(q)} for q in queries]
+        results[name] = {"latency": utils.measure(endpoint, repeat), "plans": plans}
+        
+        print(f"\n[{label}] {name}: {results[name]['latency']}")
+        for plan in plans:
+            print(f"  {' '.join(plan['query'].split())}")
+            for row in plan["explain"]:
+                print(f"    key={row.get('key')} rows={row.get('rows')} extra={row.get('Extra')}")
+    
+    return results
+
+def main():
+    parser = utils.get_parser(__doc__)
+    parser.add_argument("--lessons", type=int, default=1_000_000)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--teachers", type=int, default=200)
+    args = parser.parse_args()
+    utils.connect(args)
+    
+    if args.cleanup:
+        utils.cleanup()
+        return
+    
+    if utils.lesson_count() < args.lessons:
+        utils.seed_teachers(args.teachers)
+        utils.seed_students(args.students, args.teachers)
+        utils.seed_lessons(args.lessons, args.students, args.teachers)
+    
+    drop_indexes()
+    before = run_endpoints("before", args.repeat)
+    create_indexes()
+    after = run_endpoints("after", args.repeat)
+    
+    summary = {
+        name: {"before": before[name]["latency"], "after": after[name]["latency"]}
+        for name in before
+    }
+    print(json.dumps(summary, indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
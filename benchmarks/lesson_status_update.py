@@ -0,0 +1,62 @@
+"""
+Bulk status update benchmark.
+
+Marks a day's worth of upcoming lessons (50 by default) Cancelled, once with
+one update_lesson_status call per lesson and once with a single
+update_lesson_statuses call. Every run is rolled back.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frappe
+
+import utils
+
+def main():
+    parser = utils.get_parser(__doc__)
+    parser.add_argument("--lessons", type=int, default=50)
+    args = parser.parse_args()
+    utils.connect(args)
+    
+    if args.cleanup:
+        utils.cleanup()
+        return
+    
+    if utils.lesson_count() < 10_000:
+        utils.seed_teachers(10)
+        utils.seed_students(200, 10)
+        utils.seed_lessons(10_000, 200, 10)
+    
+    from olya_bootstrap.api.calendar import update_lesson_status, update_lesson_statuses
+    
+    lesson_ids = frappe.get_all("ESL Lesson",
+        filters={"name": ["like", f"{utils.BENCH_PREFIX}%"], "status": "Scheduled"},
+        order_by="scheduled_time",
+        limit=args.lessons,
+        pluck="name"
+    )
+    
+    def n_calls():
+        for lesson_id in lesson_ids:
+            update_lesson_status(lesson_id, "Cancelled")
+        frappe.db.rollback()
+    
+    def bulk_call():
+        update_lesson_statuses(lesson_ids, "Cancelled", reason="Benchmark")
+        frappe.db.rollback()
+    
+    results = {
+        "lessons": len(lesson_ids),
+        "n_calls": utils.measure(n_calls, args.repeat),
+        "bulk_call": utils.measure(bulk_call, args.repeat),
+        "n_calls_queries": len(utils.capture_queries(n_calls)),
+        "bulk_call_queries": len(utils.capture_queries(bulk_call))
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+Offline benchmark suite.
+
+Runs the whitelisted functions of olya_bootstrap.api (calendar, history, sync,
+feeds, students, series, stats) and olya_bootstrap.portal.menu, and the ESL Lesson /
+ESL Student / ESL Lesson Series document lifecycle with its doc_events hooks,
+against the in-process frappe stand-in (benchmarks/standin, SQLite-backed)
+instead of a bench site.
+
+Data comes from datagen.py at the chosen scale and is cached in a SQLite file
+between runs. Results are printed (or written with --output) as JSON with the
+scale, environment and git revision, and --compare reports the change
+against an earlier results file so releases can be compared.
+    
+    python benchmarks/offline.py --scale 100k --output results.json
+    python benchmarks/offline.py --scale 100k --compare results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+BENCHMARKS_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_PATH, "standin"))
+sys.path.insert(0, BENCHMARKS_PATH)
+sys.path.insert(0, os.path.dirname(BENCHMARKS_PATH))
+
+import frappe
+
+import datagen
+import utils
+
+SUITE_VERSION = 1
+
+def get_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=datagen.SCALES, default="1k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--db", help="SQLite file for the generated data (default: benchmarks/.offline/<scale>.sqlite3)")
+    parser.add_argument("--rebuild", action="store_true", help="Regenerate the data even if the SQLite file exists")
+    parser.add_argument("--case", action="append", help="Only run the named case (repeatable)")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--compare", help="Earlier results file to compare median timings with")
+    parser.add_argument("--threshold", type=float, default=0.2,
+        help="Relative median slowdown reported as a regression by --compare (default 0.2)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5,
+        help="Ignore median slowdowns smaller than this, which are noise (default 0.5)")
+    return parser
+
+def connect(args):
+    """Open (and if needed generate) the SQLite database for the scale"""
+    path = args.db or os.path.join(BENCHMARKS_PATH, ".offline", f"{args.scale}-{args.seed}.sqlite3")
+    if args.rebuild and os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    generated = not os.path.exists(path)
+    
+    frappe.init(site="offline", db_path=path)
+    frappe.connect()
+    
+    if generated:
+        datagen.generate(args.scale, args.seed)
+
+def run_case(fn, repeat):
+    """Time fn, rolling back after every run, and count the queries of one run"""
+    def run():
+        try:
+            fn()
+        finally:
+            frappe.db.rollback()
+    
+    # Warm up once so module imports and caches do not land in the first timing
+    run()
+    started = frappe.db.query_count
+    run()
+    queries = frappe.db.query_count - started
+    
+    result = utils.measure(run, repeat)
+    result["queries"] = queries
+    return result
+
+def get_cases(args):
+    """Benchmark cases, keyed by name, run as Administrator unless they switch user"""
+    from olya_bootstrap.api import calendar, history, series, stats, students, sync
+    from olya_bootstrap.portal import menu
+    from olya_bootstrap.portal.cache import clear_portal_cache
+    
+    counts = datagen.SCALES[args.scale]
+    teacher = utils.teacher_email(0)
+    student = utils.student_name(0)
+    now = frappe.utils.now_datetime()
+    window = {"start": (now - timedelta(days=3)).isoformat(), "end": (now + timedelta(days=35)).isoformat()}
+    # Students have few lessons, so their calendar is read a year at a time
+    year = {"start": (now - timedelta(days=180)).isoformat(), "end": (now + timedelta(days=185)).isoformat()}
+    
+    upcoming = frappe.get_all("ESL Lesson",
+        filters={"teacher": teacher, "status": "Scheduled", "scheduled_time": [">", now]},
+        fields=["name", "teacher", "student", "scheduled_time", "duration"],
+        order_by="scheduled_time",
+        limit=50
+    )
+    lesson_ids = [lesson.name for lesson in upcoming]
+    
+    # A cursor deep into the teacher's history, to show pages do not slow down with depth
+    oldest = frappe.get_all("ESL Lesson",
+        filters={"teacher": teacher},
+        fields=["name", "scheduled_time"],
+        order_by="scheduled_time, name",
+        limit=50
+    )
+    deep_cursor = history.make_history_cursor(oldest[-1].scheduled_time, oldest[-1].name) if oldest else None
+    
+    # A free slot far beyond the generated span, for inserts and conflict checks
+    free_slot = (now + timedelta(days=5 * 365)).replace(minute=0, second=0, microsecond=0)
+    batch = [
+        {"scheduled_time": str(free_slot + timedelta(hours=i)), "duration": 60, "teacher": teacher, "student": student}
+        for i in range(20)
+    ] + [
+        {"scheduled_time": str(lesson.scheduled_time), "duration": lesson.duration, "teacher": lesson.teacher,
+            "student": lesson.student}
+        for lesson in upcoming[:20]
+    ]
+    
+    bench_series = get_bench_series(teacher, student, free_slot + timedelta(days=30))
+    series_start = free_slot + timedelta(days=400)
+    # Rows for the bulk import; every run is rolled back, so the same rows validate each time
+    import_rows = json.dumps([
+        {"Student Name": f"{utils.BENCH_PREFIX}Import Student {i}", "Email": f"bench-import-{i}@example.com",
+            "Level": "A1 - Beginner"}
+        for i in range(50)
+    ])
+    
+    def as_user(user, fn):
+        def run():
+            frappe.set_user(user)
+            try:
+                return fn()
+            finally:
+                frappe.set_user("Administrator")
+        return run
+    
+    def portal_cold(user):
+        def run():
+            clear_portal_cache([user])
+            return menu.get_user_portal_data()
+        return as_user(user, run)
+    
+    def insert_lesson():
+        return frappe.get_doc({
+            "doctype": "ESL Lesson",
+            "title": "Offline Bench Lesson",
+            "student": student,
+            "teacher": teacher,
+            "scheduled_time": free_slot,
+            "duration": 60,
+            "status": "Scheduled"
+        }).insert()
+    
+    def save_lesson():
+        lesson = frappe.get_doc("ESL Lesson", lesson_ids[0])
+        lesson.notes = "Offline benchmark"
+        lesson.scheduled_time = free_slot
+        return lesson.save()
+    
+    def delete_lesson():
+        frappe.delete_doc("ESL Lesson", lesson_ids[0])
+    
+    def insert_student():
+        return frappe.get_doc({
+            "doctype": "ESL Student",
+            "student_name": f"{utils.BENCH_PREFIX}Offline Student",
+            "email": "bench-offline-student@example.com"
+        }).insert()
+    
+    def save_student():
+        doc = frappe.get_doc("ESL Student", student)
+        doc.level = "Advanced"
+        return doc.save()
+    
+    cases = {
+        "calendar.create_google_meet": lambda: calendar.create_google_meet("Bench Lesson", str(free_slot)),
+        "calendar.create_google_meet_real": create_google_meet_real_case(free_slot),
+        "calendar.request_meet_link": lambda: calendar.request_meet_link(lesson_ids[1]),
+        "calendar.get_lesson_calendar_data.teacher": lambda: calendar.get_lesson_calendar_data(teacher=teacher, **window),
+        "calendar.get_lesson_calendar_data.student": lambda: calendar.get_lesson_calendar_data(student=student, **year),
+        "calendar.get_lesson_calendar_data.all_paged": lambda: calendar.get_lesson_calendar_data(limit=100, **window),
+        "calendar.update_lesson_status": lambda: calendar.update_lesson_status(lesson_ids[2], "Cancelled"),
+        "calendar.update_lesson_statuses": lambda: calendar.update_lesson_statuses(lesson_ids, "Cancelled", "Benchmark"),
+        "calendar.get_teacher_dashboard_data": lambda: calendar.get_teacher_dashboard_data(teacher),
+        "calendar.check_lesson_conflicts": lambda: calendar.check_lesson_conflicts(str(free_slot), 60, teacher, student),
+        "calendar.check_lesson_conflicts.batch": lambda: calendar.check_lesson_conflicts(lessons=json.dumps(batch)),
+        "history.get_lesson_history.teacher_past": lambda: history.get_lesson_history(teacher=teacher),
+        "history.get_lesson_history.teacher_past_deep": lambda: history.get_lesson_history(teacher=teacher,
+            cursor=deep_cursor),
+        "history.get_lesson_history.student_upcoming": lambda: history.get_lesson_history(student=student, upcoming=1),
+        "menu.get_user_portal_data.teacher_cold": portal_cold(teacher),
+        "menu.get_user_portal_data.teacher_warm": as_user(teacher, menu.get_user_portal_data),
+        "menu.get_user_portal_data.student_cold": portal_cold(datagen.student_email(0)),
+        "sync.sync_lesson_calendar": lambda: sync.sync_lesson_calendar(
+            sync.make_sync_token(now - timedelta(days=1)), teacher=teacher),
+        "sync.sync_lesson_calendar.reset": lambda: sync.sync_lesson_calendar(teacher=teacher, **window),
+        "feeds.lesson_feed": lesson_feed_case(teacher),
+        "feeds.lesson_feed.not_modified": lesson_feed_case(teacher, not_modified=True),
+        "students.import_students": lambda: students.import_students(import_rows),
+        "series.create_lesson_series": lambda: series.create_lesson_series("Offline Bench Series", student,
+            str(series_start), occurrences=20, teacher=teacher),
+        "series.update_lesson_series": lambda: series.update_lesson_series(bench_series, title="Offline Bench",
+            duration=45),
+        "series.cancel_lesson_series": lambda: series.cancel_lesson_series(bench_series, reason="Benchmark"),
+        "stats.get_teacher_lesson_stats": lambda: stats.get_teacher_lesson_stats(teacher),
+        "hooks.esl_lesson.insert": insert_lesson,
+        "hooks.esl_lesson.save": save_lesson,
+        "hooks.esl_lesson.delete": delete_lesson,
+        "hooks.esl_student.insert": insert_student,
+        "hooks.esl_student.save": save_student
+    }
+    
+    if len(lesson_ids) < 3:
+        for name in ("calendar.request_meet_link", "calendar.update_lesson_status", "calendar.update_lesson_statuses",
+                "hooks.esl_lesson.save", "hooks.esl_lesson.delete"):
+            cases[name] = {"skipped": f"fewer than 3 upcoming lessons for {teacher} at scale {args.scale}"}
+    if counts["students"] < 1:
+        cases["menu.get_user_portal_data.student_cold"] = {"skipped": "no students"}
+    
+    return cases
+
+def get_bench_series(teacher, student, start):
+    """
+    Name of a 10 lesson series for the series update and cancel cases,
+    created and committed on first use so it survives the rolled back runs
+    """
+    name = frappe.db.get_value("ESL Lesson Series", {"title": "Offline Bench Series", "teacher": teacher})
+    if name:
+        return name
+    
+    from olya_bootstrap.api.series import create_lesson_series
+    
+    name = create_lesson_series("Offline Bench Series", student, str(start), occurrences=10, teacher=teacher)["series"]
+    frappe.db.commit()
+    return name
+
+def lesson_feed_case(user, not_modified=False):
+    """Serve and read the user's ICS feed, or answer it with 304, if werkzeug is installed"""
+    try:
+        import werkzeug  # noqa: F401
+    except ImportError:
+        return {"skipped": "werkzeug is not installed"}
+    
+    from olya_bootstrap.api.feeds import get_feed_etag, get_feed_filters, lesson_feed
+    from olya_bootstrap.doctype.esl_calendar_feed.esl_calendar_feed import get_feed_token
+    
+    token = get_feed_token(user)
+    frappe.db.commit()
+    headers = {"If-None-Match": f'"{get_feed_etag(get_feed_filters(user))}"'} if not_modified else {}
+    
+    def run():
+        frappe.request = frappe._dict(headers=headers)
+        try:
+            # The body is streamed, so read it to run the lesson query
+            return b"".join(lesson_feed(token).response)
+        finally:
+            frappe.request = None
+    
+    return run
+
+def create_google_meet_real_case(when):
+    """create_google_meet_real against the local Calendar API stub, if the Google client is installed"""
+    try:
+        import googleapiclient  # noqa: F401
+    except ImportError:
+        return {"skipped": "google-api-python-client is not installed"}
+    
+    from calendar_stub import start_stub_server
+    from olya_bootstrap.api.calendar import create_google_meet_real
+    
+    server = None
+    
+    def run():
+        nonlocal server
+        if server is None:
+            server, frappe.conf.google_calendar_api_url = start_stub_server()
+        return create_google_meet_real("Bench Lesson", str(when))
+    
+    run.stop = lambda: server and server.shutdown()
+    return run
+
+def run_suite(args):
+    cases = get_cases(args)
+    selected = args.case or list(cases)
+    unknown = set(selected) - set(cases)
+    if unknown:
+        raise SystemExit(f"Unknown cases: {', '.join(sorted(unknown))}")
+    
+    results = {}
+    for name in selected:
+        case = cases[name]
+        if isinstance(case, dict):
+            results[name] = case
+            continue
+        try:
+            results[name] = run_case(case, args.repeat)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            if hasattr(case, "stop"):
+                case.stop()
+            frappe.set_user("Administrator")
+    return results
+
+def get_meta(args):
+    return {
+        "scale": args.scale,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "counts": {
+            doctype: frappe.db.count(doctype)
+            for doctype in ("User", "ESL Student", "ESL Lesson")
+        },
+        "revision": get_git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+
+def get_git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_PATH, stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold, min_delta_ms=0):
+    """Median change per case against a baseline results file"""
+    comparison = {}
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name) or {}
+        if "median_ms" not in result or "median_ms" not in before:
+            continue
+        change = (result["median_ms"] - before["median_ms"]) / before["median_ms"] if before["median_ms"] else 0
+        comparison[name] = {
+            "baseline_median_ms": before["median_ms"],
+            "median_ms": result["median_ms"],
+            "change": round(change, 3),
+            "queries_change": result["queries"] - before.get("queries", result["queries"]),
+            "regression": change > threshold and result["median_ms"] - before["median_ms"] > min_delta_ms
+        }
+    return comparison
+
+def main():
+    args = get_parser().parse_args()
+    connect(args)
+    
+    try:
+        output = {
+            "suite": "olya_bootstrap.offline",
+            "version": SUITE_VERSION,
+            "meta": get_meta(args),
+            "results": run_suite(args)
+        }
+    finally:
+        frappe.destroy()
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        output["baseline"] = baseline.get("meta")
+        output["comparison"] = compare(output["results"], baseline, args.threshold, args.min_delta_ms)
+    
+    text = json.dumps(output, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    
+    if args.compare and any(case["regression"] for case in output["comparison"].values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
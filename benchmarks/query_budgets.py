@@ -0,0 +1,190 @@
+"""
+Query budget check for the API endpoints and doctype hooks.
+
+Runs every case of the offline suite, along with the ESL Lesson / ESL Student
+insert and save paths that load related documents, against the offline stand-in
+at two data scales. Each case has a declared budget of SQL queries (frappe.db.sql
+calls) that must not depend on how much data there is. A case fails when it
+issues more queries than its budget, or more queries at the larger scale, which
+points to per-row queries. Failures print the queries of the offending run and
+exit non-zero.
+    
+    python benchmarks/query_budgets.py
+    python benchmarks/query_budgets.py --scales 1k 1m
+
+Lower a budget when a change saves queries; raise one only with a reason.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import offline
+
+import frappe
+
+import datagen
+import utils
+
+# Queries per call, warm caches, any data size
+QUERY_BUDGETS = {
+    "calendar.create_google_meet": 0,
+    "calendar.create_google_meet_real": 0,
+    "calendar.request_meet_link": 1,
+    "calendar.get_lesson_calendar_data.teacher": 1,
+    "calendar.get_lesson_calendar_data.student": 1,
+    "calendar.get_lesson_calendar_data.all_paged": 1,
+    "calendar.update_lesson_status": 4,
+    "calendar.update_lesson_statuses": 3,
+    "calendar.get_teacher_dashboard_data": 4,
+    "calendar.check_lesson_conflicts": 1,
+    "calendar.check_lesson_conflicts.batch": 1,
+    "history.get_lesson_history.teacher_past": 1,
+    "history.get_lesson_history.teacher_past_deep": 1,
+    "history.get_lesson_history.student_upcoming": 1,
+    "menu.get_user_portal_data.teacher_cold": 4,
+    "menu.get_user_portal_data.teacher_warm": 0,
+    # Upcoming and recent lessons are separate index range reads, plus one lesson count
+    "menu.get_user_portal_data.student_cold": 6,
+    "sync.sync_lesson_calendar": 2,
+    "sync.sync_lesson_calendar.reset": 1,
+    # Feed owner, their student record, ETag aggregate and the streamed lesson read
+    "feeds.lesson_feed": 4,
+    "feeds.lesson_feed.not_modified": 3,
+    # 50 rows: existing students and users, then one bulk insert each for students, users and roles
+    "students.import_students": 5,
+    # 20 lessons: conflict check, series and lesson name counters, Meet slots and one bulk insert
+    "series.create_lesson_series": 11,
+    "series.update_lesson_series": 6,
+    "series.cancel_lesson_series": 5,
+    "stats.get_teacher_lesson_stats": 1,
+    "hooks.esl_lesson.insert": 7,
+    "hooks.esl_lesson.insert_without_teacher": 8,
+    "hooks.esl_lesson.save": 5,
+    "hooks.esl_lesson.delete": 5,
+    "hooks.esl_lesson.send_lesson_notification": 3,
+    "hooks.esl_student.insert": 10,
+    "hooks.esl_student.insert_with_teacher": 9,
+    "hooks.esl_student.save": 4
+}
+
+def get_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs=2, choices=datagen.SCALES, default=["1k", "100k"],
+        help="Smaller and larger data scale to compare (default: 1k 100k)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--case", action="append", help="Only check the named case (repeatable)")
+    return parser
+
+def get_cases(args):
+    """The offline suite's cases plus the lifecycle paths that load related documents"""
+    cases = offline.get_cases(args)
+    teacher = utils.teacher_email(0)
+    student = utils.student_name(0)
+    lesson = frappe.get_all("ESL Lesson",
+        filters={"teacher": teacher, "student": student},
+        order_by="scheduled_time desc",
+        limit=1,
+        pluck="name"
+    )
+    
+    def insert_lesson_without_teacher():
+        # The teacher comes from the student record in validate
+        return frappe.get_doc({
+            "doctype": "ESL Lesson",
+            "title": "Offline Bench Lesson",
+            "student": student,
+            "scheduled_time": frappe.utils.add_days(frappe.utils.now_datetime(), 5 * 365 + 1),
+            "duration": 60,
+            "status": "Scheduled"
+        }).insert()
+    
+    def insert_student_with_teacher():
+        # Skips the least-loaded teacher lookup of the plain insert case
+        return frappe.get_doc({
+            "doctype": "ESL Student",
+            "student_name": f"{utils.BENCH_PREFIX}Budget Student",
+            "email": "bench-budget-student@example.com",
+            "teacher": teacher
+        }).insert()
+    
+    cases["hooks.esl_lesson.insert_without_teacher"] = insert_lesson_without_teacher
+    cases["hooks.esl_student.insert_with_teacher"] = insert_student_with_teacher
+    cases["hooks.esl_lesson.send_lesson_notification"] = (
+        lambda: frappe.get_doc("ESL Lesson", lesson[0]).send_lesson_notification()
+    ) if lesson else {"skipped": f"no lesson of {student} with {teacher}"}
+    return cases
+
+def capture_case(fn):
+    """Queries of one warm run of fn; every run is rolled back"""
+    def run():
+        try:
+            fn()
+        finally:
+            frappe.db.rollback()
+    
+    run()
+    return utils.capture_queries(run)
+
+def check_scale(args, scale):
+    """Return {case: queries} at one scale, or {"skipped": reason} for cases that cannot run"""
+    offline.connect(argparse.Namespace(scale=scale, seed=args.seed, db=None, rebuild=False))
+    try:
+        cases = get_cases(argparse.Namespace(scale=scale, seed=args.seed))
+        captured = {}
+        for name in args.case or QUERY_BUDGETS:
+            case = cases.get(name, {"skipped": "no such case"})
+            if isinstance(case, dict):
+                captured[name] = case
+                continue
+            try:
+                captured[name] = capture_case(case)
+            finally:
+                if hasattr(case, "stop"):
+                    case.stop()
+                frappe.set_user("Administrator")
+        return captured
+    finally:
+        frappe.destroy()
+
+def main():
+    args = get_parser().parse_args()
+    small, large = args.scales
+    runs = {scale: check_scale(args, scale) for scale in (small, large)}
+    
+    report, failures = {}, []
+    for name in args.case or QUERY_BUDGETS:
+        budget = QUERY_BUDGETS.get(name)
+        queries = {scale: runs[scale][name] for scale in (small, large)}
+        if any(isinstance(value, dict) for value in queries.values()):
+            report[name] = next(value for value in queries.values() if isinstance(value, dict))
+            continue
+        
+        counts = {scale: len(value) for scale, value in queries.items()}
+        report[name] = {"budget": budget, "queries": counts}
+        
+        if budget is None:
+            failures.append((name, f"has no declared budget ({counts[large]} queries at {large})", queries[large]))
+        elif counts[large] > counts[small]:
+            failures.append((name, f"issues {counts[small]} queries at {small} but {counts[large]} at {large}",
+                queries[large]))
+        elif max(counts.values()) > budget:
+            scale = max(counts, key=counts.get)
+            failures.append((name, f"issues {counts[scale]} queries at {scale}, over its budget of {budget}",
+                queries[scale]))
+    
+    print(json.dumps(report, indent=2))
+    
+    for name, reason, queries in failures:
+        print(f"\nQUERY BUDGET EXCEEDED: {name} {reason}", file=sys.stderr)
+        for index, query in enumerate(queries, 1):
+            print(f"  {index:3d}. {' '.join(query.split())}", file=sys.stderr)
+    
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Lightweight in-process stand-in for frappe, used by the offline benchmarks.
+
+It implements the subset of the frappe API that olya_bootstrap calls, backed
+by SQLite (frappe.db) and an in-memory Redis replacement (frappe.cache()).
+Background jobs, realtime messages and emails are recorded instead of sent.
+It is not a test double for correctness: results are only meant for comparing
+timings and query counts between revisions of the app.
+"""
+
+import glob
+import importlib
+import json
+import logging
+import os
+import secrets
+import types
+
+class _dict(dict):
+    """dict with attribute access, as frappe._dict"""
+    def __getattr__(self, key):
+        return self.get(key)
+    
+    def __setattr__(self, key, value):
+        self[key] = value
+    
+    def __getstate__(self):
+        return dict(self)
+    
+    def __setstate__(self, state):
+        self.update(state)
+    
+    def copy(self):
+        return _dict(self)
+
+class ValidationError(Exception):
+    pass
+
+class PermissionError(Exception):
+    pass
+
+class DoesNotExistError(ValidationError):
+    pass
+
+class DuplicateEntryError(ValidationError):
+    pass
+
+class InvalidEmailAddressError(ValidationError):
+    pass
+
+local = types.SimpleNamespace(site=None)
+conf = _dict()
+session = _dict(user="Administrator")
+flags = _dict()
+db = None
+request = None
+response = _dict()
+
+# Roles reported for Administrator, who holds every role in a real site
+ALL_ROLES = ["Administrator", "System Manager", "ESL Administrator", "ESL Teacher", "ESL Student", "All", "Guest"]
+
+from frappe import utils  # noqa: E402
+from frappe.cache import StandinCache  # noqa: E402
+from frappe.database import CORE_DOCTYPES, get_database  # noqa: E402
+
+def init(site="offline", sites_path=".", db_path=":memory:", app="olya_bootstrap", site_config=None):
+    """Set up the site context; call connect() afterwards"""
+    global conf, flags, response
+    conf = _dict(site_config or {})
+    conf.setdefault("db_name", f"_{site}")
+    flags = _dict()
+    response = _dict()
+    local.site = site
+    local.sites_path = sites_path
+    local.db_path = db_path
+    local.app = app
+    local.conf = conf
+    local.flags = flags
+    local.cache = StandinCache()
+    local.meta = {}
+    local.doc_hooks = None
+    reset_records()
+
+def reset_records():
+    """Forget recorded jobs, realtime messages, emails and error logs"""
+    local.enqueued_jobs = []
+    local.realtime_messages = []
+    local.sent_emails = []
+    local.error_log = []
+
+def connect():
+    """Open the SQLite database and create the tables of every app and core doctype"""
+    global db
+    db = local.db = get_database(local.db_path)
+    db.create_series_table()
+    
+    for doctype, meta in CORE_DOCTYPES.items():
+        local.meta[doctype] = meta
+        db.sync_doctype(doctype, meta)
+    
+    app_path = os.path.dirname(importlib.import_module(local.app).__file__)
+    for path in sorted(glob.glob(os.path.join(app_path, "doctype", "*", "*.json"))):
+        with open(path) as f:
+            meta = json.load(f)
+        if meta.get("doctype") != "DocType":
+            continue
+        local.meta[meta["name"]] = meta
+        db.sync_doctype(meta["name"], meta)
+        
+        # Run on_doctype_update like frappe's model sync
+        module = importlib.import_module(f"{local.app}.doctype.{scrub(meta['name'])}.{scrub(meta['name'])}")
+        if hasattr(module, "on_doctype_update"):
+            module.on_doctype_update()
+    
+    db.conn.commit()
+    set_user("Administrator")
+
+def destroy():
+    global db
+    if db:
+        db.close()
+    db = local.db = None
+
+def set_user(user):
+    session.user = user
+
+def cache():
+    return local.cache
+
+class Meta(_dict):
+    """DocType JSON with frappe's Meta.get_field"""
+    def get_field(self, fieldname):
+        for field in self.get("fields", []):
+            if field["fieldname"] == fieldname:
+                return _dict(field)
+        return None
+
+def get_meta(doctype):
+    return Meta(local.meta.get(doctype) or {"fields": []})
+
+def get_doc_hooks(doctype, method):
+    """Handlers registered in the app's hooks.doc_events for a doctype method"""
+    if local.doc_hooks is None:
+        hooks = importlib.import_module(f"{local.app}.hooks")
+        local.doc_hooks = {}
+        for hooked_doctype, events in getattr(hooks, "doc_events", {}).items():
+            for event, handlers in events.items():
+                handlers = [handlers] if isinstance(handlers, str) else handlers
+                local.doc_hooks[(hooked_doctype, event)] = [get_attr(handler) for handler in handlers]
+    return local.doc_hooks.get((doctype, method), []) + local.doc_hooks.get(("*", method), [])
+
+def get_attr(path):
+    module, attr = path.rsplit(".", 1)
+    return getattr(importlib.import_module(module), attr)
+
+# Documents
+
+def get_doc(*args, **kwargs):
+    from frappe.model.document import get_controller
+    
+    if args and isinstance(args[0], dict):
+        return get_controller(args[0]["doctype"])(args[0])
+    if kwargs.get("doctype") and len(args) == 0:
+        return get_controller(kwargs["doctype"])(kwargs)
+    
+    doctype, name = args[0], args[1] if len(args) > 1 else kwargs.get("name")
+    if isinstance(name, dict):
+        if not db.table_exists(doctype):
+            throw(f"{doctype} not found", DoesNotExistError)
+        name = db.get_value(doctype, name, "name")
+    return get_controller(doctype)(doctype, name)
+
+def new_doc(doctype):
+    return get_doc({"doctype": doctype})
+
+def delete_doc(doctype, name, ignore_permissions=False, force=False, **kwargs):
+    doc = get_doc(doctype, name)
+    doc.run_method("on_trash")
+    db.sql(f"delete from `tab{doctype}` where name = %s", name)
+    doc.run_method("after_delete")
+
+def get_all(doctype, *args, **kwargs):
+    return db.get_all(doctype, *args, **kwargs)
+
+def get_list(doctype, *args, **kwargs):
+    # Every benchmark user may read every lesson, so permission filters add nothing
+    return db.get_all(doctype, *args, **kwargs)
+
+def get_value(doctype, filters=None, fieldname="name", as_dict=False, **kwargs):
+    return db.get_value(doctype, filters, fieldname, as_dict=as_dict, **kwargs)
+
+# Users and permissions
+
+def get_roles(user=None):
+    user = user or session.user
+    if user == "Administrator":
+        return list(ALL_ROLES)
+    if user == "Guest":
+        return ["Guest"]
+    return db.sql_list("""
+        select role from `tabHas Role`
+        where parent = %s and parenttype = 'User'
+    """, user) + ["All", "Guest"]
+
+def has_permission(doctype=None, ptype="read", doc=None, user=None, throw=False, **kwargs):
+    return True
+
+def only_for(roles, message=False):
+    roles = [roles] if isinstance(roles, str) else roles
+    if session.user != "Administrator" and not set(roles) & set(get_roles()):
+        raise PermissionError("Not permitted")
+
+def whitelist(allow_guest=False, xss_safe=False, methods=None):
+    def decorator(fn):
+        fn.whitelisted = True
+        return fn
+    return decorator
+
+# Messages, jobs and realtime
+
+def throw(msg, exc=ValidationError, title=None, **kwargs):
+    raise exc(msg)
+
+def msgprint(msg, *args, **kwargs):
+    pass
+
+def log_error(title=None, message=None, **kwargs):
+    local.error_log.append((title, message))
+
+def logger(module=None, **kwargs):
+    return logging.getLogger(module or "frappe")
+
+def enqueue(method, queue="default", timeout=None, job_id=None, enqueue_after_commit=False, **kwargs):
+    local.enqueued_jobs.append(_dict(method=method, queue=queue, job_id=job_id, kwargs=kwargs))
+
+def publish_realtime(event=None, message=None, room=None, user=None, doctype=None, docname=None,
+        after_commit=False, **kwargs):
+    local.realtime_messages.append(_dict(event=event, message=message, user=user, doctype=doctype, docname=docname))
+
+def sendmail(recipients=None, subject=None, message=None, **kwargs):
+    local.sent_emails.append(_dict(recipients=recipients, subject=subject))
+
+# Conversions
+
+def _(text, *args, **kwargs):
+    return text
+
+def scrub(text):
+    return text.replace(" ", "_").replace("-", "_").lower()
+
+def unscrub(text):
+    return text.replace("_", " ").replace("-", " ").title()
+
+def parse_json(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+def as_json(value, indent=1, separators=None):
+    return json.dumps(value, indent=indent, separators=separators, default=str)
+
+def generate_hash(txt=None, length=56):
+    return secrets.token_hex(length // 2 + 1)[:length]
+
+def safe_decode(value, encoding="utf-8"):
+    return value.decode(encoding) if isinstance(value, bytes) else value
+
+def safe_encode(value, encoding="utf-8"):
+    return value.encode(encoding) if isinstance(value, str) else value
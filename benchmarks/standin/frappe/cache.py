@@ -0,0 +1,222 @@
+"""In-process replacement for frappe's Redis cache wrapper"""
+
+import fnmatch
+import pickle
+import time
+
+import frappe
+
+class Pipeline:
+    """Buffers raw Redis commands and applies them on execute(), like a Redis pipeline"""
+    def __init__(self, cache):
+        self.cache = cache
+        self.calls = []
+    
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+    
+    def execute(self):
+        # A real pipeline speaks plain Redis: none of the wrapper's re-keying or pickling
+        calls, self.calls = self.calls, []
+        return [getattr(RawRedis, name)(self.cache, *args, **kwargs) for name, args, kwargs in calls]
+
+class RawRedis:
+    """The plain Redis commands the cache wrapper inherits unchanged"""
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+    
+    def alive(self, key):
+        expires = self.expiry.get(key)
+        if expires is not None and expires < time.monotonic():
+            self.store.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.store
+    
+    @staticmethod
+    def encode(value):
+        return value if isinstance(value, bytes) else str(value).encode()
+    
+    def get(self, name):
+        name = self.encode(name)
+        return self.store[name] if self.alive(name) else None
+    
+    def set(self, name, value, ex=None):
+        name = self.encode(name)
+        self.store[name] = self.encode(value)
+        self.expiry[name] = time.monotonic() + ex if ex else None
+    
+    def delete(self, *names):
+        for name in names:
+            name = self.encode(name)
+            self.store.pop(name, None)
+            self.expiry.pop(name, None)
+    
+    def exists(self, *names):
+        return sum(1 for name in names if self.alive(self.encode(name)))
+    
+    def expire(self, name, seconds):
+        name = self.encode(name)
+        if self.alive(name):
+            self.expiry[name] = time.monotonic() + seconds
+    
+    def incrby(self, name, amount=1):
+        name = self.encode(name)
+        value = int(self.get(name) or 0) + amount
+        self.store[name] = self.encode(value)
+        return value
+    
+    def hash(self, name):
+        name = self.encode(name)
+        if not self.alive(name):
+            self.store[name] = {}
+            self.expiry[name] = None
+        return self.store[name]
+    
+    def hset(self, name, key=None, value=None, mapping=None):
+        values = dict(mapping or {})
+        if key is not None:
+            values[key] = value
+        self.hash(name).update({self.encode(k): self.encode(v) for k, v in values.items()})
+        return len(values)
+    
+    def hget(self, name, key):
+        return RawRedis.hgetall(self, name).get(self.encode(key))
+    
+    def hgetall(self, name):
+        name = self.encode(name)
+        return dict(self.store[name]) if self.alive(name) else {}
+    
+    def hmget(self, name, keys):
+        values = RawRedis.hgetall(self, name)
+        return [values.get(self.encode(key)) for key in keys]
+    
+    def hincrby(self, name, key, amount=1):
+        values = self.hash(name)
+        key = self.encode(key)
+        values[key] = self.encode(int(values.get(key, 0)) + amount)
+        return int(values[key])
+    
+    def hincrbyfloat(self, name, key, amount=1.0):
+        values = self.hash(name)
+        key = self.encode(key)
+        values[key] = self.encode(float(values.get(key, 0)) + amount)
+        return float(values[key])
+    
+    def hdel(self, name, *keys):
+        values = self.hash(name)
+        for key in keys:
+            values.pop(self.encode(key), None)
+    
+    def lpush(self, name, *values):
+        name = self.encode(name)
+        if not self.alive(name):
+            self.store[name] = []
+            self.expiry[name] = None
+        for value in values:
+            self.store[name].insert(0, self.encode(value))
+        return len(self.store[name])
+    
+    def ltrim(self, name, start, end):
+        name = self.encode(name)
+        if self.alive(name):
+            self.store[name] = self.store[name][start:None if end == -1 else end + 1]
+    
+    def lrange(self, name, start, end):
+        name = self.encode(name)
+        return list(self.store[name][start:None if end == -1 else end + 1]) if self.alive(name) else []
+    
+    def zadd(self, name, mapping):
+        values = self.hash(name)
+        added = sum(1 for member in mapping if self.encode(member) not in values)
+        values.update({self.encode(member): float(score) for member, score in mapping.items()})
+        return added
+    
+    def zrangebyscore(self, name, min, max):
+        values = RawRedis.hgetall(self, name)
+        return [member for member, score in sorted(values.items(), key=lambda item: item[1]) if min <= score <= max]
+    
+    def zrem(self, name, *members):
+        values = self.hash(name)
+        return sum(1 for member in members if values.pop(self.encode(member), None) is not None)
+    
+    def zcard(self, name):
+        return len(RawRedis.hgetall(self, name))
+    
+    def pipeline(self):
+        return Pipeline(self)
+    
+    def flushall(self):
+        self.store.clear()
+        self.expiry.clear()
+
+class StandinCache(RawRedis):
+    """
+    frappe's RedisWrapper: every call below applies make_key to the names it is
+    given and hash values are pickled, while the other commands are raw Redis.
+    """
+    def make_key(self, key, user=None, shared=False):
+        if shared:
+            return key
+        if user:
+            if user is True:
+                user = frappe.session.user
+            key = f"user:{user}:{key}"
+        # Like the wrapper, a key that already went through make_key is prefixed again
+        return f"{frappe.conf.db_name}|{key}".encode()
+    
+    # Pickled values (frappe.cache().get_value / set_value)
+    
+    def get_value(self, key, user=None, expires=False, shared=False):
+        key = self.make_key(key, user, shared)
+        return pickle.loads(self.store[key]) if self.alive(key) else None
+    
+    def set_value(self, key, val, user=None, expires_in_sec=None, shared=False):
+        key = self.make_key(key, user, shared)
+        self.store[key] = pickle.dumps(val)
+        self.expiry[key] = time.monotonic() + expires_in_sec if expires_in_sec else None
+    
+    def delete_value(self, keys, user=None, make_keys=True, shared=False):
+        keys = [keys] if isinstance(keys, (str, bytes)) else keys
+        self.delete(*(self.make_key(key, user, shared) if make_keys else key for key in keys))
+    
+    def delete_keys(self, pattern):
+        pattern = self.make_key(pattern).decode()
+        self.delete(*(key for key in list(self.store) if fnmatch.fnmatch(key.decode(), f"{pattern}*")))
+    
+    # Commands the wrapper overrides
+    
+    def exists(self, *keys, user=None, shared=False):
+        return super().exists(*(self.make_key(key, user, shared) for key in keys))
+    
+    def hset(self, name, key, value, shared=False):
+        if key is None:
+            return
+        return super().hset(self.make_key(name, shared=shared), key, pickle.dumps(value))
+    
+    def hget(self, name, key, generator=None, shared=False):
+        value = super().hget(self.make_key(name, shared=shared), key)
+        if value is not None:
+            return pickle.loads(value)
+        if generator:
+            value = generator()
+            self.hset(name, key, value, shared=shared)
+        return value
+    
+    def hgetall(self, name):
+        return {key: pickle.loads(value) for key, value in super().hgetall(self.make_key(name)).items()}
+    
+    def hdel(self, name, key, shared=False):
+        super().hdel(self.make_key(name, shared=shared), key)
+    
+    def lpush(self, key, value):
+        return super().lpush(self.make_key(key), value)
+    
+    def ltrim(self, key, start, stop):
+        return super().ltrim(self.make_key(key), start, stop)
+    
+    def lrange(self, key, start, stop):
+        return super().lrange(self.make_key(key), start, stop)
@@ -0,0 +1,444 @@
+"""
+SQLite database of the frappe stand-in.
+
+Queries written for MariaDB are rewritten on the fly: pymysql-style
+parameters become SQLite placeholders (sequences expand to IN lists) and
+the few MariaDB-only constructs the app uses are mapped or registered as
+SQL functions.
+"""
+
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import frappe
+
+PARAM_PATTERN = re.compile(r"%\((\w+)\)s|%s|%%")
+DATETIME_STRING = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}$")
+
+# Default SQLITE_MAX_VARIABLE_NUMBER since SQLite 3.32
+SQLITE_MAX_VARIABLES = 32766
+
+# MariaDB construct -> SQLite replacement
+DIALECT_REWRITES = [
+    (re.compile(r"\bfor\s+update(\s+skip\s+locked)?", re.I), ""),
+    (re.compile(r"\btimestampadd\(\s*(\w+)\s*,", re.I), r"timestampadd('\1',"),
+    (re.compile(r"\bif\(", re.I), "iif("),
+    (re.compile(r"\binsert\s+ignore\b", re.I), "insert or ignore"),
+    (re.compile(r"\bon\s+duplicate\s+key\s+update\b", re.I), "on conflict do update set"),
+    (re.compile(r"^\s*explain\s+(?!query\s+plan)", re.I), "explain query plan ")
+]
+
+FIELD_TYPES = {
+    "Int": "integer",
+    "Check": "integer",
+    "Float": "real",
+    "Currency": "real",
+    "Percent": "real",
+    "Rating": "real",
+    "Date": "date",
+    "Datetime": "datetime"
+}
+NO_VALUE_FIELDS = {"Section Break", "Column Break", "Tab Break", "HTML", "Button", "Table", "Table MultiSelect"}
+
+STANDARD_COLUMNS = [
+    ("name", "text primary key"),
+    ("creation", "datetime"),
+    ("modified", "datetime"),
+    ("modified_by", "text"),
+    ("owner", "text"),
+    ("docstatus", "integer default 0"),
+    ("idx", "integer default 0"),
+    ("parent", "text"),
+    ("parentfield", "text"),
+    ("parenttype", "text")
+]
+
+# Framework doctypes the app reads or writes
+CORE_DOCTYPES = {
+    "User": {
+        "autoname": "field:email",
+        "fields": [
+            {"fieldname": "email", "fieldtype": "Data", "unique": 1},
+            {"fieldname": "first_name", "fieldtype": "Data"},
+            {"fieldname": "last_name", "fieldtype": "Data"},
+            {"fieldname": "full_name", "fieldtype": "Data"},
+            {"fieldname": "enabled", "fieldtype": "Check", "default": 1},
+            {"fieldname": "user_type", "fieldtype": "Data", "default": "System User"},
+            {"fieldname": "send_welcome_email", "fieldtype": "Check"}
+        ]
+    },
+    "Has Role": {
+        "autoname": "hash",
+        "istable": 1,
+        "fields": [{"fieldname": "role", "fieldtype": "Data", "search_index": 1}]
+    }
+}
+
+def format_datetime_value(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+def adapt_value(value):
+    """Store datetimes with microseconds so string comparison matches datetime order"""
+    if isinstance(value, datetime):
+        return format_datetime_value(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, str) and DATETIME_STRING.match(value):
+        return value.replace("T", " ") + ".000000"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+def convert_datetime(value):
+    return datetime.fromisoformat(value.decode())
+
+def convert_date(value):
+    return date.fromisoformat(value.decode()[:10])
+
+sqlite3.register_converter("datetime", convert_datetime)
+sqlite3.register_converter("date", convert_date)
+
+def timestampadd(unit, amount, value):
+    if value is None or amount is None:
+        return None
+    unit = unit.lower()
+    delta = timedelta(**{f"{unit}s": float(amount)}) if unit in ("second", "minute", "hour", "day", "week") else None
+    if delta is None:
+        raise ValueError(f"Unsupported timestampadd unit {unit}")
+    return format_datetime_value(datetime.fromisoformat(str(value)) + delta)
+
+def concat(*values):
+    return None if any(value is None for value in values) else "".join(str(value) for value in values)
+
+def least(*values):
+    return min(values)
+
+def greatest(*values):
+    return max(values)
+
+def sql_now(*args):
+    return frappe.utils.now()
+
+class CallbackManager:
+    """Callbacks run once on the next commit or rollback"""
+    def __init__(self):
+        self.callbacks = []
+    
+    def add(self, callback):
+        self.callbacks.append(callback)
+    
+    def run(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+    
+    def reset(self):
+        self.callbacks = []
+
+class SQLiteDatabase:
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        self.conn.execute("pragma journal_mode = wal" if path != ":memory:" else "pragma journal_mode = memory")
+        self.conn.execute("pragma synchronous = off")
+        for name, function in (("timestampadd", timestampadd), ("concat", concat), ("least", least),
+                ("greatest", greatest), ("now", sql_now)):
+            self.conn.create_function(name, -1, function, deterministic=name != "now")
+        
+        self.after_commit = CallbackManager()
+        self.after_rollback = CallbackManager()
+        self.query_count = 0
+        self.meta = {}
+    
+    # Schema
+    
+    def sync_doctype(self, doctype, meta):
+        """Create the table and indexes of a doctype from its JSON definition"""
+        self.meta[doctype] = meta
+        fields = [field for field in meta.get("fields", []) if field["fieldtype"] not in NO_VALUE_FIELDS]
+        columns = list(STANDARD_COLUMNS) + [
+            (field["fieldname"], FIELD_TYPES.get(field["fieldtype"], "text"))
+            for field in fields if field["fieldname"] not in dict(STANDARD_COLUMNS)
+        ]
+        
+        self.conn.execute(f"""create table if not exists `tab{doctype}` (
+            {", ".join(f"`{name}` {column_type}" for name, column_type in columns)}
+        )""")
+        self.add_index(doctype, ["modified"])
+        if meta.get("istable"):
+            self.add_index(doctype, ["parent"])
+        for field in fields:
+            if field.get("unique"):
+                self.add_index(doctype, [field["fieldname"]], unique=True)
+            elif field.get("search_index"):
+                self.add_index(doctype, [field["fieldname"]])
+    
+    def create_series_table(self):
+        self.conn.execute("create table if not exists `tabSeries` (name text primary key, current integer)")
+    
+    def add_index(self, doctype, fields, index_name=None, unique=False):
+        index_name = index_name or "_".join(fields) + "_index"
+        self.conn.execute(f"""create {"unique " if unique else ""}index if not exists
+            `{frappe.scrub(doctype)}_{index_name}` on `tab{doctype}` ({", ".join(f"`{field}`" for field in fields)})""")
+    
+    def table_exists(self, doctype):
+        return bool(self.conn.execute(
+            "select 1 from sqlite_master where type = 'table' and name = ?", (f"tab{doctype}",)
+        ).fetchone())
+    
+    def get_table_columns(self, doctype):
+        return [row[1] for row in self.conn.execute(f"pragma table_info(`tab{doctype}`)")]
+    
+    # Queries
+    
+    def translate(self, query, values=()):
+        """Rewrite a MariaDB/pymysql query into SQLite SQL and positional parameters"""
+        for pattern, replacement in DIALECT_REWRITES:
+            query = pattern.sub(replacement, query)
+        
+        if values is None or (isinstance(values, (tuple, list, dict)) and not values):
+            return query, []
+        if not isinstance(values, (tuple, list, dict)):
+            values = (values,)
+        
+        params = []
+        positional = iter(values) if not isinstance(values, dict) else None
+        
+        def replace(match):
+            if match.group(0) == "%%":
+                return "%"
+            value = values[match.group(1)] if match.group(1) else next(positional)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                value = list(value)
+                if not value:
+                    return "(null)"
+                params.extend(adapt_value(item) for item in value)
+                return "(" + ", ".join("?" * len(value)) + ")"
+            params.append(adapt_value(value))
+            return "?"
+        
+        return PARAM_PATTERN.sub(replace, query), params
+    
+    def sql(self, query, values=(), as_dict=False, as_list=False, pluck=False, as_iterator=False, update=None,
+            debug=False, prepared=False, **kwargs):
+        # The query helpers below pass SQLite SQL with positional parameters (prepared=True)
+        # through here too, so wrappers of frappe.db.sql see every query like on MariaDB
+        query, params = (query, values) if prepared else self.translate(query, values)
+        self.query_count += 1
+        cursor = self.conn.execute(query, params)
+        
+        if not cursor.description:
+            return ()
+        
+        columns = [column[0] for column in cursor.description]
+        rows = cursor if as_iterator else cursor.fetchall()
+        
+        if pluck:
+            result = (row[0] for row in rows)
+        elif as_dict:
+            result = (frappe._dict(zip(columns, row), **(update or {})) for row in rows)
+        elif as_list:
+            result = (list(row) for row in rows)
+        else:
+            return rows if as_iterator else tuple(rows)
+        
+        return result if as_iterator else list(result)
+    
+    def sql_list(self, query, values=()):
+        return self.sql(query, values, pluck=True)
+    
+    def mogrify(self, query, values=()):
+        query, params = self.translate(query, values)
+        if not params and isinstance(values, list):
+            # Prepared SQLite query from the helpers below
+            params = values
+        for param in params:
+            query = query.replace("?", repr(param), 1)
+        return query
+    
+    @contextmanager
+    def unbuffered_cursor(self):
+        # SQLite cursors already stream rows
+        yield
+    
+    def commit(self):
+        self.conn.commit()
+        self.after_commit.run()
+        self.after_rollback.reset()
+    
+    def rollback(self):
+        self.conn.rollback()
+        self.after_rollback.run()
+        self.after_commit.reset()
+    
+    def close(self):
+        self.conn.close()
+    
+    # Query helpers (frappe.db API)
+    
+    def build_conditions(self, filters):
+        """Translate frappe filters (name, dict or list) into a WHERE clause"""
+        if filters is None or filters == {} or filters == []:
+            return "", []
+        if isinstance(filters, (str, int)):
+            filters = {"name": filters}
+        
+        items = []
+        if isinstance(filters, dict):
+            for field, value in filters.items():
+                if isinstance(value, (list, tuple)) and value and isinstance(value[0], str) \
+                        and value[0].lower() in OPERATORS:
+                    items.append((field, value[0].lower(), value[1] if len(value) > 1 else None))
+                else:
+                    items.append((field, "=", value))
+        else:
+            for condition in filters:
+                if isinstance(condition, dict):
+                    conditions, params = self.build_conditions(condition)
+                    items.append((None, conditions, params))
+                    continue
+                condition = list(condition)
+                if len(condition) == 4:
+                    condition = condition[1:]
+                if len(condition) == 2:
+                    condition = [condition[0], "=", condition[1]]
+                items.append((condition[0], condition[1].lower(), condition[2]))
+        
+        clauses, params = [], []
+        for field, operator, value in items:
+            if field is None:
+                clauses.append(operator.removeprefix("where "))
+                params.extend(value)
+                continue
+            
+            column = field if "(" in field or "." in field else f"`{field}`"
+            if operator in ("in", "not in"):
+                value = [item for item in (value.split(",") if isinstance(value, str) else value or [])]
+                if not value:
+                    clauses.append("1 = 0" if operator == "in" else "1 = 1")
+                    continue
+                clauses.append(f"ifnull({column}, '') {operator} ({', '.join('?' * len(value))})")
+                params.extend(adapt_value(item) for item in value)
+            elif operator == "is":
+                clauses.append(f"ifnull({column}, '') {'!=' if value == 'set' else '='} ''")
+            elif operator == "between":
+                clauses.append(f"{column} between ? and ?")
+                params.extend(adapt_value(item) for item in value)
+            elif operator == "!=":
+                clauses.append(f"ifnull({column}, '') != ?")
+                params.append(adapt_value(value))
+            elif value is None and operator == "=":
+                clauses.append(f"{column} is null")
+            else:
+                clauses.append(f"{column} {operator} ?")
+                params.append(adapt_value(value))
+        
+        return "where " + " and ".join(clauses), params
+    
+    def get_all(self, doctype, filters=None, fields=None, order_by=None, limit=None, limit_page_length=None,
+            start=0, limit_start=None, page_length=None, pluck=None, as_list=False, distinct=False,
+            group_by=None, or_filters=None, **kwargs):
+        if pluck:
+            fields = [pluck]
+        fields = fields or ["name"]
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(",")]
+        
+        conditions, params = self.build_conditions(filters)
+        if or_filters:
+            or_conditions, or_params = self.build_conditions(or_filters)
+            or_clause = "(" + or_conditions.removeprefix("where ").replace(" and ", " or ") + ")"
+            conditions = f"{conditions} and {or_clause}" if conditions else f"where {or_clause}"
+            params.extend(or_params)
+        
+        limit = limit or limit_page_length or page_length
+        start = limit_start or start or 0
+        query = f"""select {"distinct " if distinct else ""}{", ".join(fields)}
+            from `tab{doctype}` {conditions}
+            {f"group by {group_by}" if group_by else ""}
+            order by {order_by or "modified desc"}
+            {f"limit {int(limit)} offset {int(start)}" if limit else ""}"""
+        
+        if pluck:
+            return self.sql(query, params, pluck=True, prepared=True)
+        if as_list:
+            return list(self.sql(query, params, prepared=True))
+        return self.sql(query, params, as_dict=True, prepared=True)
+    
+    def get_value(self, doctype, filters=None, fieldname="name", as_dict=False, order_by=None, **kwargs):
+        if filters is None:
+            return None
+        fields = [fieldname] if isinstance(fieldname, str) else list(fieldname)
+        rows = self.get_all(doctype, filters=filters, fields=fields, order_by=order_by or "modified desc", limit=1)
+        if not rows:
+            return None
+        row = rows[0]
+        if as_dict:
+            return row
+        return row[fields[0]] if isinstance(fieldname, str) else tuple(row.values())
+    
+    def exists(self, doctype, filters=None):
+        if isinstance(filters, dict) and filters.get("doctype"):
+            filters = {key: value for key, value in filters.items() if key != "doctype"}
+        return self.get_value(doctype, filters, "name")
+    
+    def count(self, doctype, filters=None):
+        conditions, params = self.build_conditions(filters)
+        return self.sql(f"select count(*) from `tab{doctype}` {conditions}", params, prepared=True)[0][0]
+    
+    def set_value(self, doctype, name, fieldname, value=None, update_modified=True, **kwargs):
+        values = dict(fieldname) if isinstance(fieldname, dict) else {fieldname: value}
+        if update_modified:
+            values.update({"modified": frappe.utils.now(), "modified_by": frappe.session.user})
+        conditions, params = self.build_conditions(name)
+        self.sql(
+            f"update `tab{doctype}` set {', '.join(f'`{field}` = ?' for field in values)} {conditions}",
+            [adapt_value(item) for item in values.values()] + params,
+            prepared=True
+        )
+    
+    def delete(self, doctype, filters=None):
+        conditions, params = self.build_conditions(filters)
+        self.sql(f"delete from `tab{doctype}` {conditions}", params, prepared=True)
+    
+    def bulk_insert(self, doctype, fields, values, ignore_duplicates=False, chunk_size=10_000):
+        # One multi-row INSERT per chunk through sql(), like frappe, so query wrappers see it;
+        # chunks also stay under SQLite's limit on bound parameters
+        chunk_size = max(1, min(chunk_size, SQLITE_MAX_VARIABLES // len(fields)))
+        row_placeholder = f"({', '.join('?' * len(fields))})"
+        values = list(values)
+        for index in range(0, len(values), chunk_size):
+            chunk = values[index:index + chunk_size]
+            self.sql(
+                f"""insert {"or ignore " if ignore_duplicates else ""}into `tab{doctype}`
+                    ({", ".join(f"`{field}`" for field in fields)}) values {", ".join([row_placeholder] * len(chunk))}""",
+                [adapt_value(item) for row in chunk for item in row],
+                prepared=True
+            )
+    
+    def insert_row(self, doctype, row):
+        self.sql(
+            f"insert into `tab{doctype}` ({', '.join(f'`{field}`' for field in row)}) values ({', '.join('?' * len(row))})",
+            [adapt_value(value) for value in row.values()],
+            prepared=True
+        )
+    
+    def update_row(self, doctype, name, row):
+        self.sql(
+            f"update `tab{doctype}` set {', '.join(f'`{field}` = ?' for field in row)} where name = ?",
+            [adapt_value(value) for value in row.values()] + [name],
+            prepared=True
+        )
+
+OPERATORS = {"=", "!=", "<", ">", "<=", ">=", "in", "not in", "like", "not like", "is", "between"}
+
+def get_database(path):
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return SQLiteDatabase(path)
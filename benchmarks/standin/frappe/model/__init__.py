@@ -0,0 +1 @@
+"""Document model of the frappe stand-in"""
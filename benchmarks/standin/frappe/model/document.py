@@ -0,0 +1,207 @@
+"""
+Document lifecycle of the frappe stand-in.
+
+insert/save/delete run the controller methods and the app's doc_events in
+frappe's order, against rows of the SQLite database.
+"""
+
+import importlib
+
+import frappe
+
+class Document:
+    def __init__(self, *args, **kwargs):
+        self.flags = frappe._dict()
+        self._doc_before_save = None
+        
+        if args and isinstance(args[0], dict):
+            data = dict(args[0])
+            self.doctype = data.pop("doctype", None) or getattr(self, "doctype", None)
+            self._new = not data.get("creation")
+            if self._new:
+                self.set_defaults()
+            self.update(data)
+        elif args:
+            self.doctype = args[0]
+            self._new = False
+            self.load_from_db(args[1] if len(args) > 1 else kwargs.get("name"))
+        else:
+            self.doctype = kwargs.pop("doctype", None)
+            self._new = True
+            self.set_defaults()
+            self.update(kwargs)
+    
+    # Field access
+    
+    def get(self, key, default=None):
+        value = self.__dict__.get(key, default)
+        return default if value is None else value
+    
+    def set(self, key, value):
+        setattr(self, key, value)
+    
+    def update(self, data):
+        for key, value in data.items():
+            setattr(self, key, value)
+        return self
+    
+    def as_dict(self):
+        return frappe._dict({
+            key: value for key, value in self.__dict__.items()
+            if not key.startswith("_") and key != "flags"
+        })
+    
+    def get_meta(self):
+        return frappe.get_meta(self.doctype)
+    
+    def get_valid_columns(self):
+        return frappe.db.get_table_columns(self.doctype)
+    
+    def set_defaults(self):
+        for field in self.get_meta().get("fields", []):
+            if field["fieldtype"] in ("Section Break", "Column Break"):
+                continue
+            default = field.get("default")
+            if default is not None and field["fieldtype"] in ("Int", "Check"):
+                default = frappe.utils.cint(default)
+            self.__dict__.setdefault(field["fieldname"], default)
+    
+    def load_from_db(self, name=None):
+        row = frappe.db.sql(f"select * from `tab{self.doctype}` where name = %s", name or self.name, as_dict=True)
+        if not row:
+            frappe.throw(f"{self.doctype} {name or self.name} not found", frappe.DoesNotExistError)
+        self.update(row[0])
+        self._new = False
+    
+    def reload(self):
+        self.load_from_db()
+        return self
+    
+    def is_new(self):
+        return self._new
+    
+    def get_doc_before_save(self):
+        return self._doc_before_save
+    
+    # Lifecycle
+    
+    def run_method(self, method, *args, **kwargs):
+        result = None
+        if hasattr(self, method) and callable(getattr(self, method)):
+            result = getattr(self, method)(*args, **kwargs)
+        for handler in frappe.get_doc_hooks(self.doctype, method):
+            handler(self, method)
+        return result
+    
+    def check_permission(self, permtype="read", permlevel=None):
+        if not frappe.has_permission(self.doctype, permtype, self):
+            frappe.throw(f"No permission for {self.doctype}", frappe.PermissionError)
+    
+    def set_new_name(self):
+        if getattr(self, "name", None):
+            return
+        
+        autoname = self.get_meta().get("autoname") or "hash"
+        if autoname.startswith("field:"):
+            self.name = self.get(autoname[len("field:"):])
+        elif "{" in autoname and "#" in autoname:
+            # Like frappe.model.naming, the braced part is parsed on its own: the
+            # series key is the text before the hashes inside the braces
+            pattern = autoname.removeprefix("format:")
+            prefix = pattern[:pattern.index("{")]
+            braced = pattern[pattern.index("{") + 1:pattern.index("}")]
+            key = braced[:braced.index("#")]
+            digits = braced.count("#")
+            current = frappe.db.sql("select current from `tabSeries` where name = %s", key)
+            if current:
+                frappe.db.sql("update `tabSeries` set current = current + 1 where name = %s", key)
+                number = current[0][0] + 1
+            else:
+                frappe.db.sql("insert into `tabSeries` (name, current) values (%s, 1)", key)
+                number = 1
+            self.name = f"{prefix}{key}{number:0{digits}d}"
+        else:
+            self.name = frappe.generate_hash(length=10)
+        
+        if not self.name:
+            frappe.throw(f"{self.doctype} name could not be set", frappe.ValidationError)
+    
+    def get_row(self):
+        columns = set(self.get_valid_columns())
+        return {key: value for key, value in self.as_dict().items() if key in columns}
+    
+    def insert(self, ignore_permissions=False, ignore_if_duplicate=False, **kwargs):
+        self.flags.in_insert = True
+        self.run_method("before_insert")
+        self.set_new_name()
+        
+        now = frappe.utils.now()
+        self.creation = self.modified = now
+        self.owner = self.modified_by = frappe.session.user
+        self.docstatus = self.get("docstatus") or 0
+        
+        self.run_method("validate")
+        self.run_method("before_save")
+        
+        if frappe.db.exists(self.doctype, self.name):
+            if ignore_if_duplicate:
+                return self
+            frappe.throw(f"{self.doctype} {self.name} already exists", frappe.DuplicateEntryError)
+        frappe.db.insert_row(self.doctype, self.get_row())
+        self._new = False
+        
+        self.run_method("after_insert")
+        self.run_method("on_update")
+        self.flags.in_insert = False
+        return self
+    
+    def save(self, ignore_permissions=False, **kwargs):
+        if self.is_new():
+            return self.insert(ignore_permissions=ignore_permissions)
+        
+        self._doc_before_save = frappe.get_doc(self.doctype, self.name)
+        self.modified = frappe.utils.now()
+        self.modified_by = frappe.session.user
+        
+        self.run_method("validate")
+        self.run_method("before_save")
+        frappe.db.update_row(self.doctype, self.name, self.get_row())
+        self.run_method("on_update")
+        return self
+    
+    def delete(self, ignore_permissions=False):
+        frappe.delete_doc(self.doctype, self.name, ignore_permissions=ignore_permissions)
+    
+    def db_set(self, fieldname, value=None, update_modified=True, **kwargs):
+        values = dict(fieldname) if isinstance(fieldname, dict) else {fieldname: value}
+        self.update(values)
+        frappe.db.set_value(self.doctype, self.name, values, update_modified=update_modified)
+
+class User(Document):
+    def add_roles(self, *roles):
+        existing = set(frappe.get_roles(self.name))
+        for role in roles:
+            if role in existing:
+                continue
+            frappe.get_doc({
+                "doctype": "Has Role",
+                "parent": self.name,
+                "parenttype": "User",
+                "parentfield": "roles",
+                "role": role
+            }).insert(ignore_permissions=True)
+
+CORE_CONTROLLERS = {"User": User}
+
+def get_controller(doctype):
+    if doctype in CORE_CONTROLLERS:
+        return CORE_CONTROLLERS[doctype]
+    
+    module_name = frappe.scrub(doctype)
+    try:
+        module = importlib.import_module(f"{frappe.local.app}.doctype.{module_name}.{module_name}")
+    except ModuleNotFoundError:
+        return Document
+    
+    controller = getattr(module, doctype.replace(" ", ""), Document)
+    return controller
@@ -0,0 +1,114 @@
+"""
+Date and conversion helpers of the frappe stand-in.
+
+Only the subset used by olya_bootstrap is provided; behaviour follows
+frappe.utils for the inputs the app passes.
+"""
+
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import frappe
+
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+def get_system_timezone():
+    return frappe.conf.get("time_zone") or "UTC"
+
+def now_datetime():
+    return datetime.now(ZoneInfo(get_system_timezone())).replace(tzinfo=None)
+
+def now():
+    return now_datetime().strftime(DATETIME_FORMAT)
+
+def nowdate():
+    return now_datetime().strftime(DATE_FORMAT)
+
+def today():
+    return nowdate()
+
+def get_datetime(value=None):
+    if value is None:
+        return now_datetime()
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    if isinstance(value, timedelta):
+        return datetime.combine(date.today(), time()) + value
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value).strip())
+
+def getdate(value=None):
+    if value is None:
+        return now_datetime().date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    return get_datetime(value).date()
+
+def add_to_date(value, days=0, hours=0, minutes=0, seconds=0):
+    as_date = isinstance(value, date) and not isinstance(value, datetime)
+    if isinstance(value, str):
+        as_date = len(value.strip()) <= 10
+    result = get_datetime(value) + timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
+    return result.date() if as_date else result
+
+def add_days(value, days):
+    return add_to_date(value, days=days)
+
+def get_first_day(value):
+    return getdate(value).replace(day=1)
+
+def get_last_day(value):
+    first_of_next = (get_first_day(value) + timedelta(days=32)).replace(day=1)
+    return first_of_next - timedelta(days=1)
+
+def get_first_day_of_week(value):
+    # Sunday, frappe's default first day of the week
+    value = getdate(value)
+    return value - timedelta(days=(value.weekday() + 1) % 7)
+
+def format_datetime(value, format_string=None):
+    return get_datetime(value).strftime(format_string or "%d-%m-%Y %H:%M:%S")
+
+def convert_utc_to_system_timezone(value):
+    value = get_datetime(value).replace(tzinfo=timezone.utc)
+    return value.astimezone(ZoneInfo(get_system_timezone()))
+
+def get_url(uri=None):
+    return f"http://{get_host_name()}{uri or ''}"
+
+def get_host_name():
+    return frappe.conf.get("host_name") or "localhost"
+
+def cint(value, default=0):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+def flt(value, precision=None):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return round(value, precision) if precision is not None else value
+
+def cstr(value):
+    return "" if value is None else str(value)
+
+def validate_email_address(email, throw=False):
+    email = (email or "").strip()
+    if EMAIL_PATTERN.match(email):
+        return email
+    if throw:
+        frappe.throw(f"{email} is not a valid email address", frappe.InvalidEmailAddressError)
+    return ""
@@ -0,0 +1,11 @@
+"""Job queue of the frappe stand-in: jobs are recorded, never executed"""
+
+import frappe
+
+QUEUE_TIMEOUTS = {"short": 300, "default": 300, "long": 1500}
+
+def get_queues_timeout():
+    return dict(QUEUE_TIMEOUTS)
+
+def is_job_enqueued(job_id):
+    return any(job.get("job_id") == job_id for job in frappe.local.enqueued_jobs)
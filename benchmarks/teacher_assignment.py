@@ -0,0 +1,63 @@
+"""
+Teacher assignment benchmark on a site with 20k users.
+
+Compares the previous assignment (every enabled User plus frappe.get_roles per
+user) with olya_bootstrap.assignment.pick_least_loaded_teacher, cold (empty
+cache) and warm.
+"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frappe
+
+import utils
+
+def legacy_assignment():
+    teachers = frappe.get_all("User", filters={"enabled": 1}, fields=["name", "full_name"])
+    esl_teachers = [t for t in teachers if "ESL Teacher" in frappe.get_roles(t.name)]
+    return random.choice(esl_teachers).name if esl_teachers else None
+
+def cold_assignment():
+    from olya_bootstrap.assignment import LESSON_LOAD_KEY, STUDENT_LOAD_KEY, clear_teacher_cache, pick_least_loaded_teacher
+    
+    clear_teacher_cache()
+    cache = frappe.cache()
+    cache.delete(cache.make_key(STUDENT_LOAD_KEY), cache.make_key(LESSON_LOAD_KEY))
+    return pick_least_loaded_teacher()
+
+def warm_assignment():
+    from olya_bootstrap.assignment import pick_least_loaded_teacher
+    
+    return pick_least_loaded_teacher()
+
+def main():
+    parser = utils.get_parser(__doc__)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--teachers", type=int, default=200)
+    args = parser.parse_args()
+    utils.connect(args)
+    
+    if args.cleanup:
+        utils.cleanup()
+        return
+    
+    utils.seed_users(args.users - args.teachers)
+    utils.seed_teachers(args.teachers)
+    frappe.db.commit()
+    
+    warm_assignment()
+    results = {
+        "legacy": utils.measure(legacy_assignment, args.repeat),
+        "cold": utils.measure(cold_assignment, args.repeat),
+        "warm": utils.measure(warm_assignment, args.repeat),
+        "warm_queries": len(utils.capture_queries(warm_assignment))
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Latency benchmark for the teacher dashboard statistics.
+
+Seeds one teacher with 50k lessons and compares counting in Python over every
+lesson row against the single GROUP BY query in olya_bootstrap.api.stats.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frappe
+
+import utils
+
+HEAVY_TEACHER = "bench-teacher-heavy@example.com"
+
+def python_counts(teacher):
+    """Previous approach made correct: pull every lesson and count in Python"""
+    lessons = frappe.get_all("ESL Lesson", filters={"teacher": teacher}, fields=["name", "status"], limit=0)
+    students = frappe.get_all("ESL Student", filters={"teacher": teacher}, fields=["name"], limit=0)
+    return {
+        "total_lessons": len(lessons),
+        "completed_lessons": len([l for l in lessons if l.status == "Completed"]),
+        "upcoming_lessons": len([l for l in lessons if l.status == "Scheduled"]),
+        "total_students": len(students)
+    }
+
+def aggregate_counts(teacher):
+    from olya_bootstrap.api.stats import get_teacher_lesson_stats, get_teacher_student_count
+    
+    stats = get_teacher_lesson_stats(teacher)
+    stats["total_students"] = get_teacher_student_count(teacher)
+    return stats
+
+def main():
+    parser = utils.get_parser(__doc__)
+    parser.add_argument("--lessons", type=int, default=50_000)
+    args = parser.parse_args()
+    utils.connect(args)
+    
+    if args.cleanup:
+        utils.cleanup()
+        return
+    
+    if frappe.db.count("ESL Lesson", {"teacher": HEAVY_TEACHER}) < args.lessons:
+        utils.seed_teachers(1)
+        utils.seed_students(500, 1)
+        utils.seed_lessons(args.lessons, 500, 1, teacher_of=HEAVY_TEACHER)
+    
+    results = {
+        "python_counts": utils.measure(lambda: python_counts(HEAVY_TEACHER), args.repeat),
+        "aggregate_counts": utils.measure(lambda: aggregate_counts(HEAVY_TEACHER), args.repeat),
+        "dashboard_stats": aggregate_counts(HEAVY_TEACHER)
+    }
+    print(json.dumps(results, indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
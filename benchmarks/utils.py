@@ -0,0 +1,170 @@
+"""
+Shared helpers for benchmarks that run against a bench site.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import timedelta
+
+import frappe
+
+BENCH_PREFIX = "BENCH-"
+STATUSES = ["Scheduled", "In Progress", "Completed", "Cancelled", "Rescheduled"]
+
+def get_parser(description):
+    """Argument parser with the options every benchmark understands"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--site", required=True, help="Site to run against")
+    parser.add_argument("--sites-path", default=".", help="Path to the bench sites directory")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement")
+    parser.add_argument("--cleanup", action="store_true", help="Delete seeded records and exit")
+    return parser
+
+def connect(args):
+    """Connect to the site given on the command line as Administrator"""
+    frappe.init(site=args.site, sites_path=args.sites_path)
+    frappe.connect()
+    frappe.set_user("Administrator")
+
+def measure(fn, repeat=5):
+    """Run fn `repeat` times and return latency statistics in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    
+    return {
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3)
+    }
+
+def capture_queries(fn):
+    """Run fn and return the SQL statements it issued"""
+    queries = []
+    original_sql = frappe.db.sql
+    
+    def recording_sql(query, values=(), *args, **kwargs):
+        queries.append(frappe.db.mogrify(query, values) if values else query)
+        return original_sql(query, values, *args, **kwargs)
+    
+    frappe.db.sql = recording_sql
+    try:
+        fn()
+    finally:
+        frappe.db.sql = original_sql
+    
+    return queries
+
+def explain(query):
+    """Return EXPLAIN rows for a SELECT statement"""
+    return frappe.db.sql(f"explain {query}", as_dict=True)
+
+def teacher_email(index):
+    return f"bench-teacher-{index}@example.com"
+
+def student_name(index):
+    return f"{BENCH_PREFIX}Student {index}"
+
+def seed_teachers(count):
+    """Insert `count` enabled users holding the ESL Teacher role"""
+    now = frappe.utils.now()
+    users, roles = [], []
+    for i in range(count):
+        email = teacher_email(i)
+        users.append((email, email, "Bench", f"Teacher {i}", f"Bench Teacher {i}", 1, "System User", now, now, "Administrator", "Administrator"))
+        roles.append((f"{BENCH_PREFIX}R-{i}", email, "User", "roles", "ESL Teacher", now, now, "Administrator", "Administrator"))
+    
+    frappe.db.bulk_insert("User",
+        ["name", "email", "first_name", "last_name", "full_name", "enabled", "user_type", "creation", "modified", "owner", "modified_by"],
+        users, ignore_duplicates=True)
+    frappe.db.bulk_insert("Has Role",
+        ["name", "parent", "parenttype", "parentfield", "role", "creation", "modified", "owner", "modified_by"],
+        roles, ignore_duplicates=True)
+
+def seed_students(count, teachers):
+    """Insert `count` students spread evenly over `teachers` teachers"""
+    now = frappe.utils.now()
+    rows = []
+    for i in range(count):
+        name = student_name(i)
+        rows.append((name, name, f"bench-student-{i}@example.com", teacher_email(i % teachers), "UTC", now, now, "Administrator", "Administrator"))
+    
+    frappe.db.bulk_insert("ESL Student",
+        ["name", "student_name", "email", "teacher", "timezone", "creation", "modified", "owner", "modified_by"],
+        rows, ignore_duplicates=True)
+
+def seed_lessons(count, students, teachers, span_days=730, seed=42, teacher_of=None, chunk_size=10000):
+    """
+    Insert `count` lessons spread over `span_days` around today.
+    
+    Lessons are assigned round-robin to students; `teacher_of` can
+    override the teacher for every lesson (e.g. to build one heavy teacher).
+    """
+    from olya_bootstrap.conflicts import get_lesson_start_utc
+    
+    rng = random.Random(seed)
+    now = frappe.utils.now_datetime()
+    origin = now - timedelta(days=span_days // 2)
+    fields = ["name", "title", "student", "teacher", "scheduled_time", "scheduled_end", "scheduled_time_utc",
+        "duration", "status", "creation", "modified", "owner", "modified_by"]
+    
+    rows = []
+    for i in range(count):
+        student_index = i % students
+        scheduled = (origin + timedelta(minutes=rng.randrange(span_days * 24 * 60))).replace(second=0, microsecond=0)
+        duration = rng.choice([30, 45, 60, 90])
+        if scheduled > now:
+            status = "Scheduled"
+        else:
+            status = rng.choice(["Completed", "Completed", "Completed", "Cancelled", "Rescheduled"])
+        
+        rows.append((
+            f"{BENCH_PREFIX}LESSON-{i:07d}",
+            f"Bench Lesson {i}",
+            student_name(student_index),
+            teacher_of or teacher_email(student_index % teachers),
+            scheduled,
+            scheduled + timedelta(minutes=duration),
+            get_lesson_start_utc(scheduled),
+            duration,
+            status,
+            now, now, "Administrator", "Administrator"
+        ))
+        if len(rows) >= chunk_size:
+            frappe.db.bulk_insert("ESL Lesson", fields, rows, ignore_duplicates=True)
+            frappe.db.commit()
+            rows = []
+    
+    if rows:
+        frappe.db.bulk_insert("ESL Lesson", fields, rows, ignore_duplicates=True)
+    frappe.db.commit()
+
+def cleanup():
+    """Delete every record seeded by the benchmarks"""
+    frappe.db.sql("delete from `tabESL Lesson` where name like %s", f"{BENCH_PREFIX}%")
+    frappe.db.sql("delete from `tabESL Student` where name like %s", f"{BENCH_PREFIX}%")
+    frappe.db.sql("delete from `tabHas Role` where name like %s", f"{BENCH_PREFIX}%")
+    frappe.db.sql("delete from `tabUser` where name like %s", "bench-teacher-%@example.com")
+    frappe.db.sql("delete from `tabUser` where name like %s", "bench-user-%@example.com")
+    frappe.db.sql("delete from `tabUser` where name like %s", "bench-student-%@example.com")
+    frappe.db.commit()
+
+def lesson_count():
+    return frappe.db.sql("select count(*) from `tabESL Lesson` where name like %s", f"{BENCH_PREFIX}%")[0][0]
+
+def seed_users(count):
+    """Insert `count` enabled website users without ESL roles"""
+    now = frappe.utils.now()
+    rows = []
+    for i in range(count):
+        email = f"bench-user-{i}@example.com"
+        rows.append((email, email, "Bench", f"User {i}", f"Bench User {i}", 1, "Website User", now, now, "Administrator", "Administrator"))
+    
+    frappe.db.bulk_insert("User",
+        ["name", "email", "first_name", "last_name", "full_name", "enabled", "user_type", "creation", "modified", "owner", "modified_by"],
+        rows, ignore_duplicates=True)
+    frappe.db.commit()
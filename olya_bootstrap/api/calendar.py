@@ -2,9 +2,17 @@ import frappe
 import json
 import random
 import string
-from datetime import datetime, timedelta
+from datetime import timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from olya_bootstrap.api.history import is_lesson_admin
+from olya_bootstrap.api.stats import get_teacher_lesson_stats, get_teacher_student_count
+from olya_bootstrap.conflicts import MAX_LESSON_DURATION, find_batch_conflicts, get_lesson_conflicts
+from olya_bootstrap.instrumentation import instrument
+from olya_bootstrap.responses import compact_response
 
 @frappe.whitelist()
+@instrument
 def create_google_meet(title: str, when: str, student_email: str = None):
     """
     Create Google Meet link and calendar event.
@@ -40,96 +48,73 @@ def create_google_meet(title: str, when: str, student_email: str = None):
             "status": "success",
             "message": "Meet link created successfully (stub implementation)"
         }
-        
+    
     except Exception as e:
         frappe.log_error(f"Failed to create Google Meet link: {str(e)}")
         frappe.throw("Failed to create Google Meet link. Please try again.")
 
 @frappe.whitelist()
+@instrument
 def create_google_meet_real(title: str, when: str, student_email: str = None):
     """
     Real Google Calendar API implementation (to be activated later).
     
     This function shows how to integrate with Google Calendar API using
-    service account or OAuth credentials stored in Frappe.
+    service account or OAuth credentials stored in Frappe. Set
+    `google_calendar_api_url` in site config to point it at a local API stub.
     """
     try:
-        # Get Google credentials from Social Login Key or custom settings
-        google_settings = get_google_credentials()
-        
-        if not google_settings:
-            frappe.throw("Google Calendar integration not configured. Please set up Google credentials.")
+        from olya_bootstrap.integrations.calendar_dispatch import dispatch_calendar_requests, insert_event
+        from olya_bootstrap.integrations.google_calendar import build_meet_event, extract_meet_link
         
-        # Import Google Calendar API client
-        from googleapiclient.discovery import build
-        from google.oauth2.service_account import Credentials
+        # Create the event through the rate-limited dispatcher, with one short retry at most
+        result = dispatch_calendar_requests([
+            insert_event(build_meet_event(title, when, student_email))
+        ], interactive=True)[0]
+        if not result["ok"]:
+            raise Exception(result["error"])
         
-        # Set up credentials
-        credentials = Credentials.from_service_account_info(
-            google_settings["service_account_json"],
-            scopes=['https://www.googleapis.com/auth/calendar']
-        )
-        
-        # Build Calendar service
-        service = build('calendar', 'v3', credentials=credentials)
-        
-        # Parse datetime
-        start_time = datetime.fromisoformat(when.replace('Z', '+00:00'))
-        end_time = start_time + timedelta(hours=1)  # Default 1 hour lesson
-        
-        # Create calendar event
-        event = {
-            'summary': title,
-            'description': f'ESL Lesson: {title}',
-            'start': {
-                'dateTime': start_time.isoformat(),
-                'timeZone': 'UTC',
-            },
-            'end': {
-                'dateTime': end_time.isoformat(),
-                'timeZone': 'UTC',
-            },
-            'conferenceData': {
-                'createRequest': {
-                    'requestId': ''.join(random.choices(string.ascii_letters + string.digits, k=16)),
-                    'conferenceSolutionKey': {
-                        'type': 'hangoutsMeet'
-                    }
-                }
-            },
-            'attendees': []
-        }
-        
-        # Add student email if provided
-        if student_email:
-            event['attendees'].append({'email': student_email})
-        
-        # Create the event
-        created_event = service.events().insert(
-            calendarId='primary',
-            body=event,
-            conferenceDataVersion=1
-        ).execute()
-        
-        # Extract Meet link
-        meet_link = None
-        if 'conferenceData' in created_event and 'entryPoints' in created_event['conferenceData']:
-            for entry_point in created_event['conferenceData']['entryPoints']:
-                if entry_point['entryPointType'] == 'video':
-                    meet_link = entry_point['uri']
-                    break
+        created_event = result["response"]
         
         return {
-            "meet_link": meet_link,
+            "meet_link": extract_meet_link(created_event),
             "event_id": created_event['id'],
             "status": "success",
             "message": "Google Meet link created successfully"
         }
-        
+    
     except Exception as e:
         frappe.log_error(f"Google Calendar API error: {str(e)}")
         frappe.throw(f"Failed to create Google Meet link: {str(e)}")
 
+@frappe.whitelist()
+@instrument
+def request_meet_link(lesson_id: str):
+    """
+    Queue Meet link creation for a lesson.
+    
+    The result is pushed to the lesson form with the `olya_meet_link_ready`
+    realtime event instead of blocking this request.
+    
+    Args:
+        lesson_id: ESL Lesson document name
+    
+    Returns:
+        dict: Queued status
+    """
+    lesson = frappe.get_doc("ESL Lesson", lesson_id)
+    lesson.check_permission("write")
+    
+    if lesson.meet_link:
+        return {"status": "exists", "meet_link": lesson.meet_link}
+    
+    from olya_bootstrap.integrations.google_calendar import is_calendar_configured
+    if not is_calendar_configured():
+        frappe.throw("Google Calendar is not configured")
+    
+    lesson.create_google_meet_link()
+    return {"status": "queued"}
+
 def get_google_credentials():
     """
     Get Google API credentials from Frappe settings.
@@ -158,12 +143,27 @@ def get_google_credentials():
         # return google_settings
         
         return None
-        
+    
     except Exception:
         return None
 
+# Colours used by the calendar for each lesson status
+STATUS_COLORS = {
+    "Scheduled": "#3b82f6",
+    "In Progress": "#f59e0b",
+    "Completed": "#10b981",
+    "Cancelled": "#ef4444",
+    "Rescheduled": "#8b5cf6"
+}
+DEFAULT_STATUS_COLOR = "#6b7280"
+
+# Upper bound for a single calendar page
+MAX_CALENDAR_PAGE_LENGTH = 1000
+
 @frappe.whitelist()
-def get_lesson_calendar_data(student=None, teacher=None, start_date=None, end_date=None):
+@instrument
+def get_lesson_calendar_data(student=None, teacher=None, start_date=None, end_date=None,
+        start=None, end=None, page=None, limit=None, timezone=None, compact=None):
     """
     Get lesson data formatted for calendar display.
     
@@ -171,74 +171,185 @@ def get_lesson_calendar_data(student=None, teacher=None, start_date=None, end_da
         student: Filter by student name
         teacher: Filter by teacher email
         start_date: Start date for filtering
-        end_date: End date for filtering
+        end_date: End date for filtering, inclusive: a date-only value covers that whole day
+        start: FullCalendar window start (alias for start_date)
+        end: FullCalendar window end, exclusive (takes precedence over end_date)
+        page: 1-based page number, used together with limit
+        limit: Maximum number of events to return
+        timezone: IANA timezone to render event times in; defaults to the
+            student's timezone when filtering by student only
+        compact: Return a pre-serialized (gzipped when large) response with the
+            status colours sent once, see compact_calendar_events
     
     Returns:
         list: Calendar events in FullCalendar format
     """
     try:
-        filters = {}
-        
-        if student:
-            filters["student"] = student
-        if teacher:
-            filters["teacher"] = teacher
-        if start_date:
-            filters["scheduled_time"] = [">=", start_date]
-        if end_date:
-            if "scheduled_time" in filters:
-                filters["scheduled_time"] = ["between", [start_date, end_date]]
-            else:
-                filters["scheduled_time"] = ["<=", end_date]
-        
-        lessons = frappe.get_all("ESL Lesson",
-            filters=filters,
-            fields=["name", "title", "student", "teacher", "scheduled_time", "duration", "status", "meet_link"],
-            order_by="scheduled_time"
+        events = get_calendar_events(
+            student=student,
+            teacher=teacher,
+            start=start or start_date,
+            end=end,
+            end_date=None if end else end_date,
+            page=page,
+            limit=limit,
+            timezone=timezone
         )
-        
-        # Format for FullCalendar
-        events = []
-        for lesson in lessons:
-            # Get student name
-            student_name = frappe.db.get_value("ESL Student", lesson.student, "student_name") if lesson.student else "Unknown"
-            
-            # Calculate end time
-            start_time = datetime.fromisoformat(lesson.scheduled_time.replace('Z', '+00:00'))
-            end_time = start_time + timedelta(minutes=lesson.duration or 60)
-            
-            # Set color based on status
-            color_map = {
-                "Scheduled": "#3b82f6",
-                "In Progress": "#f59e0b", 
-                "Completed": "#10b981",
-                "Cancelled": "#ef4444",
-                "Rescheduled": "#8b5cf6"
-            }
-            
-            events.append({
-                "id": lesson.name,
-                "title": f"{lesson.title} - {student_name}",
-                "start": lesson.scheduled_time,
-                "end": end_time.isoformat(),
-                "backgroundColor": color_map.get(lesson.status, "#6b7280"),
-                "borderColor": color_map.get(lesson.status, "#6b7280"),
-                "extendedProps": {
-                    "student": student_name,
-                    "teacher": lesson.teacher,
-                    "status": lesson.status,
-                    "meet_link": lesson.meet_link,
-                    "lesson_id": lesson.name
-                }
-            })
-        
+        if frappe.utils.cint(compact):
+            return compact_response(compact_calendar_events(events))
         return events
-        
+    
     except Exception as e:
         frappe.log_error(f"Failed to get calendar data: {str(e)}")
         return []
 
+def get_calendar_events(student=None, teacher=None, start=None, end=None, page=None, limit=None, timezone=None,
+        end_date=None):
+    """
+    Fetch lessons and their student names in one query and serialize them
+    as FullCalendar events in a single pass.
+    
+    The window is half-open: lessons overlapping [start, end) are returned,
+    so a lesson running over midnight shows on both days. The overlap is
+    filtered on the stored scheduled_end, with the scheduled_time range kept
+    within MAX_LESSON_DURATION of the window so the index still bounds the scan.
+    The legacy `end_date` is inclusive instead, like the ["between", ...]
+    filter it replaced: lessons starting up to the end of that day are included.
+    
+    Event times are naive system-timezone datetimes, unless a timezone is given
+    (or the student's own timezone applies), in which case they carry its offset.
+    """
+    conditions = []
+    values = {}
+    
+    if student:
+        conditions.append("lesson.student = %(student)s")
+        values["student"] = student
+    if teacher:
+        conditions.append("lesson.teacher = %(teacher)s")
+        values["teacher"] = teacher
+    if start:
+        conditions.append("lesson.scheduled_end > %(start)s")
+        conditions.append("lesson.scheduled_time > %(earliest)s")
+        values["start"] = parse_calendar_bound(start)
+        values["earliest"] = values["start"] - timedelta(minutes=MAX_LESSON_DURATION)
+    if end:
+        conditions.append("lesson.scheduled_time < %(end)s")
+        values["end"] = parse_calendar_bound(end)
+    elif end_date:
+        conditions.append("lesson.scheduled_time <= %(end)s")
+        values["end"] = parse_end_date(end_date)
+    
+    limit_clause = ""
+    limit = frappe.utils.cint(limit)
+    if limit > 0:
+        values["limit"] = min(limit, MAX_CALENDAR_PAGE_LENGTH)
+        values["offset"] = (max(frappe.utils.cint(page), 1) - 1) * values["limit"]
+        limit_clause = "limit %(limit)s offset %(offset)s"
+    
+    lessons = frappe.db.sql(f"""
+        select
+            lesson.name, lesson.title, lesson.student, lesson.teacher,
+            lesson.scheduled_time, lesson.scheduled_end, lesson.scheduled_time_utc,
+            lesson.duration, lesson.status, lesson.meet_link,
+            student.student_name, student.timezone as student_timezone
+        from `tabESL Lesson` lesson
+        left join `tabESL Student` student on student.name = lesson.student
+        {"where " + " and ".join(conditions) if conditions else ""}
+        order by lesson.scheduled_time, lesson.name
+        {limit_clause}
+    """, values, as_dict=True)
+    
+    return serialize_calendar_events(lessons, student, teacher, timezone)
+
+def serialize_calendar_events(lessons, student=None, teacher=None, timezone=None):
+    """
+    Serialize lesson rows with the display timezone resolved once for all of them:
+    `timezone` if given, else the student's own when filtering by student only.
+    """
+    zone = get_calendar_zone(timezone) if timezone else None
+    if timezone and not zone:
+        frappe.throw(f"Unknown timezone: {timezone}")
+    
+    # Every row belongs to the same student, so its timezone comes from the first one
+    if not zone and student and not teacher and lessons:
+        zone = get_calendar_zone(lessons[0].student_timezone)
+    
+    return [serialize_calendar_event(lesson, zone) for lesson in lessons]
+
+def serialize_calendar_event(lesson, zone=None):
+    """
+    Convert a joined lesson row into a FullCalendar event, with offset-aware
+    times in `zone` when given (from the stored UTC start).
+    """
+    student_name = lesson.student_name or lesson.student or "Unknown"
+    start_time = frappe.utils.get_datetime(lesson.scheduled_time)
+    end_time = (frappe.utils.get_datetime(lesson.scheduled_end) if lesson.get("scheduled_end")
+        else start_time + timedelta(minutes=lesson.duration or 60))
+    if zone and lesson.get("scheduled_time_utc"):
+        start_utc = frappe.utils.get_datetime(lesson.scheduled_time_utc).replace(tzinfo=timezone.utc)
+        start_time, end_time = start_utc.astimezone(zone), (start_utc + (end_time - start_time)).astimezone(zone)
+    color = STATUS_COLORS.get(lesson.status, DEFAULT_STATUS_COLOR)
+    
+    return {
+        "id": lesson.name,
+        "title": f"{lesson.title} - {student_name}",
+        "start": start_time.isoformat(),
+        "end": end_time.isoformat(),
+        "backgroundColor": color,
+        "borderColor": color,
+        "extendedProps": {
+            "student": student_name,
+            "teacher": lesson.teacher,
+            "status": lesson.status,
+            "meet_link": lesson.meet_link,
+            "lesson_id": lesson.name
+        }
+    }
+
+def compact_calendar_events(events):
+    """
+    Drop the per-event colours; the client looks them up from `colors` by
+    extendedProps.status, falling back to `default_color`.
+    """
+    for event in events:
+        del event["backgroundColor"], event["borderColor"]
+    
+    return {
+        "colors": STATUS_COLORS,
+        "default_color": DEFAULT_STATUS_COLOR,
+        "events": events
+    }
+
+def get_calendar_zone(name):
+    """ZoneInfo for an IANA timezone name, or None when it is empty or unknown"""
+    try:
+        return ZoneInfo(name) if name else None
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+def parse_calendar_bound(value):
+    """
+    Parse a calendar window bound into a naive datetime in the system timezone.
+    
+    FullCalendar sends ISO strings with a UTC offset (e.g. 2025-09-01T00:00:00+02:00),
+    while lessons are stored as naive datetimes in the system timezone.
+    """
+    bound = frappe.utils.get_datetime(value.replace("Z", "+00:00") if isinstance(value, str) else value)
+    if bound.tzinfo:
+        bound = frappe.utils.convert_utc_to_system_timezone(
+            bound.astimezone(timezone.utc).replace(tzinfo=None)
+        ).replace(tzinfo=None)
+    return bound
+
+def parse_end_date(value):
+    """Inclusive end bound of a legacy end_date: a date-only value means the end of that day"""
+    if len(str(value).strip()) == 10:
+        return frappe.utils.get_datetime(f"{str(value).strip()} 23:59:59.999999")
+    return parse_calendar_bound(value)
+
 @frappe.whitelist()
+@instrument
 def update_lesson_status(lesson_id: str, status: str):
     """
     Update lesson status via API.
@@ -259,12 +370,129 @@ def update_lesson_status(lesson_id: str, status: str):
             "status": "success",
             "message": f"Lesson status updated to {status}"
         }
-        
+    
     except Exception as e:
         frappe.log_error(f"Failed to update lesson status: {str(e)}")
         frappe.throw(f"Failed to update lesson status: {str(e)}")
 
+# Status changes allowed through the bulk status API
+ALLOWED_STATUS_TRANSITIONS = {
+    "Scheduled": {"In Progress", "Completed", "Cancelled", "Rescheduled"},
+    "In Progress": {"Completed", "Cancelled"},
+    "Rescheduled": {"Scheduled", "Cancelled"},
+    "Completed": set(),
+    "Cancelled": set()
+}
+MAX_BULK_STATUS_UPDATE = 500
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def update_lesson_statuses(lesson_ids, status: str, reason: str = None):
+    """
+    Update the status of many lessons in one transaction.
+    
+    Permissions and transitions are checked for the whole set up front; only
+    the lessons that pass are changed, with a single UPDATE.
+    
+    Args:
+        lesson_ids: List (or JSON list) of ESL Lesson names
+        status: New status value
+        reason: Cancellation reason appended to the lesson notes
+    
+    Returns:
+        dict: Per-lesson results keyed by lesson name
+    """
+    lesson_ids = list(dict.fromkeys(frappe.parse_json(lesson_ids) or []))
+    if status not in ALLOWED_STATUS_TRANSITIONS:
+        frappe.throw(f"Invalid lesson status {status}")
+    if len(lesson_ids) > MAX_BULK_STATUS_UPDATE:
+        frappe.throw(f"Cannot update more than {MAX_BULK_STATUS_UPDATE} lessons at once")
+    
+    frappe.has_permission("ESL Lesson", "write", throw=True)
+    
+    # One permission-aware query returns only the lessons this user may access
+    lessons = {
+        lesson.name: lesson
+        for lesson in frappe.get_list("ESL Lesson",
+            filters={"name": ["in", lesson_ids]},
+            fields=["name", "status", "teacher", "student", "scheduled_time", "duration"],
+            limit_page_length=0
+        )
+    } if lesson_ids else {}
+    
+    results = {}
+    to_update = []
+    now = frappe.utils.now_datetime()
+    
+    for lesson_id in lesson_ids:
+        lesson = lessons.get(lesson_id)
+        if not lesson:
+            results[lesson_id] = {"status": "error", "message": "Lesson not found or not permitted"}
+        elif lesson.status == status:
+            results[lesson_id] = {"status": "unchanged", "message": f"Lesson is already {status}"}
+        elif status not in ALLOWED_STATUS_TRANSITIONS.get(lesson.status or "Scheduled", set()):
+            results[lesson_id] = {"status": "error", "message": f"Cannot change status from {lesson.status} to {status}"}
+        elif status == "Scheduled" and frappe.utils.get_datetime(lesson.scheduled_time) < now:
+            results[lesson_id] = {"status": "error", "message": "Cannot schedule lesson in the past"}
+        else:
+            to_update.append(lesson)
+    
+    # Lessons going back to an active state must not double-book anyone
+    if status in ("Scheduled", "In Progress"):
+        for conflict in find_batch_conflicts(to_update):
+            lesson = to_update[conflict["index"]]
+            results[lesson.name] = {
+                "status": "error",
+                "message": f"This lesson overlaps with {', '.join(conflict['conflicts'])}"
+            }
+        to_update = [lesson for lesson in to_update if lesson.name not in results]
+    
+    if to_update:
+        apply_lesson_status(to_update, status, reason)
+        for lesson in to_update:
+            results[lesson.name] = {"status": "success", "message": f"Lesson status updated to {status}"}
+    
+    return {"results": results}
+
+def apply_lesson_status(lessons, status, reason=None):
+    """Write a status to many lessons with one UPDATE and refresh dependent caches"""
+    from olya_bootstrap.assignment import LESSON_LOAD_KEY, is_upcoming_lesson, update_teacher_load
+    from olya_bootstrap.portal.cache import clear_portal_cache_for_lessons
+    from olya_bootstrap.realtime import queue_lesson_changes
+    
+    assignments = ["status = %(status)s"]
+    values = {
+        "status": status,
+        "names": [lesson.name for lesson in lessons],
+        "modified": frappe.utils.now(),
+        "user": frappe.session.user
+    }
+    if reason and status == "Cancelled":
+        assignments.append("notes = if(ifnull(notes, '') = '', %(note)s, concat(notes, '\\n\\n', %(note)s))")
+        values["note"] = f"Cancellation reason: {reason}"
+    
+    frappe.db.sql(f"""
+        update `tabESL Lesson`
+        set {", ".join(assignments)}, modified = %(modified)s, modified_by = %(user)s
+        where name in %(names)s
+    """, values)
+    
+    # Keep the teacher load counters in step with lessons entering/leaving "upcoming"
+    load_changes = {}
+    for lesson in lessons:
+        before = is_upcoming_lesson(lesson)
+        after = is_upcoming_lesson(frappe._dict(lesson, status=status))
+        if before != after and lesson.teacher:
+            load_changes[lesson.teacher] = load_changes.get(lesson.teacher, 0) + (1 if after else -1)
+    for teacher, delta in load_changes.items():
+        update_teacher_load(LESSON_LOAD_KEY, teacher, delta)
+    
+    clear_portal_cache_for_lessons({lesson.teacher for lesson in lessons if lesson.teacher},
+        {lesson.student for lesson in lessons})
+    queue_lesson_changes(values["names"], "update", ["status"])
+
 @frappe.whitelist()
+@instrument
 def get_teacher_dashboard_data(teacher_email=None):
     """
     Get dashboard data for teachers.
@@ -276,7 +504,7 @@ def get_teacher_dashboard_data(teacher_email=None):
         if not teacher_email:
             teacher_email = frappe.session.user
         
-        # Get teacher's lessons
+        # Get teacher's recent lessons
         lessons = frappe.get_all("ESL Lesson",
             filters={"teacher": teacher_email},
             fields=["name", "title", "student", "scheduled_time", "status"],
@@ -284,29 +512,99 @@ def get_teacher_dashboard_data(teacher_email=None):
             limit=10
         )
         
-        # Calculate statistics
-        total_lessons = len(lessons)
-        completed_lessons = len([l for l in lessons if l.status == "Completed"])
-        upcoming_lessons = len([l for l in lessons if l.status == "Scheduled"])
+        # Calculate statistics over all of the teacher's lessons
+        stats = get_teacher_lesson_stats(teacher_email)
+        stats["total_students"] = get_teacher_student_count(teacher_email)
         
-        # Get students count
+        # Get a preview of the teacher's students
         students = frappe.get_all("ESL Student",
             filters={"teacher": teacher_email},
-            fields=["name"]
+            fields=["name"],
+            limit=10
         )
         
         return {
-            "stats": {
-                "total_lessons": total_lessons,
-                "completed_lessons": completed_lessons,
-                "upcoming_lessons": upcoming_lessons,
-                "total_students": len(students)
-            },
+            "stats": stats,
             "recent_lessons": lessons,
             "students": students
         }
-        
+    
     except Exception as e:
         frappe.log_error(f"Failed to get teacher dashboard data: {str(e)}")
         return {"error": str(e)}
 
+
+@frappe.whitelist()
+@instrument
+def check_lesson_conflicts(scheduled_time=None, duration=60, teacher=None, student=None, lesson=None, lessons=None):
+    """
+    Check proposed lesson times for teacher/student double-booking.
+    
+    Args:
+        scheduled_time: Proposed start time
+        duration: Proposed duration in minutes
+        teacher: Teacher email
+        student: Student name
+        lesson: Existing lesson being rescheduled (ignored as a conflict)
+        lessons: JSON list of {scheduled_time, duration, teacher, student, name}
+            to check as one batch instead of a single slot
+    
+    Only System Managers and ESL Administrators may check any teacher or
+    student. Teachers check their own slots (and their students'), students
+    their own (and their teacher's).
+    
+    Returns:
+        dict: conflicts for the single slot, or per-lesson conflicts for a batch
+    """
+    if lessons:
+        lessons = frappe.parse_json(lessons)
+        scope_conflict_participants(lessons)
+        return {"conflicts": find_batch_conflicts(lessons)}
+    
+    if not scheduled_time:
+        frappe.throw("scheduled_time is required")
+    
+    participants = {"teacher": teacher, "student": student}
+    scope_conflict_participants([participants])
+    return {
+        "conflicts": get_lesson_conflicts(scheduled_time, duration, teacher=participants["teacher"],
+            student=participants["student"], lesson=lesson)
+    }
+
+def scope_conflict_participants(lessons):
+    """
+    Hold non-admins to their own lessons, as scope_lesson_filters does for
+    reads: fill in the caller's own teacher or student where it is missing and
+    reject any other teacher or student than the caller and their own
+    students (or their own teacher).
+    """
+    if is_lesson_admin():
+        return
+    
+    user = frappe.session.user
+    if "ESL Teacher" in frappe.get_roles():
+        students = set()
+        for lesson in lessons:
+            lesson["teacher"] = lesson.get("teacher") or user
+            if lesson["teacher"] != user:
+                frappe.throw("You can only check your own lessons", frappe.PermissionError)
+            if lesson.get("student"):
+                students.add(lesson["student"])
+        
+        if students:
+            own_students = frappe.get_all("ESL Student",
+                filters={"name": ["in", list(students)], "teacher": user},
+                pluck="name"
+            )
+            if students - set(own_students):
+                frappe.throw("You can only check lessons of your own students", frappe.PermissionError)
+        return
+    
+    own_student = frappe.db.get_value("ESL Student", {"email": user}, ["name", "teacher"], as_dict=True)
+    if not own_student:
+        frappe.throw("Student profile not found", frappe.DoesNotExistError)
+    
+    for lesson in lessons:
+        lesson["student"] = lesson.get("student") or own_student.name
+        if lesson["student"] != own_student.name or lesson.get("teacher") not in (None, "", own_student.teacher):
+            frappe.throw("You can only check your own lessons", frappe.PermissionError)
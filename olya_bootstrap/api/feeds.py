@@ -0,0 +1,227 @@
+# ICS lesson feeds for external calendar apps
+
+import hashlib
+from datetime import timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import frappe
+from werkzeug.wrappers import Response
+
+from olya_bootstrap.doctype.esl_calendar_feed.esl_calendar_feed import get_feed_token
+from olya_bootstrap.instrumentation import instrument
+
+# Rolling window around today, overridable in site config
+DEFAULT_FEED_PAST_DAYS = 30         # lesson_feed_past_days
+DEFAULT_FEED_FUTURE_DAYS = 180      # lesson_feed_future_days
+
+# Events per chunk written to the response
+FEED_CHUNK_SIZE = 200
+
+# Bump to invalidate every ETag when the VEVENT layout changes
+FEED_VERSION = 1
+
+FEED_STATUSES = {
+    "Cancelled": "CANCELLED",
+    "Rescheduled": "CANCELLED"
+}
+
+@frappe.whitelist()
+@instrument
+def get_lesson_feed_url():
+    """
+    Return the secret ICS feed URL of the current user.
+    
+    Returns:
+        dict: Feed URL to subscribe to from a calendar app
+    """
+    return {"url": get_feed_url(get_feed_token(get_feed_user()))}
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def reset_lesson_feed_url():
+    """
+    Issue a new feed URL for the current user; the old URL stops working.
+    
+    Returns:
+        dict: New feed URL
+    """
+    return {"url": get_feed_url(get_feed_token(get_feed_user(), reset=True))}
+
+def get_feed_user():
+    if frappe.session.user == "Guest":
+        frappe.throw("Please log in to get your calendar feed", frappe.PermissionError)
+    return frappe.session.user
+
+def get_feed_url(token):
+    return frappe.utils.get_url(f"/api/method/olya_bootstrap.api.feeds.lesson_feed?token={token}")
+
+@frappe.whitelist(allow_guest=True, methods=["GET"])
+@instrument
+def lesson_feed(token=None):
+    """
+    Stream the lessons of the feed owner as an iCalendar file.
+    
+    The ETag is derived from the newest `modified` and the lesson count in the
+    window, so an unchanged feed is answered with 304 before the lessons are read.
+    """
+    user = frappe.db.get_value("ESL Calendar Feed", {"feed_token": token}, "user") if token else None
+    if not user:
+        frappe.throw("Calendar feed not found", frappe.DoesNotExistError)
+    
+    values = get_feed_filters(user)
+    etag = get_feed_etag(values)
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": "private, no-cache"
+    }
+    
+    if etag in get_request_etags():
+        return Response(status=304, headers=headers)
+    
+    headers["Content-Disposition"] = 'inline; filename="lessons.ics"'
+    return Response(
+        iter_feed(frappe.local.site, frappe.local.sites_path, values),
+        status=200,
+        headers=headers,
+        content_type="text/calendar; charset=utf-8",
+        direct_passthrough=True
+    )
+
+def get_feed_filters(user):
+    """Lessons taught by the user or booked by their student record, within the rolling window"""
+    today = frappe.utils.getdate(frappe.utils.nowdate())
+    past_days = frappe.utils.cint(frappe.conf.get("lesson_feed_past_days")) or DEFAULT_FEED_PAST_DAYS
+    future_days = frappe.utils.cint(frappe.conf.get("lesson_feed_future_days")) or DEFAULT_FEED_FUTURE_DAYS
+    
+    return {
+        "user": user,
+        "student": frappe.db.get_value("ESL Student", {"email": user}, "name"),
+        "start": frappe.utils.get_datetime(today - timedelta(days=past_days)),
+        "end": frappe.utils.get_datetime(today + timedelta(days=future_days + 1))
+    }
+
+FEED_CONDITIONS = """
+    (lesson.teacher = %(user)s or lesson.student = %(student)s)
+    and lesson.scheduled_time >= %(start)s and lesson.scheduled_time < %(end)s
+"""
+
+def get_feed_etag(values):
+    """Fingerprint the feed from index-only aggregates; the window start rolls the tag daily"""
+    last_modified, count = frappe.db.sql(f"""
+        select max(lesson.modified), count(*)
+        from `tabESL Lesson` lesson
+        where {FEED_CONDITIONS}
+    """, values)[0]
+    
+    fingerprint = f"{FEED_VERSION}|{values['user']}|{values['start']}|{last_modified}|{count}"
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+def get_request_etags():
+    header = frappe.request.headers.get("If-None-Match") or ""
+    return {tag.strip().removeprefix("W/").strip('"') for tag in header.split(",") if tag.strip()}
+
+def iter_feed(site, sites_path, values):
+    """
+    Yield the iCalendar body in chunks, reading lessons over an unbuffered
+    (server-side) cursor so memory stays flat regardless of history size.
+    
+    The response body is consumed after the request has been torn down,
+    so the generator opens its own site connection when none is active.
+    """
+    own_context = not getattr(frappe.local, "db", None)
+    if own_context:
+        frappe.init(site=site, sites_path=sites_path)
+        frappe.connect()
+    
+    try:
+        host = frappe.utils.get_host_name()
+        system_timezone = ZoneInfo(frappe.utils.get_system_timezone())
+        
+        yield ics_lines(
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//OLYA ESL//Lessons//EN",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            "X-WR-CALNAME:OLYA Lessons",
+            "REFRESH-INTERVAL;VALUE=DURATION:PT1H",
+            "X-PUBLISHED-TTL:PT1H"
+        )
+        
+        chunk = []
+        with frappe.db.unbuffered_cursor():
+            for lesson in frappe.db.sql(f"""
+                select
+                    lesson.name, lesson.title, lesson.scheduled_time, lesson.scheduled_end,
+                    lesson.duration, lesson.status, lesson.meet_link, lesson.modified,
+                    student.student_name
+                from `tabESL Lesson` lesson
+                left join `tabESL Student` student on student.name = lesson.student
+                where {FEED_CONDITIONS}
+                order by lesson.scheduled_time, lesson.name
+            """, values, as_dict=True, as_iterator=True):
+                chunk.append(serialize_vevent(lesson, host, system_timezone))
+                if len(chunk) >= FEED_CHUNK_SIZE:
+                    yield b"".join(chunk)
+                    chunk = []
+        
+        chunk.append(ics_lines("END:VCALENDAR"))
+        yield b"".join(chunk)
+    finally:
+        if own_context:
+            frappe.destroy()
+
+def serialize_vevent(lesson, host, system_timezone):
+    """Convert a joined lesson row into an encoded VEVENT"""
+    start_time = frappe.utils.get_datetime(lesson.scheduled_time)
+    end_time = (frappe.utils.get_datetime(lesson.scheduled_end) if lesson.scheduled_end
+        else start_time + timedelta(minutes=lesson.duration or 60))
+    
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{lesson.name}@{host}",
+        f"DTSTAMP:{format_ics_datetime(lesson.modified, system_timezone)}",
+        f"LAST-MODIFIED:{format_ics_datetime(lesson.modified, system_timezone)}",
+        f"DTSTART:{format_ics_datetime(start_time, system_timezone)}",
+        f"DTEND:{format_ics_datetime(end_time, system_timezone)}",
+        f"SUMMARY:{escape_ics_text(' - '.join(filter(None, [lesson.title, lesson.student_name])))}",
+        f"STATUS:{FEED_STATUSES.get(lesson.status, 'CONFIRMED')}"
+    ]
+    if lesson.meet_link:
+        lines.append(f"URL:{lesson.meet_link}")
+        lines.append(f"DESCRIPTION:{escape_ics_text('Google Meet: ' + lesson.meet_link)}")
+    lines.append("END:VEVENT")
+    
+    return ics_lines(*lines)
+
+def format_ics_datetime(value, system_timezone):
+    """Lessons are stored as naive system-timezone datetimes; feeds use UTC"""
+    value = frappe.utils.get_datetime(value).replace(tzinfo=system_timezone)
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def escape_ics_text(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def ics_lines(*lines):
+    """Encode content lines with CRLF endings, folded at 75 octets (RFC 5545 3.1)"""
+    return b"".join(fold_ics_line(line) + b"\r\n" for line in lines)
+
+def fold_ics_line(line):
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return encoded
+    
+    parts = []
+    current = b""
+    limit = 75
+    for char in line:
+        char_bytes = char.encode()
+        if len(current) + len(char_bytes) > limit:
+            parts.append(current)
+            current = b""
+            # Continuation lines start with a space, which counts towards the limit
+            limit = 74
+        current += char_bytes
+    parts.append(current)
+    return b"\r\n ".join(parts)
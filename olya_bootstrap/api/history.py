@@ -0,0 +1,149 @@
+# Cursor-paginated lesson histories for students and teachers
+
+import base64
+import json
+
+import frappe
+
+from olya_bootstrap.instrumentation import instrument
+
+HISTORY_CURSOR_VERSION = 1
+DEFAULT_HISTORY_PAGE_LENGTH = 20
+MAX_HISTORY_PAGE_LENGTH = 200
+
+# Roles that may page through any student's or teacher's history
+HISTORY_ADMIN_ROLES = {"System Manager", "ESL Administrator"}
+
+@frappe.whitelist()
+@instrument
+def get_lesson_history(student=None, teacher=None, upcoming=0, cursor=None, limit=None):
+    """
+    Return one page of a student's or teacher's lessons.
+    
+    Upcoming lessons come soonest first, past lessons most recent first. Each
+    page continues from the (scheduled_time, name) position in `cursor`, so
+    pages stay stable while lessons are added and cost the same however far
+    back the history goes.
+    
+    Only System Managers and ESL Administrators may pick any student or
+    teacher. Teachers always get their own lessons (optionally of one
+    student), students their own (optionally with one teacher).
+    
+    Args:
+        student: ESL Student name; defaults to the current user's student record
+        teacher: Teacher email; defaults to the current user if they are an ESL Teacher
+        upcoming: Return lessons from now on instead of past ones
+        cursor: next_cursor of the previous page
+        limit: Page length (at most 200)
+    
+    Returns:
+        dict: lessons and next_cursor (None on the last page)
+    """
+    frappe.has_permission("ESL Lesson", "read", throw=True)
+    
+    student, teacher = scope_lesson_filters(student, teacher)
+    return get_lesson_page(student=student, teacher=teacher, upcoming=frappe.utils.cint(upcoming),
+        cursor=cursor, limit=limit)
+
+def is_lesson_admin():
+    return bool(set(frappe.get_roles()) & HISTORY_ADMIN_ROLES)
+
+def scope_lesson_filters(student=None, teacher=None):
+    """
+    Return the (student, teacher) filters the session user may read lessons with.
+    
+    Admin roles keep the filters they pass. Everyone else, and an admin who
+    passes neither, is held to their own lessons: teachers by teacher, students
+    by their student record, with the other filter only narrowing further.
+    """
+    roles = set(frappe.get_roles())
+    if roles & HISTORY_ADMIN_ROLES and (student or teacher):
+        return student, teacher
+    
+    if "ESL Teacher" in roles:
+        return student, frappe.session.user
+    
+    own_student = frappe.db.get_value("ESL Student", {"email": frappe.session.user}, "name")
+    if not own_student:
+        frappe.throw("Student profile not found", frappe.DoesNotExistError)
+    return own_student, teacher
+
+def get_lesson_page(student=None, teacher=None, upcoming=False, cursor=None, limit=None, status=None):
+    """
+    Read one keyset page over the (student|teacher, scheduled_time) index.
+    
+    Upcoming pages walk the index forwards from now, past pages backwards,
+    each in a single range scan bounded by the cursor position.
+    
+    Returns:
+        dict: lessons and next_cursor (None on the last page)
+    """
+    if not student and not teacher:
+        frappe.throw("Set a student or a teacher")
+    
+    limit = min(frappe.utils.cint(limit) or DEFAULT_HISTORY_PAGE_LENGTH, MAX_HISTORY_PAGE_LENGTH)
+    values = {"now": frappe.utils.now_datetime(), "limit": limit + 1}
+    conditions = []
+    
+    if student:
+        conditions.append("lesson.student = %(student)s")
+        values["student"] = student
+    if teacher:
+        conditions.append("lesson.teacher = %(teacher)s")
+        values["teacher"] = teacher
+    if status:
+        conditions.append("lesson.status = %(status)s")
+        values["status"] = status
+    
+    if upcoming:
+        conditions.append("lesson.scheduled_time >= %(now)s")
+        order = "asc"
+    else:
+        conditions.append("lesson.scheduled_time < %(now)s")
+        order = "desc"
+    
+    position = parse_history_cursor(cursor)
+    if position:
+        values["after_time"], values["after_name"] = position
+        # The plain range bounds the index scan; the name breaks ties at the boundary
+        if upcoming:
+            conditions.append("""lesson.scheduled_time >= %(after_time)s
+                and (lesson.scheduled_time > %(after_time)s or lesson.name > %(after_name)s)""")
+        else:
+            conditions.append("""lesson.scheduled_time <= %(after_time)s
+                and (lesson.scheduled_time < %(after_time)s or lesson.name < %(after_name)s)""")
+    
+    lessons = frappe.db.sql(f"""
+        select
+            lesson.name, lesson.title, lesson.student, lesson.teacher,
+            lesson.scheduled_time, lesson.scheduled_end, lesson.duration,
+            lesson.status, lesson.meet_link
+        from `tabESL Lesson` lesson
+        where {" and ".join(conditions)}
+        order by lesson.scheduled_time {order}, lesson.name {order}
+        limit %(limit)s
+    """, values, as_dict=True)
+    
+    next_cursor = None
+    if len(lessons) > limit:
+        lessons = lessons[:limit]
+        next_cursor = make_history_cursor(lessons[-1].scheduled_time, lessons[-1].name)
+    
+    return {"lessons": lessons, "next_cursor": next_cursor}
+
+def make_history_cursor(scheduled_time, name):
+    payload = {"v": HISTORY_CURSOR_VERSION, "t": str(scheduled_time), "n": name}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+def parse_history_cursor(cursor):
+    """Decode a history cursor into its (scheduled_time, name) position"""
+    if not cursor:
+        return None
+    
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if payload.get("v") != HISTORY_CURSOR_VERSION:
+            raise ValueError
+        return frappe.utils.get_datetime(payload["t"]), payload["n"]
+    except Exception:
+        frappe.throw("Invalid lesson history cursor")
@@ -0,0 +1,74 @@
+# Recurring lesson series API
+
+import frappe
+
+from olya_bootstrap.instrumentation import instrument
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def create_lesson_series(title, student, start_time, frequency="Weekly", occurrences=None,
+        until=None, duration=60, teacher=None):
+    """
+    Create a recurring lesson series and all of its lessons in one transaction.
+    
+    Args:
+        title: Lesson title
+        student: ESL Student name
+        start_time: First lesson datetime
+        frequency: Weekly or Biweekly
+        occurrences: Number of lessons
+        until: Last possible lesson date (used when occurrences is not set)
+        duration: Lesson duration in minutes
+        teacher: Teacher email (defaults to the student's teacher)
+    
+    Returns:
+        dict: Series name and the created lesson names
+    """
+    series = frappe.get_doc({
+        "doctype": "ESL Lesson Series",
+        "title": title,
+        "student": student,
+        "teacher": teacher,
+        "start_time": start_time,
+        "frequency": frequency,
+        "occurrences": frappe.utils.cint(occurrences) or None,
+        "until": until,
+        "duration": frappe.utils.cint(duration) or 60
+    }).insert()
+    
+    return {
+        "series": series.name,
+        "lessons": [lesson.name for lesson in series.get_lessons()]
+    }
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def update_lesson_series(series, from_lesson=None, title=None, duration=None, start_time=None):
+    """
+    Edit a whole series, or `from_lesson` and the lessons following it.
+    
+    Returns:
+        dict: Names of the changed lessons
+    """
+    doc = frappe.get_doc("ESL Lesson Series", series)
+    doc.check_permission("write")
+    
+    return {
+        "lessons": doc.update_lessons(from_lesson=from_lesson, title=title, duration=duration, start_time=start_time)
+    }
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def cancel_lesson_series(series, from_lesson=None, reason=None):
+    """
+    Cancel a whole series, or `from_lesson` and the lessons following it.
+    
+    Returns:
+        dict: Names of the cancelled lessons
+    """
+    doc = frappe.get_doc("ESL Lesson Series", series)
+    doc.check_permission("write")
+    
+    return {
+        "lessons": doc.cancel_lessons(from_lesson=from_lesson, reason=reason)
+    }
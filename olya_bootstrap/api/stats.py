@@ -0,0 +1,88 @@
+# Aggregate lesson statistics computed in the database
+
+import frappe
+
+LESSON_STATUSES = ["Scheduled", "In Progress", "Completed", "Cancelled", "Rescheduled"]
+
+def get_time_buckets(now=None):
+    """
+    Return half-open [start, end) datetime ranges for the current week and month.
+    """
+    now = frappe.utils.get_datetime(now or frappe.utils.now_datetime())
+    today = now.date()
+    week_start = frappe.utils.get_first_day_of_week(today)
+    month_start = frappe.utils.get_first_day(today)
+    
+    return {
+        "this_week": (
+            frappe.utils.get_datetime(week_start),
+            frappe.utils.get_datetime(frappe.utils.add_days(week_start, 7))
+        ),
+        "this_month": (
+            frappe.utils.get_datetime(month_start),
+            frappe.utils.get_datetime(frappe.utils.add_days(frappe.utils.get_last_day(today), 1))
+        )
+    }
+
+def get_teacher_lesson_stats(teacher, now=None):
+    """
+    Count a teacher's lessons per status with a single GROUP BY query.
+    
+    Args:
+        teacher: Teacher email
+        now: Reference time for upcoming lessons and time buckets
+    
+    Returns:
+        dict: Totals, per-status counts and this week / this month counts
+    """
+    now = frappe.utils.get_datetime(now or frappe.utils.now_datetime())
+    buckets = get_time_buckets(now)
+    
+    rows = frappe.db.sql("""
+        select
+            status,
+            count(*) as total,
+            sum(case when scheduled_time >= %(now)s then 1 else 0 end) as upcoming,
+            sum(case when scheduled_time >= %(week_start)s and scheduled_time < %(week_end)s then 1 else 0 end) as this_week,
+            sum(case when scheduled_time >= %(month_start)s and scheduled_time < %(month_end)s then 1 else 0 end) as this_month
+        from `tabESL Lesson`
+        where teacher = %(teacher)s
+        group by status
+    """, {
+        "teacher": teacher,
+        "now": now,
+        "week_start": buckets["this_week"][0],
+        "week_end": buckets["this_week"][1],
+        "month_start": buckets["this_month"][0],
+        "month_end": buckets["this_month"][1]
+    }, as_dict=True)
+    
+    by_status = dict.fromkeys(LESSON_STATUSES, 0)
+    stats = {
+        "total_lessons": 0,
+        "completed_lessons": 0,
+        "upcoming_lessons": 0,
+        "by_status": by_status,
+        "this_week": {"total": 0, "by_status": dict.fromkeys(LESSON_STATUSES, 0)},
+        "this_month": {"total": 0, "by_status": dict.fromkeys(LESSON_STATUSES, 0)}
+    }
+    
+    for row in rows:
+        status = row.status or "Scheduled"
+        by_status[status] = by_status.get(status, 0) + row.total
+        stats["total_lessons"] += row.total
+        
+        for bucket in ("this_week", "this_month"):
+            count = frappe.utils.cint(row[bucket])
+            stats[bucket]["total"] += count
+            stats[bucket]["by_status"][status] = stats[bucket]["by_status"].get(status, 0) + count
+        
+        if status == "Scheduled":
+            stats["upcoming_lessons"] += frappe.utils.cint(row.upcoming)
+    
+    stats["completed_lessons"] = by_status["Completed"]
+    return stats
+
+def get_teacher_student_count(teacher):
+    """Count the students assigned to a teacher with COUNT(*)"""
+    return frappe.db.count("ESL Student", {"teacher": teacher})
@@ -0,0 +1,247 @@
+# Bulk student import
+
+import csv
+import io
+import json
+
+import frappe
+from frappe.utils import validate_email_address
+
+from olya_bootstrap.assignment import (
+    STUDENT_LOAD_KEY,
+    assign_teachers_balanced,
+    get_esl_teachers,
+    update_teacher_load
+)
+from olya_bootstrap.portal.cache import clear_portal_cache
+from olya_bootstrap.instrumentation import instrument
+
+MAX_IMPORT_ROWS = 5000
+
+# Columns accepted from the import file, in ESL Student field order
+IMPORT_FIELDS = [
+    "student_name", "email", "phone", "teacher", "level", "goals",
+    "timezone", "preferred_schedule", "emergency_contact", "notes"
+]
+
+@frappe.whitelist(methods=["POST"])
+@instrument
+def import_students(data):
+    """
+    Create many ESL Students (and their User accounts) in one request.
+    
+    Args:
+        data: JSON list of row objects, or CSV text with a header row
+            (Student Name, Email, Phone, Teacher, Level, ...)
+    
+    Returns:
+        dict: created student names and per-row errors (1-based row numbers)
+    """
+    frappe.has_permission("ESL Student", "create", throw=True)
+    
+    rows = parse_import_rows(data)
+    if len(rows) > MAX_IMPORT_ROWS:
+        frappe.throw(f"Cannot import more than {MAX_IMPORT_ROWS} students at once")
+    
+    valid_rows, errors = validate_import_rows(rows)
+    
+    # Balance teacher assignment across the whole batch
+    explicit = {}
+    for _, row in valid_rows:
+        if row.get("teacher"):
+            explicit[row["teacher"]] = explicit.get(row["teacher"], 0) + 1
+    unassigned = [row for _, row in valid_rows if not row.get("teacher")]
+    for row, teacher in zip(unassigned, assign_teachers_balanced(len(unassigned), explicit)):
+        row["teacher"] = teacher
+    
+    students = [row for _, row in valid_rows]
+    insert_students(students)
+    create_user_accounts(students)
+    
+    # Keep load counters and cached portal payloads in sync
+    teacher_counts = {}
+    for row in students:
+        if row.get("teacher"):
+            teacher_counts[row["teacher"]] = teacher_counts.get(row["teacher"], 0) + 1
+    for teacher, count in teacher_counts.items():
+        update_teacher_load(STUDENT_LOAD_KEY, teacher, count)
+    clear_portal_cache(teacher_counts)
+    
+    return {
+        "created": [row["student_name"] for row in students],
+        "errors": errors,
+        "total": len(rows)
+    }
+
+def parse_import_rows(data):
+    """Parse a JSON list or CSV text into row dicts keyed by fieldname"""
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            data = list(csv.DictReader(io.StringIO(data.strip())))
+    
+    if not isinstance(data, list):
+        frappe.throw("Import data must be a list of rows or CSV text")
+    
+    rows = []
+    for row in data:
+        row = row if isinstance(row, dict) else {}
+        normalized = {
+            frappe.scrub(str(key).strip()): (value.strip() if isinstance(value, str) else value)
+            for key, value in row.items() if key
+        }
+        rows.append({field: normalized.get(field) for field in IMPORT_FIELDS})
+    
+    return rows
+
+def validate_import_rows(rows):
+    """
+    Validate rows as a set: required fields, email format, uniqueness within the
+    batch and against existing students (one query), explicit teachers and
+    Select values. Rows are bulk inserted, so nothing else validates them.
+    
+    Returns:
+        tuple: ([(row_number, row)], [{"row": row_number, "error": message}])
+    """
+    emails = {row["email"].lower() for row in rows if row.get("email")}
+    names = {row["student_name"] for row in rows if row.get("student_name")}
+    
+    existing_emails, existing_names = set(), set()
+    if emails or names:
+        for name, email in frappe.db.sql("""
+            select name, email from `tabESL Student`
+            where email in %(emails)s or name in %(names)s
+        """, {"emails": tuple(emails) or ("",), "names": tuple(names) or ("",)}):
+            existing_names.add(name)
+            if email:
+                existing_emails.add(email.lower())
+    
+    teachers = set(get_esl_teachers())
+    select_options = get_select_options()
+    seen_emails, seen_names = set(), set()
+    valid_rows, errors = [], []
+    
+    for row_number, row in enumerate(rows, start=1):
+        error = None
+        email = (row.get("email") or "").lower()
+        
+        if not row.get("student_name"):
+            error = "Student Name is required"
+        elif not email:
+            error = "Email is required"
+        elif not validate_email_address(email):
+            error = f"Invalid email {row['email']}"
+        elif email in existing_emails:
+            error = f"Email {row['email']} is already registered for another student"
+        elif email in seen_emails:
+            error = f"Email {row['email']} appears more than once in this import"
+        elif row["student_name"] in existing_names or row["student_name"] in seen_names:
+            error = f"Student {row['student_name']} already exists"
+        elif row.get("teacher") and row["teacher"] not in teachers:
+            error = f"{row['teacher']} is not an ESL Teacher"
+        else:
+            error = next((
+                f"{frappe.unscrub(field)} must be one of {', '.join(options)}"
+                for field, options in select_options.items()
+                if row.get(field) and row[field] not in options
+            ), None)
+        
+        if error:
+            errors.append({"row": row_number, "error": error})
+            continue
+        
+        row["email"] = email
+        seen_emails.add(email)
+        seen_names.add(row["student_name"])
+        valid_rows.append((row_number, row))
+    
+    return valid_rows, errors
+
+def get_select_options():
+    """{fieldname: allowed values} of the ESL Student Select fields accepted on import"""
+    meta = frappe.get_meta("ESL Student")
+    options = {}
+    for fieldname in IMPORT_FIELDS:
+        field = meta.get_field(fieldname)
+        if field and field.fieldtype == "Select":
+            options[fieldname] = [option for option in (field.options or "").split("\n") if option]
+    return options
+
+def insert_students(students):
+    """Insert validated student rows with one multi-row INSERT per chunk"""
+    if not students:
+        return
+    
+    now = frappe.utils.now()
+    user = frappe.session.user
+    fields = ["name", *IMPORT_FIELDS, "creation", "modified", "owner", "modified_by"]
+    values = [
+        (row["student_name"], *(row.get(field) for field in IMPORT_FIELDS), now, now, user, user)
+        for row in students
+    ]
+    frappe.db.bulk_insert("ESL Student", fields, values)
+
+def create_user_accounts(students):
+    """
+    Create Website Users with the ESL Student role for students without an
+    account, then queue their welcome emails.
+    
+    The Users are bulk inserted without User.validate, so this repeats its
+    checks: each name must be a valid email (validate_import_rows also checks
+    it) and must not collide with the name or email of an existing User.
+    """
+    emails = [row["email"] for row in students if validate_email_address(row["email"])]
+    if not emails:
+        return
+    
+    existing = set()
+    for name, email in frappe.db.sql("""
+        select name, email from `tabUser`
+        where name in %(emails)s or email in %(emails)s
+    """, {"emails": tuple(emails)}):
+        existing.update(value.lower() for value in (name, email) if value)
+    
+    new_emails = set(emails) - existing
+    new_students = [row for row in students if row["email"] in new_emails]
+    if not new_students:
+        return
+    
+    now = frappe.utils.now()
+    user = frappe.session.user
+    users, roles = [], []
+    for row in new_students:
+        name_parts = row["student_name"].split()
+        first_name = name_parts[0] if name_parts else "Student"
+        last_name = " ".join(name_parts[1:])
+        users.append((
+            row["email"], row["email"], first_name, last_name, " ".join(name_parts) or first_name,
+            1, "Website User", 1, now, now, user, user
+        ))
+        roles.append((
+            frappe.generate_hash(length=10), row["email"], "User", "roles", "ESL Student", 1,
+            now, now, user, user
+        ))
+    
+    frappe.db.bulk_insert("User",
+        ["name", "email", "first_name", "last_name", "full_name", "enabled", "user_type",
+            "send_welcome_email", "creation", "modified", "owner", "modified_by"],
+        users)
+    frappe.db.bulk_insert("Has Role",
+        ["name", "parent", "parenttype", "parentfield", "role", "idx", "creation", "modified", "owner", "modified_by"],
+        roles)
+    
+    frappe.enqueue(
+        "olya_bootstrap.api.students.send_welcome_emails",
+        queue="long",
+        enqueue_after_commit=True,
+        users=[row["email"] for row in new_students]
+    )
+
+def send_welcome_emails(users):
+    """Background job: send welcome emails to newly imported students"""
+    for user in users:
+        try:
+            frappe.get_doc("User", user).send_welcome_mail_to_user()
+        except Exception as e:
+            frappe.log_error(f"Failed to send welcome email to {user}: {str(e)}")
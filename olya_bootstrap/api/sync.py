@@ -0,0 +1,161 @@
+# Incremental calendar sync
+
+import base64
+import json
+from datetime import timedelta
+
+import frappe
+
+from olya_bootstrap.api.calendar import MAX_CALENDAR_PAGE_LENGTH, get_calendar_events, serialize_calendar_events
+from olya_bootstrap.api.history import scope_lesson_filters
+from olya_bootstrap.doctype.esl_lesson_tombstone.esl_lesson_tombstone import TOMBSTONE_RETENTION_DAYS
+from olya_bootstrap.instrumentation import instrument
+
+SYNC_TOKEN_VERSION = 1
+
+# Re-read changes this far behind the previous sync so rows written by
+# transactions that committed after it started are not missed
+SYNC_OVERLAP_SECONDS = 30
+
+@frappe.whitelist()
+@instrument
+def sync_lesson_calendar(sync_token=None, student=None, teacher=None, start=None, end=None, limit=None,
+        timezone=None):
+    """
+    Return the lessons created, changed or deleted since `sync_token`.
+    
+    Without a token (or with one that has expired) the lessons in the
+    start/end window are returned in full and `reset` is set, so the client
+    replaces its events instead of merging them. Events use the same
+    FullCalendar shape as get_lesson_calendar_data; a few events may be sent
+    again and should be applied as upserts.
+    
+    As with get_lesson_history, only admin roles may pick any student or
+    teacher; everyone else syncs their own lessons.
+    
+    Args:
+        sync_token: Token returned by the previous call
+        student: Filter by student name
+        teacher: Filter by teacher email
+        start: Window start for a full reload
+        end: Window end for a full reload
+        limit: Maximum number of changed events per call
+        timezone: IANA timezone to render event times in, as in get_lesson_calendar_data
+    
+    Returns:
+        dict: events, deleted lesson names, the next sync_token, has_more and reset
+    """
+    frappe.has_permission("ESL Lesson", "read", throw=True)
+    student, teacher = scope_lesson_filters(student, teacher)
+    
+    started = frappe.utils.now_datetime()
+    since = parse_sync_token(sync_token)
+    
+    if not since:
+        return {
+            "events": get_calendar_events(student=student, teacher=teacher, start=start, end=end, timezone=timezone),
+            "deleted": [],
+            "sync_token": make_sync_token(started - timedelta(seconds=SYNC_OVERLAP_SECONDS)),
+            "has_more": False,
+            "reset": True
+        }
+    
+    after_modified, after_name = since
+    limit = min(frappe.utils.cint(limit) or MAX_CALENDAR_PAGE_LENGTH, MAX_CALENDAR_PAGE_LENGTH)
+    changed = get_changed_lessons(after_modified, after_name, student, teacher, limit + 1)
+    deleted = get_deleted_lessons(after_modified, student, teacher)
+    
+    has_more = len(changed) > limit
+    if has_more:
+        changed = changed[:limit]
+        # Continue from the last row returned, without overlap
+        next_token = make_sync_token(changed[-1].modified, changed[-1].name)
+    else:
+        next_token = make_sync_token(started - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+    
+    changed_names = {lesson.name for lesson in changed}
+    return {
+        "events": serialize_calendar_events(changed, student, teacher, timezone),
+        # A lesson moved back to this user after leaving a tombstone is live again
+        "deleted": [name for name in deleted if name not in changed_names],
+        "sync_token": next_token,
+        "has_more": has_more,
+        "reset": False
+    }
+
+def get_changed_lessons(after_modified, after_name, student=None, teacher=None, limit=MAX_CALENDAR_PAGE_LENGTH):
+    """Lessons of a student and/or teacher modified after the (modified, name) position, in that order"""
+    if not student and not teacher:
+        frappe.throw("Set a student or a teacher")
+    
+    conditions = ["(lesson.modified > %(modified)s or (lesson.modified = %(modified)s and lesson.name > %(name)s))"]
+    values = {"modified": after_modified, "name": after_name, "limit": limit}
+    
+    if student:
+        conditions.append("lesson.student = %(student)s")
+        values["student"] = student
+    if teacher:
+        conditions.append("lesson.teacher = %(teacher)s")
+        values["teacher"] = teacher
+    
+    return frappe.db.sql(f"""
+        select
+            lesson.name, lesson.title, lesson.student, lesson.teacher,
+            lesson.scheduled_time, lesson.scheduled_end, lesson.scheduled_time_utc,
+            lesson.duration, lesson.status, lesson.meet_link, lesson.modified,
+            student.student_name, student.timezone as student_timezone
+        from `tabESL Lesson` lesson
+        left join `tabESL Student` student on student.name = lesson.student
+        where {" and ".join(conditions)}
+        order by lesson.modified, lesson.name
+        limit %(limit)s
+    """, values, as_dict=True)
+
+def get_deleted_lessons(after_modified, student=None, teacher=None):
+    """Names of lessons deleted, or moved away from the student/teacher, since `after_modified`"""
+    if not student and not teacher:
+        frappe.throw("Set a student or a teacher")
+    
+    conditions = ["deleted_at >= %(since)s"]
+    values = {"since": after_modified}
+    
+    if student:
+        conditions.append("student = %(student)s")
+        values["student"] = student
+    if teacher:
+        conditions.append("teacher = %(teacher)s")
+        values["teacher"] = teacher
+    
+    return frappe.db.sql_list(f"""
+        select distinct lesson
+        from `tabESL Lesson Tombstone` tombstone
+        where {" and ".join(conditions)}
+    """, values)
+
+def make_sync_token(modified, name=""):
+    payload = json.dumps({"v": SYNC_TOKEN_VERSION, "m": str(modified), "n": name})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def parse_sync_token(token):
+    """
+    Decode a sync token into its (modified, name) position.
+    
+    Returns None for a missing, malformed or expired token, which triggers a full reload.
+    """
+    if not token:
+        return None
+    
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if payload.get("v") != SYNC_TOKEN_VERSION:
+            return None
+        modified = frappe.utils.get_datetime(payload["m"])
+        name = payload.get("n") or ""
+    except Exception:
+        return None
+    
+    # Tombstones older than the retention period are gone
+    if modified < frappe.utils.add_days(frappe.utils.now_datetime(), -TOMBSTONE_RETENTION_DAYS):
+        return None
+    
+    return modified, name
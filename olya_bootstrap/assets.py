@@ -0,0 +1,36 @@
+# URLs of the fingerprinted static assets written by olya_bootstrap/build_assets.py
+
+import functools
+import json
+import os
+
+ASSETS_URL = "/assets/olya_bootstrap"
+PUBLIC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public")
+MANIFEST_PATH = os.path.join(PUBLIC_PATH, "dist", "manifest.json")
+
+@functools.lru_cache(maxsize=None)
+def get_asset_manifest():
+    """{source path: fingerprinted path} under public/, read once per process"""
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def olya_asset_url(path):
+    """
+    URL of a public/ asset (e.g. "css/olya.css"): its minified, content-hashed
+    build when one exists, else the source file itself.
+    
+    Used in hooks.py and, as a Jinja method, in the www pages.
+    """
+    return f"{ASSETS_URL}/{get_asset_manifest().get(path, path)}"
+
+@functools.lru_cache(maxsize=None)
+def olya_inline_asset(path):
+    """
+    Contents of the minified build of a public/ asset, for page-specific
+    stylesheets that are cheaper inlined than fetched before first paint.
+    """
+    with open(os.path.join(PUBLIC_PATH, get_asset_manifest().get(path, path))) as f:
+        return f.read().strip()
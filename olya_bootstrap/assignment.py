@@ -0,0 +1,156 @@
+# Load-aware teacher assignment
+
+import heapq
+
+import frappe
+
+# Cached list of enabled users holding the ESL Teacher role
+TEACHER_LIST_KEY = "olya_esl_teachers"
+
+# Redis hashes of teacher -> count, maintained incrementally by doc events
+STUDENT_LOAD_KEY = "olya_teacher_student_load"
+LESSON_LOAD_KEY = "olya_teacher_lesson_load"
+
+# Marks a load hash as built even when no teacher has any load yet
+BUILT_MARKER = "__built__"
+
+def get_esl_teachers():
+    """Return enabled ESL Teachers, resolved with a single Has Role join and cached"""
+    teachers = frappe.cache().get_value(TEACHER_LIST_KEY)
+    if teachers is None:
+        teachers = frappe.db.sql_list("""
+            select distinct user.name
+            from `tabUser` user
+            inner join `tabHas Role` has_role
+                on has_role.parent = user.name and has_role.parenttype = 'User'
+            where has_role.role = 'ESL Teacher' and user.enabled = 1
+            order by user.name
+        """)
+        frappe.cache().set_value(TEACHER_LIST_KEY, teachers)
+    
+    return teachers
+
+def clear_teacher_cache(doc=None, method=None):
+    """Forget the cached teacher list (User doc event)"""
+    frappe.cache().delete_value(TEACHER_LIST_KEY)
+
+def pick_least_loaded_teacher():
+    """
+    Pick the ESL Teacher with the fewest students, then the fewest upcoming lessons.
+    
+    Returns:
+        str: Teacher email, or None if there are no ESL Teachers
+    """
+    return assign_teachers_balanced(1)[0]
+
+def assign_teachers_balanced(count, extra_students=None):
+    """
+    Pick teachers for `count` new students, spreading them over the least-loaded teachers.
+    
+    Args:
+        count: Number of students to assign
+        extra_students: {teacher: n} students already headed to a teacher in the same batch
+    
+    Returns:
+        list: `count` teacher emails (None entries if there are no ESL Teachers)
+    """
+    teachers = get_esl_teachers()
+    if not teachers:
+        return [None] * count
+    
+    extra_students = extra_students or {}
+    loads = get_teacher_loads(teachers)
+    heap = [
+        (students + extra_students.get(teacher, 0), lessons, teacher)
+        for teacher, (students, lessons) in loads.items()
+    ]
+    heapq.heapify(heap)
+    
+    assigned = []
+    for _ in range(count):
+        students, lessons, teacher = heapq.heappop(heap)
+        assigned.append(teacher)
+        heapq.heappush(heap, (students + 1, lessons, teacher))
+    
+    return assigned
+
+def get_teacher_loads(teachers):
+    """
+    Return {teacher: (student_count, upcoming_lesson_count)} from the cached counters.
+    """
+    cache = frappe.cache()
+    # The wrapper's exists applies make_key itself; hmget is a raw command
+    if cache.exists(STUDENT_LOAD_KEY, LESSON_LOAD_KEY) < 2:
+        rebuild_teacher_load()
+    
+    students = cache.hmget(cache.make_key(STUDENT_LOAD_KEY), teachers)
+    lessons = cache.hmget(cache.make_key(LESSON_LOAD_KEY), teachers)
+    
+    return {
+        teacher: (frappe.utils.cint(student_count), frappe.utils.cint(lesson_count))
+        for teacher, student_count, lesson_count in zip(teachers, students, lessons)
+    }
+
+def rebuild_teacher_load():
+    """Recompute the per-teacher load counters from the database (also run daily)"""
+    student_counts = frappe.db.sql("""
+        select teacher, count(*)
+        from `tabESL Student`
+        where ifnull(teacher, '') != ''
+        group by teacher
+    """)
+    lesson_counts = frappe.db.sql("""
+        select teacher, count(*)
+        from `tabESL Lesson`
+        where status = 'Scheduled' and scheduled_time >= %s and ifnull(teacher, '') != ''
+        group by teacher
+    """, frappe.utils.now_datetime())
+    
+    cache = frappe.cache()
+    pipeline = cache.pipeline()
+    for key, counts in ((STUDENT_LOAD_KEY, student_counts), (LESSON_LOAD_KEY, lesson_counts)):
+        key = cache.make_key(key)
+        pipeline.delete(key)
+        pipeline.hset(key, mapping={BUILT_MARKER: 1, **dict(counts)})
+    pipeline.execute()
+
+def update_teacher_load(key, teacher, delta):
+    """Adjust one teacher counter; skipped until the counters have been built"""
+    if not teacher or not delta:
+        return
+    
+    cache = frappe.cache()
+    if cache.exists(key):
+        cache.hincrby(cache.make_key(key), teacher, delta)
+
+def is_upcoming_lesson(lesson):
+    return bool(
+        lesson.status == "Scheduled"
+        and lesson.scheduled_time
+        and frappe.utils.get_datetime(lesson.scheduled_time) >= frappe.utils.now_datetime()
+    )
+
+def update_load_for_student(doc, method=None):
+    """Keep the student counters in sync (ESL Student doc event)"""
+    if method == "on_trash":
+        old_teacher, new_teacher = doc.teacher, None
+    else:
+        previous = doc.get_doc_before_save()
+        old_teacher, new_teacher = (previous.teacher if previous else None), doc.teacher
+    
+    if old_teacher != new_teacher:
+        update_teacher_load(STUDENT_LOAD_KEY, old_teacher, -1)
+        update_teacher_load(STUDENT_LOAD_KEY, new_teacher, 1)
+
+def update_load_for_lesson(doc, method=None):
+    """Keep the upcoming lesson counters in sync (ESL Lesson doc event)"""
+    if method == "on_trash":
+        before, after = (doc.teacher, is_upcoming_lesson(doc)), (None, False)
+    else:
+        previous = doc.get_doc_before_save()
+        before = (previous.teacher, is_upcoming_lesson(previous)) if previous else (None, False)
+        after = (doc.teacher, is_upcoming_lesson(doc))
+    
+    if before != after:
+        update_teacher_load(LESSON_LOAD_KEY, before[0], -1 if before[1] else 0)
+        update_teacher_load(LESSON_LOAD_KEY, after[0], 1 if after[1] else 0)
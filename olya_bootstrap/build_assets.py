@@ -0,0 +1,172 @@
+"""
+Build the fingerprinted static assets served from public/dist.
+
+Minifies the stylesheets and scripts listed in ASSET_SOURCES, names each build
+after a hash of its content and writes gzip and brotli copies next to it for
+nginx's gzip_static / brotli_static. Needs the brotli package (requirements-dev.txt).
+public/dist/manifest.json maps each source to its build; hooks.py and the www
+pages resolve URLs through olya_bootstrap.assets.olya_asset_url, so a changed
+file always gets a new URL and every build can be cached as immutable.
+    
+    python -m olya_bootstrap.build_assets
+    python -m olya_bootstrap.build_assets --check
+
+Run it after editing anything in ASSET_SOURCES and commit public/dist;
+--check exits non-zero when the committed build is out of date.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+from olya_bootstrap.assets import MANIFEST_PATH, PUBLIC_PATH
+
+try:
+    import brotli
+except ImportError:
+    # Only the build needs it; get_asset_manifest and the hooks do not import this module
+    brotli = None
+
+# Paths under public/
+ASSET_SOURCES = [
+    "css/olya.css",
+    "css/home.css",
+    "js/home.js",
+    "css/whiteboard.css",
+    "js/whiteboard.js"
+]
+DIST_DIR = "dist"
+HASH_LENGTH = 8
+
+CSS_STRING = r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')"""
+CSS_STRING_OR_COMMENT = re.compile(CSS_STRING + r"|/\*.*?\*/", re.S)
+
+def minify_css(source):
+    """Drop comments and collapse whitespace, leaving quoted strings untouched"""
+    source = CSS_STRING_OR_COMMENT.sub(lambda match: match.group(1) or " ", source)
+    
+    parts = []
+    position = 0
+    for match in re.finditer(CSS_STRING, source):
+        parts.append(squeeze_css(source[position:match.start()]))
+        parts.append(match.group(1))
+        position = match.end()
+    parts.append(squeeze_css(source[position:]))
+    return "".join(parts).strip() + "\n"
+
+def squeeze_css(text):
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r" ?([{};,>]) ?", r"\1", text)
+    # Only the space after a colon: the one before it separates selectors like ".a :hover"
+    return text.replace(": ", ":").replace(";}", "}")
+
+def minify_js(source):
+    """
+    Drop indentation, blank lines and whole-line // comments. Line breaks are
+    kept so automatic semicolon insertion is unaffected, and lines inside
+    multi-line template literals are left as they are.
+    """
+    lines = []
+    in_template = False
+    for line in source.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith("//"):
+                lines.append(stripped)
+        if (line.count("`") - line.count("\\`")) % 2:
+            in_template = not in_template
+    return "\n".join(lines) + "\n"
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+def build_asset(path):
+    """Return (build path, {file path: bytes}) for one source under public/"""
+    with open(os.path.join(PUBLIC_PATH, path)) as f:
+        source = f.read()
+    
+    stem, extension = os.path.splitext(path)
+    content = MINIFIERS[extension](source).encode()
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    build_path = f"{DIST_DIR}/{stem}.{digest}{extension}"
+    
+    files = {
+        build_path: content,
+        # mtime=0 keeps the archive identical across builds of the same content
+        f"{build_path}.gz": gzip.compress(content, compresslevel=9, mtime=0),
+        f"{build_path}.br": brotli.compress(content, quality=11)
+    }
+    return build_path, files
+
+def build_all():
+    """Return the manifest and every output file, without writing anything"""
+    manifest, files = {}, {}
+    for path in ASSET_SOURCES:
+        manifest[path], asset_files = build_asset(path)
+        files.update(asset_files)
+    files[os.path.relpath(MANIFEST_PATH, PUBLIC_PATH)] = (json.dumps(manifest, indent=1, sort_keys=True) + "\n").encode()
+    return manifest, files
+
+def get_existing_files():
+    dist_path = os.path.join(PUBLIC_PATH, DIST_DIR)
+    return {
+        os.path.relpath(os.path.join(root, name), PUBLIC_PATH).replace(os.sep, "/")
+        for root, _, names in os.walk(dist_path)
+        for name in names
+    }
+
+def read_bytes(path):
+    with open(os.path.join(PUBLIC_PATH, path), "rb") as f:
+        return f.read()
+
+def get_sizes(manifest, files):
+    return {
+        path: {
+            "source_bytes": os.path.getsize(os.path.join(PUBLIC_PATH, path)),
+            "min_bytes": len(files[build_path]),
+            "gzip_bytes": len(files[f"{build_path}.gz"]),
+            "brotli_bytes": len(files[f"{build_path}.br"])
+        }
+        for path, build_path in manifest.items()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Only report whether public/dist is up to date")
+    args = parser.parse_args()
+    
+    # Without it neither the .br files nor --check could be trusted
+    if not brotli:
+        sys.exit("brotli is not installed, run pip install -r requirements-dev.txt")
+    
+    manifest, files = build_all()
+    existing = get_existing_files()
+    
+    stale = existing - set(files)
+    changed = {path for path, content in files.items() if path not in existing or read_bytes(path) != content}
+    
+    if args.check:
+        if stale or changed:
+            print(f"public/{DIST_DIR} is out of date, run python -m olya_bootstrap.build_assets", file=sys.stderr)
+            for path in sorted(stale | changed):
+                print(f"  {path}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    for path in sorted(changed):
+        target = os.path.join(PUBLIC_PATH, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(files[path])
+    for path in sorted(stale):
+        os.remove(os.path.join(PUBLIC_PATH, path))
+    
+    print(json.dumps(get_sizes(manifest, files), indent=2))
+
+if __name__ == "__main__":
+    main()
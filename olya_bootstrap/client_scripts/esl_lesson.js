@@ -11,6 +11,12 @@ frappe.ui.form.on('ESL Lesson', {
         
         // Add real-time status updates
         setup_status_updates(frm);
+        
+        // Receive Meet links provisioned in the background
+        setup_meet_link_listener(frm);
+        
+        // Apply lesson changes pushed by the server
+        setup_lesson_change_listener(frm);
     },
     
     student(frm) {
@@ -48,40 +54,21 @@ function add_custom_buttons(frm) {
     frm.clear_custom_buttons();
     
     // Create Google Meet Link button
-    if (!frm.doc.meet_link && frm.doc.scheduled_time) {
+    if (!frm.doc.meet_link && frm.doc.scheduled_time && !frm.is_new()) {
         frm.add_custom_button('Create Meet Link', async () => {
             try {
                 frm.dashboard.set_headline_alert('Creating Google Meet link...', 'blue');
                 
-                // Get student email
-                let student_email = null;
-                if (frm.doc.student) {
-                    const student_data = await frappe.db.get_value('ESL Student', frm.doc.student, 'email');
-                    student_email = student_data.message?.email;
-                }
-                
-                // Call API to create meet link
+                // Queue link creation; the result arrives over realtime
                 const response = await frappe.call({
-                    method: 'olya_bootstrap.api.calendar.create_google_meet',
+                    method: 'olya_bootstrap.api.calendar.request_meet_link',
                     args: {
-                        title: frm.doc.title,
-                        when: frm.doc.scheduled_time,
-                        student_email: student_email
+                        lesson_id: frm.doc.name
                     }
                 });
                 
-                if (response.message && response.message.meet_link) {
-                    frm.set_value('meet_link', response.message.meet_link);
-                    await frm.save();
-                    
-                    frm.dashboard.clear_headline();
-                    frappe.show_alert({
-                        message: 'Google Meet link created and saved!',
-                        indicator: 'green'
-                    });
-                    
-                    // Refresh buttons
-                    add_custom_buttons(frm);
+                if (response.message && response.message.status === 'exists') {
+                    frm.reload_doc();
                 }
             } catch (error) {
                 frm.dashboard.clear_headline();
@@ -146,6 +133,92 @@ function add_custom_buttons(frm) {
     }
 }
 
+function setup_meet_link_listener(frm) {
+    if (frm.meet_link_listener) {
+        return;
+    }
+    
+    frm.meet_link_listener = (data) => {
+        if (data.lesson !== frm.doc.name) {
+            return;
+        }
+        
+        frm.dashboard.clear_headline();
+        
+        if (data.error) {
+            frappe.msgprint({
+                title: 'Error',
+                message: 'Failed to create Meet link. Please check Google API configuration.',
+                indicator: 'red'
+            });
+            return;
+        }
+        
+        // Apply the stored values without saving the form again
+        frm.doc.meet_link = data.meet_link;
+        frm.doc.calendar_event_id = data.calendar_event_id;
+        if (data.modified) {
+            frm.doc.modified = data.modified;
+        }
+        frm.refresh_field('meet_link');
+        
+        frappe.show_alert({
+            message: 'Google Meet link created and saved!',
+            indicator: 'green'
+        });
+        
+        // Refresh buttons
+        add_custom_buttons(frm);
+    };
+    frappe.realtime.on('olya_meet_link_ready', frm.meet_link_listener);
+}
+
+function setup_lesson_change_listener(frm) {
+    if (frm.lesson_change_listener) {
+        return;
+    }
+    
+    frm.lesson_change_listener = (data) => {
+        const change = (data.changes || []).find(c => c.lesson === frm.doc.name);
+        if (!change || frm.is_new()) {
+            return;
+        }
+        
+        if (change.action === 'delete') {
+            frappe.show_alert({
+                message: 'This lesson was deleted or moved to another teacher or student',
+                indicator: 'red'
+            });
+            return;
+        }
+        
+        // Skip changes the form already has, e.g. from its own save
+        if (change.modified && change.modified <= frm.doc.modified) {
+            return;
+        }
+        
+        // Never overwrite unsaved edits
+        if (frm.is_dirty()) {
+            frappe.show_alert({
+                message: 'This lesson was changed elsewhere. Reload to see the changes.',
+                indicator: 'orange'
+            });
+            return;
+        }
+        
+        // Apply only the changed fields without reloading or saving the form
+        Object.entries(change.changed || {}).forEach(([fieldname, value]) => {
+            frm.doc[fieldname] = value;
+            frm.refresh_field(fieldname);
+        });
+        frm.doc.modified = change.modified;
+        
+        add_custom_buttons(frm);
+        setup_status_updates(frm);
+    };
+    frappe.realtime.on('olya_lesson_changed', frm.lesson_change_listener);
+}
+
 function style_form(frm) {
     // Add custom CSS for better form styling
     if (!document.getElementById('olya-lesson-styles')) {
@@ -279,6 +352,41 @@ window.olya_lesson_utils = {
         return colors[status] || '#6b7280';
     },
     
+    bindCalendar: function(calendar) {
+        // Keep a FullCalendar instance current from pushed lesson changes instead of refetching;
+        // bursts (e.g. a whole series) are applied in one render
+        let queued = [];
+        let timer = null;
+        
+        const apply = () => {
+            const changes = queued;
+            queued = [];
+            timer = null;
+            
+            calendar.batchRendering(() => {
+                changes.forEach(change => {
+                    const existing = calendar.getEventById(change.lesson);
+                    if (existing) {
+                        existing.remove();
+                    }
+                    if (change.action !== 'delete' && change.event) {
+                        calendar.addEvent(change.event);
+                    }
+                });
+            });
+        };
+        
+        const listener = (data) => {
+            queued.push(...(data.changes || []));
+            if (!timer) {
+                timer = setTimeout(apply, 250);
+            }
+        };
+        frappe.realtime.on('olya_lesson_changed', listener);
+        
+        return () => frappe.realtime.off('olya_lesson_changed', listener);
+    },
+    
     copyMeetLink: function(link) {
         navigator.clipboard.writeText(link).then(() => {
             frappe.show_alert({
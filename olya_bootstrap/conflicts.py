@@ -0,0 +1,151 @@
+# Scheduling conflict detection for teachers and students
+
+from bisect import bisect_left, insort
+from datetime import timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import frappe
+
+# Lessons in these states occupy the teacher's and student's time
+ACTIVE_STATUSES = ("Scheduled", "In Progress")
+
+# Upper bound on lesson duration; bounds the overlap range scan
+MAX_LESSON_DURATION = 8 * 60
+
+def get_lesson_end(scheduled_time, duration):
+    return frappe.utils.get_datetime(scheduled_time) + timedelta(minutes=frappe.utils.cint(duration) or 60)
+
+def get_lesson_start_utc(scheduled_time):
+    """Lessons are stored as naive system-timezone datetimes; return the naive UTC equivalent"""
+    start = frappe.utils.get_datetime(scheduled_time).replace(tzinfo=ZoneInfo(frappe.utils.get_system_timezone()))
+    return start.astimezone(timezone.utc).replace(tzinfo=None)
+
+class IntervalIndex:
+    """
+    Sorted index of half-open [start, end) intervals for batch overlap checks.
+    
+    Intervals are kept ordered by start; a lookup only scans the starts that
+    fall within the longest stored interval of the query window.
+    """
+    def __init__(self):
+        self.intervals = []
+        self.max_length = timedelta(0)
+    
+    def add(self, start, end, key=None):
+        insort(self.intervals, (start, end, key or ""))
+        self.max_length = max(self.max_length, end - start)
+    
+    def overlapping(self, start, end):
+        """Return stored (start, end, key) intervals overlapping [start, end)"""
+        low = bisect_left(self.intervals, (start - self.max_length,))
+        high = bisect_left(self.intervals, (end,))
+        return [interval for interval in self.intervals[low:high] if interval[1] > start]
+
+def get_lesson_conflicts(scheduled_time, duration, teacher=None, student=None, lesson=None):
+    """
+    Find active lessons of the teacher or student overlapping a time slot.
+    
+    Uses the (teacher|student, scheduled_time) indexes with a range bounded by
+    MAX_LESSON_DURATION and the stored scheduled_end.
+    
+    Returns:
+        list: Conflicting lessons (name, title, teacher, student, scheduled_time, scheduled_end)
+    """
+    if not teacher and not student:
+        return []
+    
+    start = frappe.utils.get_datetime(scheduled_time)
+    values = {
+        "start": start,
+        "end": get_lesson_end(start, duration),
+        "earliest": start - timedelta(minutes=MAX_LESSON_DURATION),
+        "lesson": lesson or "",
+        "statuses": ACTIVE_STATUSES,
+        "teacher": teacher,
+        "student": student
+    }
+    
+    queries = []
+    for field in ("teacher", "student"):
+        if values[field]:
+            queries.append(f"""
+                select name, title, teacher, student, scheduled_time, scheduled_end
+                from `tabESL Lesson`
+                where {field} = %({field})s
+                    and scheduled_time > %(earliest)s and scheduled_time < %(end)s
+                    and scheduled_end > %(start)s
+                    and status in %(statuses)s
+                    and name != %(lesson)s
+            """)
+    
+    return frappe.db.sql(" union ".join(queries) + " order by scheduled_time", values, as_dict=True)
+
+def find_batch_conflicts(lessons, exclude=None):
+    """
+    Check many proposed lessons at once, against the database and each other.
+    
+    Args:
+        lessons: dicts with scheduled_time, duration, teacher, student and an optional name
+        exclude: lesson names to ignore in the database (e.g. lessons being rescheduled)
+    
+    Returns:
+        list: {"index", "name", "conflicts"} for each proposed lesson that overlaps
+    """
+    if not lessons:
+        return []
+    
+    exclude = set(exclude or []) | {lesson.get("name") for lesson in lessons if lesson.get("name")}
+    slots = [
+        (frappe.utils.get_datetime(lesson["scheduled_time"]), get_lesson_end(lesson["scheduled_time"], lesson.get("duration")))
+        for lesson in lessons
+    ]
+    teachers = tuple({lesson.get("teacher") for lesson in lessons if lesson.get("teacher")}) or ("",)
+    students = tuple({lesson.get("student") for lesson in lessons if lesson.get("student")}) or ("",)
+    
+    # Load every active lesson of the participants inside the batch window in one query
+    existing = frappe.db.sql("""
+        select name, teacher, student, scheduled_time, scheduled_end
+        from `tabESL Lesson`
+        where (teacher in %(teachers)s or student in %(students)s)
+            and scheduled_time > %(earliest)s and scheduled_time < %(end)s
+            and scheduled_end > %(start)s
+            and status in %(statuses)s
+    """, {
+        "teachers": teachers,
+        "students": students,
+        "start": min(start for start, _ in slots),
+        "end": max(end for _, end in slots),
+        "earliest": min(start for start, _ in slots) - timedelta(minutes=MAX_LESSON_DURATION),
+        "statuses": ACTIVE_STATUSES
+    }, as_dict=True)
+    
+    indexes = {}
+    def get_index(field, value):
+        return indexes.setdefault((field, value), IntervalIndex())
+    
+    for row in existing:
+        if row.name in exclude:
+            continue
+        for field in ("teacher", "student"):
+            if row[field]:
+                get_index(field, row[field]).add(
+                    frappe.utils.get_datetime(row.scheduled_time), frappe.utils.get_datetime(row.scheduled_end), row.name
+                )
+    
+    conflicts = []
+    for index, (lesson, (start, end)) in enumerate(zip(lessons, slots)):
+        key = lesson.get("name") or f"#{index}"
+        overlapping = set()
+        for field in ("teacher", "student"):
+            if lesson.get(field):
+                overlapping.update(interval[2] for interval in get_index(field, lesson[field]).overlapping(start, end))
+        
+        if overlapping:
+            conflicts.append({"index": index, "name": lesson.get("name"), "conflicts": sorted(overlapping)})
+        
+        # Later lessons in the batch must not overlap this one either
+        for field in ("teacher", "student"):
+            if lesson.get(field):
+                get_index(field, lesson[field]).add(start, end, key)
+    
+    return conflicts
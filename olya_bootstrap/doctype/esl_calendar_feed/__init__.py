@@ -0,0 +1 @@
+# ESL Calendar Feed DocType
@@ -0,0 +1,25 @@
+import frappe
+from frappe.model.document import Document
+
+class ESLCalendarFeed(Document):
+    def before_insert(self):
+        """Generate the secret token used in the feed URL"""
+        if not self.feed_token:
+            self.feed_token = frappe.generate_hash(length=32)
+    
+    def reset_token(self):
+        """Invalidate the current feed URL by issuing a new token"""
+        self.feed_token = frappe.generate_hash(length=32)
+        self.save(ignore_permissions=True)
+
+def get_feed_token(user, reset=False):
+    """Return the feed token of a user, creating their feed on first use"""
+    if not frappe.db.exists("ESL Calendar Feed", user):
+        feed = frappe.get_doc({"doctype": "ESL Calendar Feed", "user": user})
+        feed.insert(ignore_permissions=True)
+        return feed.feed_token
+    
+    feed = frappe.get_doc("ESL Calendar Feed", user)
+    if reset:
+        feed.reset_token()
+    return feed.feed_token
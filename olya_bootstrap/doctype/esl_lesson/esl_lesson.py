@@ -1,11 +1,94 @@
+import re
+
 import frappe
 from frappe.model.document import Document
 from datetime import datetime, timedelta
 
+from olya_bootstrap.conflicts import (ACTIVE_STATUSES, MAX_LESSON_DURATION, get_lesson_conflicts, get_lesson_end,
+    get_lesson_start_utc)
+
+# Composite indexes backing the teacher/student/status lookups by time,
+# and the per-user change scans of calendar sync
+LESSON_INDEXES = [
+    ["teacher", "scheduled_time"],
+    ["student", "scheduled_time"],
+    ["status", "scheduled_time"],
+    ["teacher", "modified"],
+    ["student", "modified"]
+]
+
+def on_doctype_update():
+    """Create composite indexes for the lesson access paths"""
+    for columns in LESSON_INDEXES:
+        frappe.db.add_index("ESL Lesson", columns)
+
+def get_lesson_naming():
+    """
+    Return (name prefix, tabSeries key, digits) of the ESL Lesson autoname,
+    e.g. ("LESSON-", "", 4) for "format:LESSON-{####}".
+    
+    frappe.model.naming parses each braced part of a format: autoname on its
+    own, so the counter is keyed by the text before the hashes inside the
+    braces, not by the name prefix in front of them.
+    """
+    autoname = frappe.get_meta("ESL Lesson").autoname
+    match = re.fullmatch(r"format:([^{]*)\{([^{}#]*)(#+)\}", autoname or "")
+    if not match:
+        frappe.throw(f"Cannot reserve lesson names for autoname {autoname}")
+    prefix, key, digits = match.groups()
+    return prefix, key, len(digits)
+
+def reserve_lesson_names(count):
+    """
+    Reserve `count` consecutive lesson names with a single counter update,
+    for lessons written with a bulk insert instead of Document.insert.
+    """
+    if count <= 0:
+        return []
+    
+    prefix, key, digits = get_lesson_naming()
+    # The upsert creates the counter or locks and advances it in one statement
+    frappe.db.sql("""
+        insert into `tabSeries` (name, current) values (%(key)s, %(count)s)
+        on duplicate key update current = current + %(count)s
+    """, {"key": key, "count": count})
+    end = frappe.utils.cint(frappe.db.sql("select current from `tabSeries` where name = %s", key)[0][0])
+    
+    return [f"{prefix}{key}{index:0{digits}d}" for index in range(end - count + 1, end + 1)]
+
+def set_lesson_start_utc(lessons):
+    """
+    Store scheduled_time_utc for lessons written without Document.save, with
+    one UPDATE per distinct UTC offset instead of one per lesson.
+    
+    Args:
+        lessons: Rows with the name and the stored scheduled_time of each lesson
+    """
+    names_by_shift = {}
+    for lesson in lessons:
+        if not lesson.scheduled_time:
+            continue
+        start = frappe.utils.get_datetime(lesson.scheduled_time)
+        shift = int((get_lesson_start_utc(start) - start).total_seconds())
+        names_by_shift.setdefault(shift, []).append(lesson.name)
+    
+    for shift, names in names_by_shift.items():
+        frappe.db.sql("""
+            update `tabESL Lesson`
+            set scheduled_time_utc = timestampadd(second, %(shift)s, scheduled_time)
+            where name in %(names)s
+        """, {"shift": shift, "names": names})
+
 class ESLLesson(Document):
     def validate(self):
         """Validate ESL Lesson data"""
+        if frappe.utils.cint(self.duration) > MAX_LESSON_DURATION:
+            frappe.throw(f"Lesson duration cannot exceed {MAX_LESSON_DURATION} minutes")
+        
         if self.scheduled_time:
+            self.scheduled_end = get_lesson_end(self.scheduled_time, self.duration)
+            self.scheduled_time_utc = get_lesson_start_utc(self.scheduled_time)
+            
             # Ensure lesson is not scheduled in the past
             if frappe.utils.get_datetime(self.scheduled_time) < frappe.utils.now_datetime():
                 if self.status == "Scheduled":
@@ -16,9 +99,33 @@ class ESLLesson(Document):
             student_doc = frappe.get_doc("ESL Student", self.student)
             if student_doc.teacher:
                 self.teacher = student_doc.teacher
+        
+        self.validate_conflicts()
+    
+    def validate_conflicts(self):
+        """Reject double-booking of the teacher or the student"""
+        if not self.scheduled_time or self.status not in ACTIVE_STATUSES:
+            return
+        
+        previous = self.get_doc_before_save()
+        if previous and all(previous.get(field) == self.get(field)
+                for field in ("scheduled_time", "duration", "teacher", "student", "status")):
+            return
+        
+        conflicts = get_lesson_conflicts(self.scheduled_time, self.duration,
+            teacher=self.teacher, student=self.student, lesson=self.name)
+        if conflicts:
+            details = ", ".join(
+                f"{c.name} ({frappe.utils.format_datetime(c.scheduled_time)})" for c in conflicts
+            )
+            frappe.throw(f"This lesson overlaps with {details}", title="Scheduling Conflict")
     
     def before_save(self):
         """Actions before saving the lesson"""
+        # Take a pre-created Meet link so booking never waits on the Calendar API
+        if self.is_new() and not self.meet_link:
+            self.claim_pooled_meet_link()
+        
         # Update status based on time
         if self.scheduled_time and self.status == "Scheduled":
             now = frappe.utils.now_datetime()
@@ -31,21 +138,35 @@ class ESLLesson(Document):
     
     def after_insert(self):
         """Actions after lesson is created"""
-        # Send notification to student and teacher
-        self.send_lesson_notification()
+        # Queue notification to student and teacher
+        from olya_bootstrap.tasks.notifications import enqueue_lesson_notification
+        enqueue_lesson_notification(self.name)
+        
+        # Provision the Meet link in the background
+        if not self.meet_link:
+            self.create_google_meet_link()
+        elif self.calendar_event_id:
+            from olya_bootstrap.tasks.meet import enqueue_claimed_event_updates
+            enqueue_claimed_event_updates([self.name])
     
-    def send_lesson_notification(self):
-        """Send email notification about the lesson"""
+    def send_lesson_notification(self, sent=None):
+        """
+        Send email notification about the lesson (runs in a background job)
+        
+        Recipients in `sent` are skipped and each one emailed is added to it,
+        so a retried job does not email them twice.
+        """
+        sent = sent if sent is not None else []
         if not self.student or not self.teacher:
             return
-            
+        
         try:
             # Get student email
             student_doc = frappe.get_doc("ESL Student", self.student)
             teacher_doc = frappe.get_doc("User", self.teacher)
             
             # Email to student
-            if student_doc.email:
+            if student_doc.email and student_doc.email not in sent:
                 frappe.sendmail(
                     recipients=[student_doc.email],
                     subject=f"ESL Lesson Scheduled: {self.title}",
@@ -59,9 +180,10 @@ class ESLLesson(Document):
                     <p>Please be ready 5 minutes before the scheduled time.</p>
                     """
                 )
+                sent.append(student_doc.email)
             
             # Email to teacher
-            if teacher_doc.email:
+            if teacher_doc.email and teacher_doc.email not in sent:
                 frappe.sendmail(
                     recipients=[teacher_doc.email],
                     subject=f"ESL Lesson Scheduled: {self.title}",
@@ -75,44 +197,43 @@ class ESLLesson(Document):
                     <p>Access the lesson form to add lesson plans and materials.</p>
                     """
                 )
+                sent.append(teacher_doc.email)
         except Exception as e:
             frappe.log_error(f"Failed to send lesson notification: {str(e)}")
+            # Let the background job retry
+            raise
     
     def create_google_meet_link(self):
-        """Create Google Meet link for this lesson"""
-        try:
-            # Call the API to create meet link
-            from olya_bootstrap.api.calendar import create_google_meet
-            
-            student_doc = frappe.get_doc("ESL Student", self.student) if self.student else None
-            student_email = student_doc.email if student_doc else None
-            
-            result = create_google_meet(
-                title=self.title,
-                when=self.scheduled_time,
-                student_email=student_email
-            )
-            
-            if result.get("meet_link"):
-                self.meet_link = result["meet_link"]
-                self.save()
-                return result["meet_link"]
-        except Exception as e:
-            frappe.log_error(f"Failed to create Google Meet link: {str(e)}")
-            frappe.throw("Failed to create Google Meet link. Please check Google API configuration.")
+        """
+        Queue Google Meet link creation for this lesson.
+        
+        The link is stored by a background job and pushed to the open form
+        over realtime (see olya_bootstrap.tasks.meet).
+        """
+        from olya_bootstrap.tasks.meet import enqueue_meet_provisioning
+        enqueue_meet_provisioning([self.name])
+    
+    def claim_pooled_meet_link(self):
+        """Use a Meet link from the teacher's pre-provisioned pool, if one is available"""
+        from olya_bootstrap.doctype.esl_meet_slot.esl_meet_slot import claim_meet_slots
+        
+        slots = claim_meet_slots(self.teacher)
+        if slots:
+            self.meet_link = slots[0].meet_link
+            self.calendar_event_id = slots[0].calendar_event_id
     
     def get_student_info(self):
         """Get detailed student information"""
         if not self.student:
             return None
-            
+        
         return frappe.get_doc("ESL Student", self.student)
     
     def mark_completed(self):
         """Mark lesson as completed"""
         self.status = "Completed"
         self.save()
-        
+    
     def cancel_lesson(self, reason=None):
         """Cancel the lesson"""
         self.status = "Cancelled"
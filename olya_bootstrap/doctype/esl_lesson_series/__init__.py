@@ -0,0 +1 @@
+# ESL Lesson Series DocType
@@ -0,0 +1,300 @@
+import frappe
+from frappe.model.document import Document
+from datetime import timedelta
+
+from olya_bootstrap.assignment import LESSON_LOAD_KEY, update_teacher_load
+from olya_bootstrap.conflicts import MAX_LESSON_DURATION, find_batch_conflicts, get_lesson_end, get_lesson_start_utc
+from olya_bootstrap.doctype.esl_lesson.esl_lesson import reserve_lesson_names, set_lesson_start_utc
+from olya_bootstrap.portal.cache import clear_portal_cache_for_lessons
+from olya_bootstrap.realtime import queue_lesson_changes
+
+# Hard limit on lessons generated by one series (two years of weekly lessons)
+MAX_OCCURRENCES = 104
+FREQUENCY_WEEKS = {"Weekly": 1, "Biweekly": 2}
+
+class ESLLessonSeries(Document):
+    def validate(self):
+        """Validate ESL Lesson Series data"""
+        if not self.occurrences and not self.until:
+            frappe.throw("Set either the number of lessons or a repeat-until date")
+        
+        if frappe.utils.cint(self.occurrences) > MAX_OCCURRENCES:
+            frappe.throw(f"A series cannot have more than {MAX_OCCURRENCES} lessons")
+        
+        if self.is_new() and frappe.utils.get_datetime(self.start_time) < frappe.utils.now_datetime():
+            frappe.throw("Cannot schedule lesson in the past")
+        
+        # Auto-assign teacher from student if not set
+        if self.student and not self.teacher:
+            self.teacher = frappe.db.get_value("ESL Student", self.student, "teacher")
+        
+        if frappe.utils.cint(self.duration) > MAX_LESSON_DURATION:
+            frappe.throw(f"Lesson duration cannot exceed {MAX_LESSON_DURATION} minutes")
+        
+        if self.is_new():
+            occurrences = self.get_occurrences()
+            if not occurrences:
+                frappe.throw("The recurrence does not produce any lessons")
+            
+            self.validate_conflicts([
+                {"scheduled_time": scheduled_time, "duration": self.duration}
+                for scheduled_time in occurrences
+            ])
+    
+    def validate_conflicts(self, lessons, exclude=None):
+        """Reject the whole set if any occurrence double-books the teacher or student"""
+        for lesson in lessons:
+            lesson.update({"teacher": self.teacher, "student": self.student})
+        
+        conflicts = find_batch_conflicts(lessons, exclude=exclude)
+        if conflicts:
+            details = ", ".join(
+                f"{frappe.utils.format_datetime(lessons[c['index']]['scheduled_time'])} ({', '.join(c['conflicts'])})"
+                for c in conflicts
+            )
+            frappe.throw(f"These lessons overlap with existing lessons: {details}", title="Scheduling Conflict")
+    
+    def after_insert(self):
+        """Create every occurrence and queue one summary email per participant"""
+        self.create_lessons()
+        
+        from olya_bootstrap.tasks.notifications import enqueue_series_notification
+        enqueue_series_notification(self.name)
+    
+    def get_occurrences(self):
+        """Expand the recurrence into lesson start times"""
+        step = timedelta(weeks=FREQUENCY_WEEKS.get(self.frequency, 1))
+        limit = min(frappe.utils.cint(self.occurrences) or MAX_OCCURRENCES, MAX_OCCURRENCES)
+        until = frappe.utils.get_datetime(frappe.utils.add_days(self.until, 1)) if self.until else None
+        
+        occurrences = []
+        scheduled_time = frappe.utils.get_datetime(self.start_time)
+        while len(occurrences) < limit and (not until or scheduled_time < until):
+            occurrences.append(scheduled_time)
+            scheduled_time += step
+        
+        return occurrences
+    
+    def create_lessons(self):
+        """Insert all occurrences as ESL Lessons with one bulk insert"""
+        from olya_bootstrap.doctype.esl_meet_slot.esl_meet_slot import claim_meet_slots
+        from olya_bootstrap.tasks.meet import enqueue_claimed_event_updates, enqueue_meet_provisioning
+        
+        occurrences = self.get_occurrences()
+        names = reserve_lesson_names(len(occurrences))
+        slots = claim_meet_slots(self.teacher, len(names))
+        slots += [frappe._dict()] * (len(names) - len(slots))
+        now = frappe.utils.now()
+        user = frappe.session.user
+        
+        frappe.db.bulk_insert("ESL Lesson",
+            ["name", "title", "student", "teacher", "scheduled_time", "scheduled_end", "scheduled_time_utc",
+                "duration", "status", "series", "meet_link", "calendar_event_id", "creation", "modified", "owner", "modified_by"],
+            [
+                (name, self.title, self.student, self.teacher, scheduled_time,
+                    get_lesson_end(scheduled_time, self.duration), get_lesson_start_utc(scheduled_time),
+                    self.duration or 60,
+                    "Scheduled", self.name, slot.meet_link, slot.calendar_event_id, now, now, user, user)
+                for name, scheduled_time, slot in zip(names, occurrences, slots)
+            ]
+        )
+        
+        update_teacher_load(LESSON_LOAD_KEY, self.teacher, len(names))
+        clear_portal_cache_for_lessons([self.teacher], [self.student])
+        queue_lesson_changes(names, "insert", ["title", "scheduled_time", "duration", "status", "meet_link"])
+        
+        # Pooled links need their events moved; the rest are created in the background
+        enqueue_claimed_event_updates([name for name, slot in zip(names, slots) if slot.calendar_event_id])
+        enqueue_meet_provisioning([name for name, slot in zip(names, slots) if not slot.meet_link])
+        return names
+    
+    def get_lessons(self, from_lesson=None):
+        """
+        Get the upcoming Scheduled lessons of the series, optionally only
+        `from_lesson` and the ones following it.
+        """
+        start = frappe.utils.now_datetime()
+        if from_lesson:
+            from_time = frappe.db.get_value("ESL Lesson", {"name": from_lesson, "series": self.name}, "scheduled_time")
+            if not from_time:
+                frappe.throw(f"Lesson {from_lesson} is not part of series {self.name}")
+            start = max(start, frappe.utils.get_datetime(from_time))
+        
+        return frappe.get_all("ESL Lesson",
+            filters={
+                "series": self.name,
+                "status": "Scheduled",
+                "scheduled_time": [">=", start]
+            },
+            fields=["name", "scheduled_time", "duration"],
+            order_by="scheduled_time"
+        )
+    
+    def update_lessons(self, from_lesson=None, title=None, duration=None, start_time=None):
+        """
+        Edit the whole series or "this and following" lessons in one UPDATE.
+        
+        Args:
+            from_lesson: First lesson to change; all upcoming lessons if not set
+            title: New lesson title
+            duration: New duration in minutes
+            start_time: New start of the first changed lesson; later lessons move by the same offset
+        
+        Returns:
+            list: Names of the changed lessons
+        """
+        lessons = self.get_lessons(from_lesson)
+        if not lessons:
+            return []
+        
+        assignments = []
+        values = {"names": [lesson.name for lesson in lessons]}
+        
+        if title:
+            assignments.append("title = %(title)s")
+            values["title"] = title
+        if duration:
+            if frappe.utils.cint(duration) > MAX_LESSON_DURATION:
+                frappe.throw(f"Lesson duration cannot exceed {MAX_LESSON_DURATION} minutes")
+            assignments.append("duration = %(duration)s")
+            values["duration"] = frappe.utils.cint(duration)
+        
+        offset = timedelta(0)
+        if start_time:
+            if frappe.utils.get_datetime(start_time) < frappe.utils.now_datetime():
+                frappe.throw("Cannot schedule lesson in the past")
+            offset = frappe.utils.get_datetime(start_time) - frappe.utils.get_datetime(lessons[0].scheduled_time)
+            assignments.append("scheduled_time = timestampadd(second, %(offset)s, scheduled_time)")
+            values["offset"] = int(offset.total_seconds())
+        
+        if duration or start_time:
+            # MariaDB applies SET clauses left to right, so this must come first
+            # to read scheduled_time and duration as they were before the UPDATE
+            assignments.insert(0, """scheduled_end = timestampadd(minute,
+                coalesce(%(new_duration)s, nullif(duration, 0), 60),
+                timestampadd(second, %(offset)s, scheduled_time))""")
+            values.setdefault("offset", 0)
+            values["new_duration"] = values.get("duration")
+            self.validate_conflicts([
+                {
+                    "name": lesson.name,
+                    "scheduled_time": frappe.utils.get_datetime(lesson.scheduled_time) + offset,
+                    "duration": values.get("duration") or lesson.duration
+                }
+                for lesson in lessons
+            ])
+        
+        if not assignments:
+            return []
+        
+        self.bulk_update_lessons(assignments, values,
+            [field for field in ("title", "duration") if values.get(field)] + (["scheduled_time"] if start_time else []))
+        
+        if start_time:
+            # The UTC offset can differ between lessons moved across a DST change
+            set_lesson_start_utc([
+                frappe._dict(name=lesson.name, scheduled_time=frappe.utils.get_datetime(lesson.scheduled_time) + offset)
+                for lesson in lessons
+            ])
+        
+        # Editing the whole series also changes the series defaults
+        if not from_lesson:
+            self.db_set({
+                "title": title or self.title,
+                "duration": frappe.utils.cint(duration) or self.duration
+            })
+        
+        return values["names"]
+    
+    def cancel_lessons(self, from_lesson=None, reason=None):
+        """
+        Cancel the whole series or "this and following" lessons in one UPDATE.
+        
+        Returns:
+            list: Names of the cancelled lessons
+        """
+        lessons = self.get_lessons(from_lesson)
+        names = [lesson.name for lesson in lessons]
+        
+        if names:
+            assignments = ["status = 'Cancelled'"]
+            values = {"names": names}
+            if reason:
+                assignments.append("notes = if(ifnull(notes, '') = '', %(note)s, concat(notes, '\\n\\n', %(note)s))")
+                values["note"] = f"Cancellation reason: {reason}"
+            
+            self.bulk_update_lessons(assignments, values, ["status"])
+            update_teacher_load(LESSON_LOAD_KEY, self.teacher, -len(names))
+        
+        if not from_lesson:
+            self.db_set("status", "Cancelled")
+        
+        return names
+    
+    def bulk_update_lessons(self, assignments, values, fields=None):
+        """Apply SET clauses to the given lessons, drop affected portal caches and push the changed `fields`"""
+        values.update({"modified": frappe.utils.now(), "user": frappe.session.user})
+        frappe.db.sql(f"""
+            update `tabESL Lesson`
+            set {", ".join(assignments)}, modified = %(modified)s, modified_by = %(user)s
+            where name in %(names)s
+        """, values)
+        
+        clear_portal_cache_for_lessons([self.teacher], [self.student])
+        queue_lesson_changes(values["names"], "update", fields)
+    
+    def send_series_notification(self, sent=None):
+        """
+        Send one summary email per participant listing every lesson of the series
+        
+        Recipients in `sent` are skipped and each one emailed is added to it,
+        so a retried job does not email them twice.
+        """
+        sent = sent if sent is not None else []
+        if not self.student or not self.teacher:
+            return
+        
+        try:
+            student_doc = frappe.get_doc("ESL Student", self.student)
+            teacher_doc = frappe.get_doc("User", self.teacher)
+            lessons = self.get_lessons()
+            schedule = "".join(
+                f"<li>{frappe.utils.format_datetime(lesson.scheduled_time)}</li>" for lesson in lessons
+            )
+            
+            # Email to student
+            if student_doc.email and student_doc.email not in sent:
+                frappe.sendmail(
+                    recipients=[student_doc.email],
+                    subject=f"ESL Lessons Scheduled: {self.title}",
+                    message=f"""
+                    <h3>Your ESL lessons have been scheduled!</h3>
+                    <p><strong>Lesson:</strong> {self.title}</p>
+                    <p><strong>Teacher:</strong> {teacher_doc.full_name}</p>
+                    <p><strong>Duration:</strong> {self.duration} minutes</p>
+                    <p><strong>Schedule ({self.frequency}):</strong></p>
+                    <ul>{schedule}</ul>
+                    <p>Please be ready 5 minutes before each lesson.</p>
+                    """
+                )
+                sent.append(student_doc.email)
+            
+            # Email to teacher
+            if teacher_doc.email and teacher_doc.email not in sent:
+                frappe.sendmail(
+                    recipients=[teacher_doc.email],
+                    subject=f"ESL Lessons Scheduled: {self.title}",
+                    message=f"""
+                    <h3>You have a new ESL lesson series!</h3>
+                    <p><strong>Lesson:</strong> {self.title}</p>
+                    <p><strong>Student:</strong> {student_doc.student_name}</p>
+                    <p><strong>Duration:</strong> {self.duration} minutes</p>
+                    <p><strong>Schedule ({self.frequency}):</strong></p>
+                    <ul>{schedule}</ul>
+                    """
+                )
+                sent.append(teacher_doc.email)
+        except Exception as e:
+            frappe.log_error(f"Failed to send lesson series notification: {str(e)}")
+            # Let the background job retry
+            raise
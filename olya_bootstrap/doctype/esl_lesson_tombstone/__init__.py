@@ -0,0 +1 @@
+# ESL Lesson Tombstone DocType
@@ -0,0 +1,40 @@
+import frappe
+from frappe.model.document import Document
+
+# Sync tokens older than this fall back to a full reload
+TOMBSTONE_RETENTION_DAYS = 90
+
+class ESLLessonTombstone(Document):
+    pass
+
+def record_lesson_tombstone(doc, method=None):
+    """
+    Leave a tombstone when a lesson is deleted, or when it moves to another
+    teacher or student, so their sync clients can drop it (doc event).
+    """
+    if method == "on_trash":
+        add_tombstone(doc.name, doc.teacher, doc.student)
+        return
+    
+    previous = doc.get_doc_before_save()
+    if not previous:
+        return
+    
+    teacher = previous.teacher if previous.teacher != doc.teacher else None
+    student = previous.student if previous.student != doc.student else None
+    if teacher or student:
+        add_tombstone(doc.name, teacher, student)
+
+def add_tombstone(lesson, teacher=None, student=None):
+    frappe.get_doc({
+        "doctype": "ESL Lesson Tombstone",
+        "lesson": lesson,
+        "teacher": teacher,
+        "student": student,
+        "deleted_at": frappe.utils.now()
+    }).insert(ignore_permissions=True)
+
+def purge_tombstones():
+    """Delete tombstones past the retention period (daily scheduler)"""
+    cutoff = frappe.utils.add_days(frappe.utils.now_datetime(), -TOMBSTONE_RETENTION_DAYS)
+    frappe.db.sql("delete from `tabESL Lesson Tombstone` where deleted_at < %s", cutoff)
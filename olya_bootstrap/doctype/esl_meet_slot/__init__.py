@@ -0,0 +1 @@
+# ESL Meet Slot DocType
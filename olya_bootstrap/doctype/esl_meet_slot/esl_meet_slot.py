@@ -0,0 +1,46 @@
+import frappe
+from frappe.model.document import Document
+
+# Pool size per teacher, overridable in site config
+DEFAULT_LOW_WATERMARK = 3       # meet_pool_low_watermark: refill below this
+DEFAULT_HIGH_WATERMARK = 10     # meet_pool_high_watermark: refill up to this
+
+class ESLMeetSlot(Document):
+    pass
+
+def get_watermarks():
+    low = frappe.utils.cint(frappe.conf.get("meet_pool_low_watermark")) or DEFAULT_LOW_WATERMARK
+    high = frappe.utils.cint(frappe.conf.get("meet_pool_high_watermark")) or DEFAULT_HIGH_WATERMARK
+    return low, max(high, low)
+
+def claim_meet_slots(teacher, count=1):
+    """
+    Atomically take up to `count` pre-created Meet links of a teacher out of the pool.
+    
+    Rows are locked with SKIP LOCKED so concurrent bookings never wait on or
+    receive the same slot; claimed slots are deleted in the same transaction.
+    
+    Returns:
+        list: Claimed slots (meet_link, calendar_event_id)
+    """
+    if not teacher or count <= 0:
+        return []
+    
+    slots = frappe.db.sql("""
+        select name, meet_link, calendar_event_id
+        from `tabESL Meet Slot`
+        where teacher = %s
+        order by creation
+        limit %s
+        for update skip locked
+    """, (teacher, count), as_dict=True)
+    
+    if slots:
+        frappe.db.sql("delete from `tabESL Meet Slot` where name in %s", ([slot.name for slot in slots],))
+        
+        low, _ = get_watermarks()
+        if frappe.db.count("ESL Meet Slot", {"teacher": teacher}) < low:
+            from olya_bootstrap.tasks.meet import enqueue_meet_pool_refill
+            enqueue_meet_pool_refill()
+    
+    return slots
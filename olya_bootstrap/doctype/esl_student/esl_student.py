@@ -15,25 +15,12 @@ class ESLStudent(Document):
             self.auto_assign_teacher()
     
     def auto_assign_teacher(self):
-        """Auto-assign a teacher based on availability"""
-        # Get teachers with ESL Teacher role
-        teachers = frappe.get_all("User", 
-            filters={"enabled": 1},
-            fields=["name", "full_name"]
-        )
-        
-        # Filter teachers who have ESL Teacher role
-        esl_teachers = []
-        for teacher in teachers:
-            roles = frappe.get_roles(teacher.name)
-            if "ESL Teacher" in roles:
-                esl_teachers.append(teacher)
+        """Auto-assign the least-loaded ESL Teacher"""
+        from olya_bootstrap.assignment import pick_least_loaded_teacher
         
-        if esl_teachers:
-            # Simple round-robin assignment (can be enhanced)
-            import random
-            selected_teacher = random.choice(esl_teachers)
-            self.teacher = selected_teacher.name
+        teacher = pick_least_loaded_teacher()
+        if teacher:
+            self.teacher = teacher
     
     def after_insert(self):
         """Actions after student is created"""
@@ -68,4 +55,12 @@ class ESLStudent(Document):
             fields=["name", "title", "scheduled_time", "status", "meet_link"],
             order_by="scheduled_time desc"
         )
-
+    
+    def get_lesson_page(self, upcoming=False, cursor=None, limit=None):
+        """
+        Get one page of this student's past (most recent first) or upcoming
+        lessons; pass the returned next_cursor to get the following page.
+        """
+        from olya_bootstrap.api.history import get_lesson_page
+        
+        return get_lesson_page(student=self.name, upcoming=upcoming, cursor=cursor, limit=limit)
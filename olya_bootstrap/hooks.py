@@ -1,3 +1,5 @@
+from olya_bootstrap.assets import olya_asset_url
+
 app_name = "olya_bootstrap"
 app_title = "OLYA Bootstrap"
 app_publisher = "OLYA ESL"
@@ -21,12 +23,65 @@ website_route_rules = [
 
 # Document Events
 doc_events = {
-    # Add any document event hooks here
+    # on_update also fires after insert
+    "ESL Lesson": {
+        "on_update": [
+            "olya_bootstrap.portal.cache.invalidate_for_lesson",
+            "olya_bootstrap.assignment.update_load_for_lesson",
+            "olya_bootstrap.doctype.esl_lesson_tombstone.esl_lesson_tombstone.record_lesson_tombstone",
+            "olya_bootstrap.realtime.publish_lesson_change"
+        ],
+        "on_trash": [
+            "olya_bootstrap.portal.cache.invalidate_for_lesson",
+            "olya_bootstrap.assignment.update_load_for_lesson",
+            "olya_bootstrap.doctype.esl_lesson_tombstone.esl_lesson_tombstone.record_lesson_tombstone",
+            "olya_bootstrap.realtime.publish_lesson_change"
+        ]
+    },
+    "ESL Student": {
+        "on_update": [
+            "olya_bootstrap.portal.cache.invalidate_for_student",
+            "olya_bootstrap.assignment.update_load_for_student"
+        ],
+        "on_trash": [
+            "olya_bootstrap.portal.cache.invalidate_for_student",
+            "olya_bootstrap.assignment.update_load_for_student"
+        ]
+    },
+    "User": {
+        "on_update": [
+            "olya_bootstrap.assignment.clear_teacher_cache",
+            "olya_bootstrap.portal.cache.invalidate_for_user"
+        ],
+        "on_trash": [
+            "olya_bootstrap.assignment.clear_teacher_cache",
+            "olya_bootstrap.portal.cache.invalidate_for_user"
+        ]
+    },
+    "Social Login Key": {
+        "on_update": ["olya_bootstrap.integrations.google_calendar.reset_client_pool"]
+    }
 }
 
 # Scheduled Tasks
 scheduler_events = {
-    # Add any scheduled tasks here
+    "hourly": [
+        "olya_bootstrap.tasks.lessons.auto_complete_lessons"
+    ],
+    "daily": [
+        "olya_bootstrap.assignment.rebuild_teacher_load",
+        "olya_bootstrap.doctype.esl_lesson_tombstone.esl_lesson_tombstone.purge_tombstones"
+    ],
+    "cron": {
+        # Keep every teacher's pre-provisioned Meet links topped up
+        "*/15 * * * *": [
+            "olya_bootstrap.tasks.meet.refill_meet_pool"
+        ],
+        # Re-queue failed notifications once their retry delay has passed
+        "* * * * *": [
+            "olya_bootstrap.tasks.notifications.enqueue_due_retries"
+        ]
+    }
 }
 
 # Override whitelisted methods
@@ -59,13 +114,18 @@ website_context = {
     "splash_image": "/assets/olya_bootstrap/images/splash.png"
 }
 
-# Include js, css files in header of desk.html
-app_include_css = "/assets/olya_bootstrap/css/olya.css"
-app_include_js = "/assets/olya_bootstrap/js/olya.js"
-
-# Include js, css files in header of web template
-web_include_css = "/assets/olya_bootstrap/css/olya.css"
-web_include_js = "/assets/olya_bootstrap/js/olya.js"
+# Include css files in header of desk.html and of the web template,
+# as fingerprinted builds (see olya_bootstrap/build_assets.py)
+app_include_css = olya_asset_url("css/olya.css")
+web_include_css = olya_asset_url("css/olya.css")
+
+# Asset URLs and inlined stylesheets for the www pages
+jinja = {
+    "methods": [
+        "olya_bootstrap.assets.olya_asset_url",
+        "olya_bootstrap.assets.olya_inline_asset"
+    ]
+}
 
 # Home Pages
 website_generators = ["Web Page"]
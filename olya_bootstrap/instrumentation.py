@@ -0,0 +1,276 @@
+# Per-endpoint latency, query and external-call histograms for whitelisted methods
+
+import functools
+import json
+import math
+import random
+import time
+from contextlib import contextmanager
+
+import frappe
+
+METRICS_KEY = "olya_endpoint_metrics"
+METHODS_KEY = "olya_endpoint_metrics:methods"
+TRACES_KEY = "olya_endpoint_traces"
+
+# Calls are counted in 5 minute windows, kept for a day
+WINDOW_SECONDS = 5 * 60
+RETENTION_WINDOWS = 24 * 12
+MAX_TRACES = 100
+MAX_TRACE_QUERIES = 500
+
+# Upper bucket bounds of each histogram; larger values land in the "inf" bucket.
+# Percentiles are reported as bucket upper bounds (None when in the "inf" bucket).
+TIME_BUCKETS = (0, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+HISTOGRAMS = {
+    "time_ms": TIME_BUCKETS,
+    "queries": COUNT_BUCKETS,
+    "rows": COUNT_BUCKETS + (10000, 50000, 100000),
+    "external_ms": TIME_BUCKETS
+}
+PERCENTILES = (50, 90, 95, 99)
+
+# Defaults, overridable in site config
+DEFAULT_SLOW_CALL_MS = 1000     # endpoint_slow_call_ms: sampled calls at least this slow keep a trace
+DEFAULT_TRACE_SAMPLE_RATE = 0   # endpoint_trace_sample_rate: share of calls (0-1) that record queries
+
+def instrument(fn):
+    """
+    Record wall time, SQL queries, rows fetched and external-call time of a
+    whitelisted method into rolling histograms in Redis.
+    
+    Apply it under @frappe.whitelist(). Nested instrumented calls count towards
+    the outermost one only. Set `disable_endpoint_metrics` in site config to
+    turn recording off.
+    """
+    method = f"{fn.__module__}.{fn.__name__}"
+    
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if getattr(frappe.local, "olya_call_metrics", None) is not None or frappe.conf.get("disable_endpoint_metrics"):
+            return fn(*args, **kwargs)
+        
+        sample_rate = frappe.utils.flt(frappe.conf.get("endpoint_trace_sample_rate") or DEFAULT_TRACE_SAMPLE_RATE)
+        metrics = frappe.local.olya_call_metrics = {
+            "queries": 0,
+            "rows": 0,
+            "external_ms": 0.0,
+            "trace": [] if sample_rate and random.random() < sample_rate else None
+        }
+        
+        db = frappe.db
+        original_sql = db.sql
+        db.sql = get_counting_sql(original_sql, metrics)
+        started = time.perf_counter()
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            db.sql = original_sql
+            frappe.local.olya_call_metrics = None
+            record_call(method, elapsed, metrics, failed)
+    
+    return wrapper
+
+def get_counting_sql(original_sql, metrics):
+    """Wrap frappe.db.sql to count queries and rows, and time them when tracing"""
+    def sql(query, values=(), *args, **kwargs):
+        metrics["queries"] += 1
+        started = time.perf_counter()
+        result = original_sql(query, values, *args, **kwargs)
+        
+        if isinstance(result, (list, tuple)):
+            metrics["rows"] += len(result)
+        
+        trace = metrics["trace"]
+        if trace is not None and len(trace) < MAX_TRACE_QUERIES:
+            # Query text only: values can hold personal data
+            trace.append({
+                "query": " ".join(str(query).split()),
+                "ms": round((time.perf_counter() - started) * 1000, 3)
+            })
+        return result
+    
+    return sql
+
+@contextmanager
+def external_call():
+    """Count the time spent in the block as external-call time of the current endpoint"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = getattr(frappe.local, "olya_call_metrics", None)
+        if metrics is not None:
+            metrics["external_ms"] += (time.perf_counter() - started) * 1000
+
+def get_bucket(value, bounds):
+    for bound in bounds:
+        if value <= bound:
+            return str(bound)
+    return "inf"
+
+def get_window(timestamp=None):
+    return int((timestamp or time.time()) // WINDOW_SECONDS)
+
+def get_window_key(method, window):
+    return frappe.cache().make_key(f"{METRICS_KEY}:{method}:{window}")
+
+def record_call(method, elapsed_ms, metrics, failed=False):
+    """Add one call to the method's histograms for the current window, in one round trip"""
+    try:
+        values = {
+            "time_ms": elapsed_ms,
+            "queries": metrics["queries"],
+            "rows": metrics["rows"],
+            "external_ms": metrics["external_ms"]
+        }
+        cache = frappe.cache()
+        window = get_window()
+        key = get_window_key(method, window)
+        
+        pipe = cache.pipeline()
+        pipe.hincrby(key, "count", 1)
+        if failed:
+            pipe.hincrby(key, "errors", 1)
+        for name, value in values.items():
+            pipe.hincrby(key, f"{name}:{get_bucket(value, HISTOGRAMS[name])}", 1)
+            pipe.hincrbyfloat(key, f"{name}:sum", round(value, 3))
+        pipe.expire(key, WINDOW_SECONDS * RETENTION_WINDOWS)
+        pipe.hset(cache.make_key(METHODS_KEY), method, window)
+        
+        slow_call_ms = frappe.utils.flt(frappe.conf.get("endpoint_slow_call_ms", DEFAULT_SLOW_CALL_MS))
+        if metrics["trace"] is not None and elapsed_ms >= slow_call_ms:
+            traces_key = cache.make_key(TRACES_KEY)
+            pipe.lpush(traces_key, json.dumps({
+                "method": method,
+                "user": frappe.session.user,
+                "timestamp": frappe.utils.now(),
+                "failed": failed,
+                **{name: round(value, 3) for name, value in values.items()},
+                "trace": metrics["trace"]
+            }))
+            pipe.ltrim(traces_key, 0, MAX_TRACES - 1)
+        
+        pipe.execute()
+    except Exception as e:
+        # Metrics must never fail the request they measure
+        frappe.log_error(f"Failed to record endpoint metrics: {str(e)}")
+
+def get_recorded_methods():
+    # Raw commands go through a pipeline: the cache wrapper's hgetall/lrange unpickle values
+    cache = frappe.cache()
+    methods = cache.pipeline().hgetall(cache.make_key(METHODS_KEY)).execute()[0] or {}
+    return [frappe.safe_decode(name) for name in methods]
+
+def get_percentile(histogram, total, percentile, bounds):
+    """Upper bound of the bucket holding a percentile, from bucket counts"""
+    if not total:
+        return 0
+    
+    rank = total * percentile / 100
+    seen = 0
+    for bound in bounds:
+        seen += histogram.get(str(bound), 0)
+        if seen >= rank:
+            return bound
+    
+    # The top bucket is open-ended
+    return None
+
+def summarize(counters):
+    """Turn merged window counters into count, error and percentile figures"""
+    count = int(counters.get("count", 0))
+    summary = {"count": count, "errors": int(counters.get("errors", 0))}
+    
+    for name, bounds in HISTOGRAMS.items():
+        histogram = {
+            field.split(":", 1)[1]: int(value)
+            for field, value in counters.items()
+            if field.startswith(f"{name}:") and not field.endswith(":sum")
+        }
+        total = counters.get(f"{name}:sum", 0)
+        summary[name] = {
+            "total": round(total, 3),
+            "mean": round(total / count, 3) if count else 0,
+            **{f"p{p}": get_percentile(histogram, count, p, bounds) for p in PERCENTILES}
+        }
+    
+    return summary
+
+@frappe.whitelist()
+def get_endpoint_metrics(minutes=60, method=None):
+    """
+    Return latency, query, row and external-call percentiles per whitelisted method.
+    
+    The metrics API itself is not instrumented, so reading it does not skew the figures.
+    
+    Args:
+        minutes: How far back to look (rounded up to whole 5 minute windows)
+        method: Only return this method
+    
+    Returns:
+        list: One entry per method, busiest (highest total time) first
+    """
+    frappe.only_for(["System Manager", "ESL Administrator"])
+    
+    cache = frappe.cache()
+    minutes = min(max(frappe.utils.cint(minutes), 1), WINDOW_SECONDS * RETENTION_WINDOWS // 60)
+    current = get_window()
+    windows = range(current - math.ceil(minutes * 60 / WINDOW_SECONDS) + 1, current + 1)
+    methods = [method] if method else sorted(get_recorded_methods())
+    
+    pipe = cache.pipeline()
+    for name in methods:
+        for window in windows:
+            pipe.hgetall(get_window_key(name, window))
+    rows = iter(pipe.execute())
+    
+    results = []
+    for name in methods:
+        counters = {}
+        for _ in windows:
+            for field, value in (next(rows) or {}).items():
+                field = frappe.safe_decode(field)
+                counters[field] = counters.get(field, 0) + frappe.utils.flt(frappe.safe_decode(value))
+        if counters.get("count"):
+            results.append({"method": name, **summarize(counters)})
+    
+    results.sort(key=lambda row: row["time_ms"]["total"], reverse=True)
+    return results
+
+@frappe.whitelist()
+def get_slow_call_traces(limit=20, method=None):
+    """
+    Return the most recent query traces of sampled slow calls.
+    
+    Tracing is off unless `endpoint_trace_sample_rate` is set in site config.
+    """
+    frappe.only_for(["System Manager", "ESL Administrator"])
+    
+    cache = frappe.cache()
+    limit = min(max(frappe.utils.cint(limit), 1), MAX_TRACES)
+    traces = [json.loads(frappe.safe_decode(trace))
+        for trace in cache.pipeline().lrange(cache.make_key(TRACES_KEY), 0, MAX_TRACES - 1).execute()[0] or []]
+    
+    return [trace for trace in traces if not method or trace["method"] == method][:limit]
+
+@frappe.whitelist(methods=["POST"])
+def reset_endpoint_metrics():
+    """Delete the recorded endpoint histograms and traces"""
+    frappe.only_for(["System Manager", "ESL Administrator"])
+    
+    cache = frappe.cache()
+    current = get_window()
+    
+    pipe = cache.pipeline()
+    for name in get_recorded_methods():
+        for window in range(current - RETENTION_WINDOWS, current + 1):
+            pipe.delete(get_window_key(name, window))
+    pipe.delete(cache.make_key(METHODS_KEY), cache.make_key(TRACES_KEY))
+    pipe.execute()
@@ -0,0 +1 @@
+# OLYA Bootstrap Integrations Package
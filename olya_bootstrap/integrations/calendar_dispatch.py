@@ -0,0 +1,251 @@
+# Batched, rate-limited Google Calendar dispatch
+
+import random
+import threading
+import time
+
+import frappe
+
+from olya_bootstrap.integrations.google_calendar import get_calendar_service
+from olya_bootstrap.instrumentation import external_call, instrument
+
+# Google accepts at most 50 calls per Calendar batch request
+MAX_BATCH_SIZE = 50
+
+# Defaults, overridable in site config
+DEFAULT_RATE_LIMIT = 10         # google_calendar_rate_limit: requests per second
+DEFAULT_BURST = 50              # google_calendar_burst: token bucket capacity
+DEFAULT_MAX_RETRIES = 5         # google_calendar_max_retries
+FAILURE_THRESHOLD = 5           # google_calendar_breaker_threshold: failed batches in a row
+BREAKER_COOLDOWN = 60           # google_calendar_breaker_cooldown: seconds the circuit stays open
+
+BACKOFF_BASE = 1
+BACKOFF_CAP = 32
+# Calls made inside a web request get one short retry so they never hold the worker for long
+INTERACTIVE_MAX_RETRIES = 1
+INTERACTIVE_BACKOFF_CAP = 1
+RETRYABLE_STATUSES = {403, 429, 500, 502, 503, 504}
+BREAKER_KEY = "olya_google_calendar_breaker"
+
+class CircuitOpenError(Exception):
+    pass
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by the threads of this worker"""
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, tokens=1, sleep=time.sleep):
+        """Block until `tokens` requests may be sent"""
+        needed = float(tokens)
+        while needed > 0:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                taken = min(needed, self.tokens)
+                self.tokens -= taken
+                needed -= taken
+            
+            if needed > 0:
+                sleep(min(needed, self.capacity) / self.rate)
+
+class CircuitBreaker:
+    """
+    Site-wide circuit breaker kept in Redis so every worker sees the same state.
+    
+    Opens after `threshold` failed batches in a row and stays open for
+    `cooldown` seconds; the next batch after that is a trial that either
+    closes the circuit or opens it again.
+    """
+    def __init__(self, threshold=FAILURE_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+    
+    # Raw commands go through a pipeline: the cache wrapper's hset/hgetall re-key and pickle values
+    @property
+    def key(self):
+        return frappe.cache().make_key(BREAKER_KEY)
+    
+    def get_state(self):
+        state = frappe.cache().pipeline().hgetall(self.key).execute()[0] or {}
+        state = {frappe.safe_decode(k): frappe.utils.flt(frappe.safe_decode(v)) for k, v in state.items()}
+        open_until = state.get("open_until", 0)
+        return {
+            "failures": int(state.get("failures", 0)),
+            "open_until": open_until,
+            "is_open": open_until > time.time()
+        }
+    
+    def check(self):
+        if self.get_state()["is_open"]:
+            raise CircuitOpenError("Google Calendar circuit breaker is open")
+    
+    def record_success(self):
+        frappe.cache().pipeline().delete(self.key).execute()
+    
+    def record_failure(self):
+        cache = frappe.cache()
+        failures = cache.pipeline().hincrby(self.key, "failures", 1).execute()[0]
+        if failures >= self.threshold:
+            cache.pipeline().hset(self.key, "open_until", time.time() + self.cooldown).execute()
+
+_rate_limiters = {}
+
+def get_rate_limiter():
+    """Per-site token bucket for this worker"""
+    rate = frappe.conf.get("google_calendar_rate_limit") or DEFAULT_RATE_LIMIT
+    burst = frappe.conf.get("google_calendar_burst") or DEFAULT_BURST
+    limiter = _rate_limiters.get(frappe.local.site)
+    if limiter is None or (limiter.rate, limiter.capacity) != (float(rate), float(burst)):
+        limiter = _rate_limiters[frappe.local.site] = TokenBucket(rate, burst)
+    return limiter
+
+def get_backoff(attempt, cap=BACKOFF_CAP):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, BACKOFF_BASE * 2 ** attempt))
+
+def get_error_status(error):
+    resp = getattr(error, "resp", None)
+    return frappe.utils.cint(getattr(resp, "status", 0)) or None
+
+def is_retryable(error):
+    """Quota, rate-limit and server errors are retried; so are transport errors"""
+    status = get_error_status(error)
+    return status is None or status in RETRYABLE_STATUSES
+
+def insert_event(body, calendar_id="primary"):
+    return {"method": "insert", "calendar_id": calendar_id, "body": body}
+
+def update_event(event_id, body, calendar_id="primary"):
+    return {"method": "patch", "calendar_id": calendar_id, "event_id": event_id, "body": body}
+
+def delete_event(event_id, calendar_id="primary"):
+    return {"method": "delete", "calendar_id": calendar_id, "event_id": event_id}
+
+class CalendarDispatcher:
+    """
+    Send Calendar insert/update/delete calls in Google batch HTTP requests.
+    
+    Every batch waits on the token bucket, failed calls are retried with
+    exponential backoff and jitter on 403/429/5xx, and the circuit breaker
+    stops dispatching after sustained failures.
+    """
+    def __init__(self, service=None, batch_size=MAX_BATCH_SIZE, max_retries=None,
+            rate_limiter=None, breaker=None, sleep=time.sleep, backoff_cap=BACKOFF_CAP):
+        self.service = service or get_calendar_service()
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.max_retries = max_retries if max_retries is not None else (
+            frappe.conf.get("google_calendar_max_retries") or DEFAULT_MAX_RETRIES)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.breaker = breaker or CircuitBreaker(
+            threshold=frappe.conf.get("google_calendar_breaker_threshold") or FAILURE_THRESHOLD,
+            cooldown=frappe.conf.get("google_calendar_breaker_cooldown") or BREAKER_COOLDOWN
+        )
+        self.sleep = sleep
+        self.backoff_cap = backoff_cap
+    
+    def dispatch(self, operations):
+        """
+        Run the operations and return one result per operation, in order:
+        {"ok": True, "response": {...}} or {"ok": False, "error": str, "status": int}
+        """
+        results = [None] * len(operations)
+        pending = list(range(len(operations)))
+        attempt = 0
+        
+        while pending:
+            try:
+                self.breaker.check()
+            except CircuitOpenError as e:
+                for index in pending:
+                    results[index] = {"ok": False, "error": str(e), "status": None}
+                break
+            
+            retry = []
+            for start in range(0, len(pending), self.batch_size):
+                chunk = pending[start:start + self.batch_size]
+                self.rate_limiter.acquire(len(chunk), sleep=self.sleep)
+                outcomes = self.execute_batch(operations, chunk)
+                
+                succeeded = False
+                for index, (response, error) in outcomes.items():
+                    if error is None:
+                        succeeded = True
+                        results[index] = {"ok": True, "response": response}
+                    elif is_retryable(error) and attempt < self.max_retries:
+                        retry.append(index)
+                    else:
+                        results[index] = {"ok": False, "error": str(error), "status": get_error_status(error)}
+                
+                if succeeded:
+                    self.breaker.record_success()
+                elif outcomes:
+                    self.breaker.record_failure()
+            
+            pending = retry
+            if pending:
+                attempt += 1
+                self.sleep(get_backoff(attempt, self.backoff_cap))
+        
+        return results
+    
+    def execute_batch(self, operations, indexes):
+        """Send one batch HTTP request; returns {index: (response, error)}"""
+        outcomes = {}
+        
+        def callback(request_id, response, exception):
+            outcomes[int(request_id)] = (response, exception)
+        
+        batch = self.service.new_batch_http_request(callback=callback)
+        for index in indexes:
+            batch.add(self.build_request(operations[index]), request_id=str(index))
+        
+        try:
+            with external_call():
+                batch.execute()
+        except Exception as e:
+            # The batch request itself failed: every call in it is retried
+            for index in indexes:
+                outcomes.setdefault(index, (None, e))
+        
+        return outcomes
+    
+    def build_request(self, operation):
+        events = self.service.events()
+        calendar_id = operation.get("calendar_id") or "primary"
+        
+        if operation["method"] == "insert":
+            return events.insert(calendarId=calendar_id, body=operation["body"], conferenceDataVersion=1)
+        if operation["method"] == "patch":
+            return events.patch(calendarId=calendar_id, eventId=operation["event_id"],
+                body=operation["body"], conferenceDataVersion=1)
+        if operation["method"] == "delete":
+            return events.delete(calendarId=calendar_id, eventId=operation["event_id"])
+        
+        frappe.throw(f"Unsupported Calendar operation {operation['method']}")
+
+def dispatch_calendar_requests(operations, interactive=False):
+    """
+    Dispatch Calendar operations for the current site with the default limits.
+    
+    Args:
+        operations: insert_event / update_event / delete_event operations
+        interactive: Called inside a web request: retry at most once, after a
+            backoff of at most a second, instead of the background job limits
+    """
+    if interactive:
+        return CalendarDispatcher(max_retries=INTERACTIVE_MAX_RETRIES,
+            backoff_cap=INTERACTIVE_BACKOFF_CAP).dispatch(operations)
+    return CalendarDispatcher().dispatch(operations)
+
+@frappe.whitelist()
+@instrument
+def get_calendar_breaker_state():
+    """Return the Google Calendar circuit breaker state"""
+    frappe.only_for(["System Manager", "ESL Administrator"])
+    return CircuitBreaker().get_state()
@@ -0,0 +1,170 @@
+# Reusable Google Calendar API clients
+
+import hashlib
+import json
+import random
+import string
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import frappe
+
+CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar"]
+
+# Bumped to make every worker rebuild its clients (e.g. Social Login Key changed)
+CONFIG_VERSION_KEY = "olya_google_calendar_config_version"
+
+_lock = threading.Lock()
+_discovery_document = None
+_pools = {}
+
+class CalendarClientPool:
+    """
+    Calendar API clients for one site inside this worker process.
+    
+    Parsed credentials are shared by every client; google-auth keeps the OAuth
+    access token on the credentials object and only refreshes it once it has
+    expired. Service objects are built from the cached discovery document, one
+    per thread because the underlying httplib2 transport is not thread-safe.
+    """
+    def __init__(self, fingerprint, settings, api_url=None):
+        self.fingerprint = fingerprint
+        self.api_url = api_url
+        self.credentials = build_credentials(settings, api_url)
+        self.services = {}
+    
+    def get_service(self):
+        thread_id = threading.get_ident()
+        service = self.services.get(thread_id)
+        if service is None:
+            from googleapiclient.discovery import build_from_document
+            
+            document = get_discovery_document()
+            if self.api_url:
+                # Repoint both the REST and the batch endpoints at the configured URL
+                document = dict(document, rootUrl=self.api_url, mtlsRootUrl=self.api_url)
+            
+            service = build_from_document(document, credentials=self.credentials)
+            self.services[thread_id] = service
+        
+        return service
+
+def build_credentials(settings, api_url=None):
+    """Create service account credentials, or anonymous ones for a local API stub"""
+    if settings and settings.get("service_account_json"):
+        from google.oauth2.service_account import Credentials
+        
+        return Credentials.from_service_account_info(settings["service_account_json"], scopes=CALENDAR_SCOPES)
+    
+    if api_url:
+        from google.auth.credentials import AnonymousCredentials
+        
+        return AnonymousCredentials()
+    
+    frappe.throw("Google Calendar integration not configured. Please set up Google credentials.")
+
+def get_discovery_document():
+    """Load the static Calendar v3 discovery document once per process"""
+    global _discovery_document
+    
+    if _discovery_document is None:
+        from googleapiclient.discovery_cache import get_static_doc
+        
+        _discovery_document = json.loads(get_static_doc("calendar", "v3"))
+    
+    return _discovery_document
+
+def is_calendar_configured():
+    """True when a service account or a Calendar API stub URL is configured"""
+    return bool(frappe.conf.get("google_service_account_json") or frappe.conf.get("google_calendar_api_url"))
+
+def get_config_fingerprint():
+    """Fingerprint of everything the clients are built from"""
+    cache = frappe.cache()
+    version = frappe.safe_decode(cache.get(cache.make_key(CONFIG_VERSION_KEY)) or 0)
+    payload = json.dumps([
+        frappe.conf.get("google_service_account_json"),
+        frappe.conf.get("google_calendar_api_url"),
+        version
+    ], default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def get_client_pool():
+    """Return this worker's client pool for the current site, rebuilding it if the config changed"""
+    site = frappe.local.site
+    fingerprint = get_config_fingerprint()
+    pool = _pools.get(site)
+    
+    if pool is None or pool.fingerprint != fingerprint:
+        with _lock:
+            pool = _pools.get(site)
+            if pool is None or pool.fingerprint != fingerprint:
+                from olya_bootstrap.api.calendar import get_google_credentials
+                
+                pool = CalendarClientPool(
+                    fingerprint,
+                    get_google_credentials(),
+                    api_url=frappe.conf.get("google_calendar_api_url")
+                )
+                _pools[site] = pool
+    
+    return pool
+
+def get_calendar_service():
+    """Return a ready Calendar v3 service for the current site and thread"""
+    return get_client_pool().get_service()
+
+def reset_client_pool(doc=None, method=None):
+    """Make every worker rebuild its Calendar clients (Social Login Key doc event)"""
+    cache = frappe.cache()
+    cache.incrby(cache.make_key(CONFIG_VERSION_KEY), 1)
+    _pools.pop(frappe.local.site, None)
+
+def build_meet_event(title, when, student_email=None, duration=60):
+    """
+    Calendar event body for a lesson with a Google Meet conference request.
+    
+    A naive `when` (how lessons are stored) is in the system timezone; the
+    event is sent with its UTC offset and that timezone.
+    """
+    time_zone = frappe.utils.get_system_timezone()
+    start_time = datetime.fromisoformat(str(when).replace('Z', '+00:00'))
+    if not start_time.tzinfo:
+        start_time = start_time.replace(tzinfo=ZoneInfo(time_zone))
+    end_time = start_time + timedelta(minutes=duration or 60)
+    
+    event = {
+        'summary': title,
+        'description': f'ESL Lesson: {title}',
+        'start': {
+            'dateTime': start_time.isoformat(),
+            'timeZone': time_zone,
+        },
+        'end': {
+            'dateTime': end_time.isoformat(),
+            'timeZone': time_zone,
+        },
+        'conferenceData': {
+            'createRequest': {
+                'requestId': ''.join(random.choices(string.ascii_letters + string.digits, k=16)),
+                'conferenceSolutionKey': {
+                    'type': 'hangoutsMeet'
+                }
+            }
+        },
+        'attendees': []
+    }
+    
+    # Add student email if provided
+    if student_email:
+        event['attendees'].append({'email': student_email})
+    
+    return event
+
+def extract_meet_link(event):
+    """Return the video entry point URI of a created event"""
+    for entry_point in (event.get('conferenceData') or {}).get('entryPoints', []):
+        if entry_point.get('entryPointType') == 'video':
+            return entry_point.get('uri')
+    return None
@@ -0,0 +1,9 @@
+import frappe
+from olya_bootstrap.doctype.esl_lesson.esl_lesson import on_doctype_update
+
+def execute():
+    """Add composite (teacher|student|status, scheduled_time) indexes to existing sites"""
+    if not frappe.db.table_exists("ESL Lesson"):
+        return
+
+    on_doctype_update()
@@ -0,0 +1,9 @@
+import frappe
+from olya_bootstrap.doctype.esl_lesson.esl_lesson import on_doctype_update
+
+def execute():
+    """Add the (teacher|student, modified) indexes used by calendar sync"""
+    if not frappe.db.table_exists("ESL Lesson"):
+        return
+
+    on_doctype_update()
@@ -0,0 +1,9 @@
+import frappe
+
+def execute():
+    """Fill the stored end time of existing lessons from scheduled_time + duration"""
+    frappe.db.sql("""
+        update `tabESL Lesson`
+        set scheduled_end = timestampadd(minute, ifnull(nullif(duration, 0), 60), scheduled_time)
+        where scheduled_end is null and scheduled_time is not null
+    """)
@@ -0,0 +1,24 @@
+import frappe
+
+from olya_bootstrap.doctype.esl_lesson.esl_lesson import set_lesson_start_utc
+
+# Lessons read and updated per batch
+BATCH_SIZE = 5000
+
+def execute():
+    """Fill the UTC start of existing lessons, in batches keyed on the lesson name"""
+    last_name = ""
+    while True:
+        lessons = frappe.db.sql("""
+            select name, scheduled_time
+            from `tabESL Lesson`
+            where name > %(last_name)s and scheduled_time_utc is null and scheduled_time is not null
+            order by name
+            limit %(limit)s
+        """, {"last_name": last_name, "limit": BATCH_SIZE}, as_dict=True)
+        if not lessons:
+            break
+        
+        set_lesson_start_utc(lessons)
+        frappe.db.commit()
+        last_name = lessons[-1].name
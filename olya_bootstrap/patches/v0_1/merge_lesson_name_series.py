@@ -0,0 +1,18 @@
+import frappe
+from olya_bootstrap.doctype.esl_lesson.esl_lesson import get_lesson_naming
+
+def execute():
+    """Move the counter of bulk-reserved lesson names onto the key Document.insert uses"""
+    prefix, key, digits = get_lesson_naming()
+    if key == prefix:
+        return
+    
+    old = frappe.db.sql("select current from `tabSeries` where name = %s", prefix)
+    if not old:
+        return
+    
+    frappe.db.sql("""
+        insert into `tabSeries` (name, current) values (%(key)s, %(current)s)
+        on duplicate key update current = greatest(current, %(current)s)
+    """, {"key": key, "current": old[0][0]})
+    frappe.db.sql("delete from `tabSeries` where name = %s", prefix)
@@ -0,0 +1,112 @@
+import frappe
+
+from olya_bootstrap.instrumentation import instrument
+
+# Per-user portal payloads live under this prefix in the site cache
+PORTAL_CACHE_PREFIX = "olya_portal_data"
+PORTAL_CACHE_STATS_KEY = "olya_portal_cache_stats"
+
+# Safety net: "upcoming" lessons drift with time even without document changes
+PORTAL_CACHE_TTL = 10 * 60
+
+def get_cache_key(user):
+    return f"{PORTAL_CACHE_PREFIX}:{user}"
+
+def get_cached_portal_data(user):
+    """Return the cached portal payload for a user, or None on a miss"""
+    data = frappe.cache().get_value(get_cache_key(user))
+    record_cache_access(hit=data is not None)
+    return data
+
+def set_cached_portal_data(user, data):
+    """Store the assembled portal payload for a user"""
+    frappe.cache().set_value(get_cache_key(user), data, expires_in_sec=PORTAL_CACHE_TTL)
+
+def clear_portal_cache(users):
+    """Drop the cached portal payload for the given users"""
+    keys = [get_cache_key(user) for user in set(users) if user]
+    if keys:
+        frappe.cache().delete_value(keys)
+
+def clear_portal_cache_for_lessons(teachers, students):
+    """
+    Drop cached portal data after a bulk lesson change that bypassed doc events.
+    
+    Args:
+        teachers: Teacher emails of the changed lessons
+        students: ESL Student names of the changed lessons
+    """
+    students = {student for student in students if student}
+    student_emails = frappe.get_all("ESL Student",
+        filters={"name": ["in", list(students)]},
+        pluck="email"
+    ) if students else []
+    
+    clear_portal_cache([*teachers, *student_emails])
+
+def record_cache_access(hit):
+    cache = frappe.cache()
+    cache.hincrby(cache.make_key(PORTAL_CACHE_STATS_KEY), "hits" if hit else "misses", 1)
+
+@frappe.whitelist()
+@instrument
+def get_portal_cache_stats():
+    """
+    Return portal cache hit/miss counters for this site.
+    
+    Returns:
+        dict: hits, misses and hit_ratio
+    """
+    frappe.only_for(["System Manager", "ESL Administrator"])
+    
+    # Read raw through a pipeline: the wrapper's hgetall re-keys and unpickles values
+    cache = frappe.cache()
+    counters = cache.pipeline().hgetall(cache.make_key(PORTAL_CACHE_STATS_KEY)).execute()[0] or {}
+    counters = {frappe.safe_decode(key): frappe.utils.cint(frappe.safe_decode(value)) for key, value in counters.items()}
+    hits = counters.get("hits", 0)
+    misses = counters.get("misses", 0)
+    
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0
+    }
+
+@frappe.whitelist()
+@instrument
+def reset_portal_cache_stats():
+    """Reset the portal cache hit/miss counters"""
+    frappe.only_for(["System Manager", "ESL Administrator"])
+    
+    cache = frappe.cache()
+    cache.delete(cache.make_key(PORTAL_CACHE_STATS_KEY))
+
+def get_student_email(student):
+    return frappe.db.get_value("ESL Student", student, "email") if student else None
+
+def invalidate_for_lesson(doc, method=None):
+    """Drop cached portal data of the teacher and student of a lesson (doc event)"""
+    users = [doc.teacher, get_student_email(doc.student)]
+    
+    previous = doc.get_doc_before_save() if method != "on_trash" else None
+    if previous:
+        if previous.teacher != doc.teacher:
+            users.append(previous.teacher)
+        if previous.student != doc.student:
+            users.append(get_student_email(previous.student))
+    
+    clear_portal_cache(users)
+
+def invalidate_for_student(doc, method=None):
+    """Drop cached portal data of a student and their teacher (doc event)"""
+    users = [doc.email, doc.teacher]
+    
+    previous = doc.get_doc_before_save() if method != "on_trash" else None
+    if previous:
+        users.extend([previous.email, previous.teacher])
+    
+    clear_portal_cache(users)
+
+def invalidate_for_user(doc, method=None):
+    """Drop the cached portal data of a user whose roles may have changed (doc event)"""
+    clear_portal_cache([doc.name])
@@ -1,4 +1,8 @@
 import frappe
+from olya_bootstrap.api.history import get_lesson_page
+from olya_bootstrap.portal.cache import get_cached_portal_data, set_cached_portal_data
+from olya_bootstrap.instrumentation import instrument
+from olya_bootstrap.responses import compact_response
 
 def get_portal_menu_items():
     """
@@ -97,37 +101,54 @@ def get_portal_settings():
     }
 
 @frappe.whitelist()
-def get_user_portal_data():
+@instrument
+def get_user_portal_data(compact=None):
     """
     Get personalized portal data for the current user.
     
     Returns different data based on user role (Teacher vs Student).
+    Payloads are cached per user and dropped by ESL Lesson / ESL Student
+    document events (see olya_bootstrap.portal.cache). With `compact` set the
+    payload is returned pre-serialized and gzipped when large.
     """
     try:
         user = frappe.session.user
-        user_roles = frappe.get_roles(user)
-        
-        data = {
-            "user": user,
-            "roles": user_roles,
-            "is_teacher": "ESL Teacher" in user_roles,
-            "is_student": "ESL Student" in user_roles,
-            "is_admin": "ESL Administrator" in user_roles
-        }
-        
-        if data["is_teacher"]:
-            # Get teacher-specific data
-            data.update(get_teacher_portal_data(user))
-        elif data["is_student"]:
-            # Get student-specific data  
-            data.update(get_student_portal_data(user))
+        if user == "Guest":
+            data = build_user_portal_data(user)
+        else:
+            data = get_cached_portal_data(user)
+            if data is None:
+                data = build_user_portal_data(user)
+                if "error" not in data:
+                    set_cached_portal_data(user, data)
         
-        return data
+        return compact_response(data) if frappe.utils.cint(compact) else data
         
     except Exception as e:
         frappe.log_error(f"Failed to get portal data: {str(e)}")
         return {"error": str(e)}
 
+def build_user_portal_data(user):
+    """Assemble the portal payload for a user from the database"""
+    user_roles = frappe.get_roles(user)
+    
+    data = {
+        "user": user,
+        "roles": user_roles,
+        "is_teacher": "ESL Teacher" in user_roles,
+        "is_student": "ESL Student" in user_roles,
+        "is_admin": "ESL Administrator" in user_roles
+    }
+    
+    if data["is_teacher"]:
+        # Get teacher-specific data
+        data.update(get_teacher_portal_data(user))
+    elif data["is_student"]:
+        # Get student-specific data  
+        data.update(get_student_portal_data(user))
+    
+    return data
+
 def get_teacher_portal_data(teacher_email):
     """Get portal data specific to teachers"""
     try:
@@ -139,35 +160,24 @@ def get_teacher_portal_data(teacher_email):
         )
         
         # Get upcoming lessons
-        upcoming_lessons = frappe.get_all("ESL Lesson",
-            filters={
-                "teacher": teacher_email,
-                "status": "Scheduled",
-                "scheduled_time": [">=", frappe.utils.now()]
-            },
-            fields=["name", "title", "student", "scheduled_time"],
-            order_by="scheduled_time",
-            limit=5
-        )
+        upcoming = get_lesson_page(teacher=teacher_email, upcoming=True, status="Scheduled", limit=5)
         
         # Get recent lessons
-        recent_lessons = frappe.get_all("ESL Lesson",
-            filters={"teacher": teacher_email},
-            fields=["name", "title", "student", "scheduled_time", "status"],
-            order_by="scheduled_time desc",
-            limit=5
-        )
+        recent = get_lesson_page(teacher=teacher_email, limit=5)
         
         return {
             "students": students,
-            "upcoming_lessons": upcoming_lessons,
-            "recent_lessons": recent_lessons,
+            "upcoming_lessons": upcoming["lessons"],
+            "upcoming_cursor": upcoming["next_cursor"],
+            "recent_lessons": recent["lessons"],
+            "recent_cursor": recent["next_cursor"],
             "student_count": len(students)
         }
         
     except Exception as e:
         frappe.log_error(f"Failed to get teacher portal data: {str(e)}")
-        return {}
+        # Like the student path, so get_user_portal_data does not cache the failure
+        return {"error": str(e)}
 
 def get_student_portal_data(student_email):
     """Get portal data specific to students"""
@@ -179,16 +189,11 @@ def get_student_portal_data(student_email):
         if not student_record:
             return {"error": "Student profile not found"}
         
-        # Get student's lessons
-        lessons = frappe.get_all("ESL Lesson",
-            filters={"student": student_record.name},
-            fields=["name", "title", "scheduled_time", "status", "meet_link"],
-            order_by="scheduled_time desc",
-            limit=10
-        )
+        # Get student's recent lessons
+        recent = get_lesson_page(student=student_record.name, limit=10)
         
         # Get upcoming lessons
-        upcoming_lessons = [l for l in lessons if l.status == "Scheduled"]
+        upcoming = get_lesson_page(student=student_record.name, upcoming=True, status="Scheduled", limit=10)
         
         # Get teacher info
         teacher_info = None
@@ -198,10 +203,12 @@ def get_student_portal_data(student_email):
         
         return {
             "student_profile": student_record,
-            "lessons": lessons,
-            "upcoming_lessons": upcoming_lessons,
+            "lessons": recent["lessons"],
+            "lessons_cursor": recent["next_cursor"],
+            "upcoming_lessons": upcoming["lessons"],
+            "upcoming_cursor": upcoming["next_cursor"],
             "teacher_info": teacher_info,
-            "lesson_count": len(lessons)
+            "lesson_count": frappe.db.count("ESL Lesson", {"student": student_record.name})
         }
         
     except Exception as e:
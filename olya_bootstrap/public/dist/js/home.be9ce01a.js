@@ -0,0 +1,43 @@
+function handleEmailSignup(event) {
+event.preventDefault();
+const email = event.target.querySelector('input[type="email"]').value;
+if (!email) {
+alert('Please enter your email address');
+return;
+}
+localStorage.setItem('olya_email_signup', email);
+const button = event.target.querySelector('.notify-btn');
+const originalText = button.textContent;
+button.textContent = 'Thank you!';
+button.style.background = '#10b981';
+setTimeout(() => {
+button.textContent = originalText;
+button.style.background = '';
+event.target.reset();
+}, 2000);
+console.log('Email signup:', email);
+}
+document.addEventListener('DOMContentLoaded', function() {
+const card = document.querySelector('.hero-card');
+const features = document.querySelectorAll('.feature');
+features.forEach((feature, index) => {
+feature.style.opacity = '0';
+feature.style.transform = 'translateY(20px)';
+setTimeout(() => {
+feature.style.transition = 'all 0.6s ease';
+feature.style.opacity = '1';
+feature.style.transform = 'translateY(0)';
+}, 200 * (index + 1));
+});
+document.addEventListener('mousemove', function(e) {
+const elements = document.querySelectorAll('.floating-element');
+const x = e.clientX / window.innerWidth;
+const y = e.clientY / window.innerHeight;
+elements.forEach((element, index) => {
+const speed = (index + 1) * 0.5;
+const xPos = (x - 0.5) * speed * 50;
+const yPos = (y - 0.5) * speed * 50;
+element.style.transform = `translate(${xPos}px, ${yPos}px)`;
+});
+});
+});
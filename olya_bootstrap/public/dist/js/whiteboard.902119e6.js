@@ -0,0 +1,26 @@
+function hideLoading() {
+const overlay = document.getElementById('loadingOverlay');
+if (overlay) {
+overlay.style.opacity = '0';
+setTimeout(() => {
+overlay.style.display = 'none';
+}, 500);
+}
+}
+document.querySelector('.whiteboard-frame').addEventListener('load', hideLoading);
+setTimeout(hideLoading, 3000);
+window.addEventListener('message', function(event) {
+if (event.origin === 'https://excalidraw.com') {
+console.log('Message from Excalidraw:', event.data);
+}
+});
+document.addEventListener('keydown', function(e) {
+if ((e.ctrlKey || e.metaKey) && e.key === 'h') {
+e.preventDefault();
+window.location.href = '/';
+}
+if ((e.ctrlKey || e.metaKey) && e.key === 'l') {
+e.preventDefault();
+window.location.href = '/app/esl-lesson';
+}
+});
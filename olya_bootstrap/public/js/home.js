@@ -0,0 +1,62 @@
+// Coming soon page (www/index.html)
+
+function handleEmailSignup(event) {
+    event.preventDefault();
+    const email = event.target.querySelector('input[type="email"]').value;
+
+    // Simple validation
+    if (!email) {
+        alert('Please enter your email address');
+        return;
+    }
+
+    // Store email (you can integrate with your backend here)
+    localStorage.setItem('olya_email_signup', email);
+
+    // Show success message
+    const button = event.target.querySelector('.notify-btn');
+    const originalText = button.textContent;
+    button.textContent = 'Thank you!';
+    button.style.background = '#10b981';
+
+    setTimeout(() => {
+        button.textContent = originalText;
+        button.style.background = '';
+        event.target.reset();
+    }, 2000);
+
+    // You can add API call here to save email to your database
+    console.log('Email signup:', email);
+}
+
+// Add some interactive animations
+document.addEventListener('DOMContentLoaded', function() {
+    const card = document.querySelector('.hero-card');
+    const features = document.querySelectorAll('.feature');
+
+    // Stagger animation for features
+    features.forEach((feature, index) => {
+        feature.style.opacity = '0';
+        feature.style.transform = 'translateY(20px)';
+
+        setTimeout(() => {
+            feature.style.transition = 'all 0.6s ease';
+            feature.style.opacity = '1';
+            feature.style.transform = 'translateY(0)';
+        }, 200 * (index + 1));
+    });
+
+    // Parallax effect for floating elements
+    document.addEventListener('mousemove', function(e) {
+        const elements = document.querySelectorAll('.floating-element');
+        const x = e.clientX / window.innerWidth;
+        const y = e.clientY / window.innerHeight;
+
+        elements.forEach((element, index) => {
+            const speed = (index + 1) * 0.5;
+            const xPos = (x - 0.5) * speed * 50;
+            const yPos = (y - 0.5) * speed * 50;
+            element.style.transform = `translate(${xPos}px, ${yPos}px)`;
+        });
+    });
+});
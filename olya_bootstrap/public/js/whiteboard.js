@@ -0,0 +1,40 @@
+// Whiteboard page (www/whiteboard.html)
+
+function hideLoading() {
+    const overlay = document.getElementById('loadingOverlay');
+    if (overlay) {
+        overlay.style.opacity = '0';
+        setTimeout(() => {
+            overlay.style.display = 'none';
+        }, 500);
+    }
+}
+
+// Deferred, so the iframe exists when this runs
+document.querySelector('.whiteboard-frame').addEventListener('load', hideLoading);
+
+// Auto-hide loading after 3 seconds as fallback
+setTimeout(hideLoading, 3000);
+
+// Handle iframe communication if needed
+window.addEventListener('message', function(event) {
+    // Handle messages from Excalidraw if needed
+    if (event.origin === 'https://excalidraw.com') {
+        console.log('Message from Excalidraw:', event.data);
+    }
+});
+
+// Keyboard shortcuts
+document.addEventListener('keydown', function(e) {
+    // Ctrl/Cmd + H to go home
+    if ((e.ctrlKey || e.metaKey) && e.key === 'h') {
+        e.preventDefault();
+        window.location.href = '/';
+    }
+
+    // Ctrl/Cmd + L to go to lessons
+    if ((e.ctrlKey || e.metaKey) && e.key === 'l') {
+        e.preventDefault();
+        window.location.href = '/app/esl-lesson';
+    }
+});
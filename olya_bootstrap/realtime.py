@@ -0,0 +1,113 @@
+# Realtime push of lesson changes to the teacher and student of each lesson
+
+import frappe
+
+LESSON_CHANGE_EVENT = "olya_lesson_changed"
+
+# Fields pushed to open forms and calendars; other edits are left to the form's own reload
+LESSON_CHANGE_FIELDS = ("title", "student", "teacher", "scheduled_time", "duration", "status", "meet_link")
+
+def publish_lesson_change(doc, method=None):
+    """Queue a change message for the lesson's teacher and student (doc event)"""
+    if method == "on_trash":
+        queue_lesson_changes([doc.name], "delete", owners=[(doc.teacher, doc.student)])
+        return
+    
+    previous = doc.get_doc_before_save()
+    if doc.flags.in_insert or not previous:
+        queue_lesson_changes([doc.name], "insert", LESSON_CHANGE_FIELDS)
+        return
+    
+    fields = [field for field in LESSON_CHANGE_FIELDS if previous.get(field) != doc.get(field)]
+    if fields:
+        # The previous teacher/student also hear about a lesson moved away from them
+        queue_lesson_changes([doc.name], "update", fields, owners=[(previous.teacher, previous.student)])
+
+def queue_lesson_changes(lessons, action="update", fields=None, owners=None):
+    """
+    Record lesson changes to push once the transaction commits.
+    
+    Changes are coalesced per lesson and sent as one message per user, so
+    repeated saves and bulk updates in a transaction cost one push per room.
+    
+    Args:
+        lessons: ESL Lesson names
+        action: insert, update or delete
+        fields: Names of the changed fields
+        owners: Extra (teacher, student) pairs to notify, e.g. of deleted lessons
+    """
+    pending = getattr(frappe.local, "olya_lesson_changes", None)
+    if pending is None:
+        pending = frappe.local.olya_lesson_changes = {}
+        frappe.db.after_commit.add(flush_lesson_changes)
+        frappe.db.after_rollback.add(discard_lesson_changes)
+    
+    for lesson in lessons:
+        change = pending.setdefault(lesson, {"action": action, "fields": set(), "owners": set()})
+        if action == "delete" or change["action"] != "insert":
+            change["action"] = action
+        change["fields"].update(fields or ())
+        change["owners"].update(owners or ())
+
+def discard_lesson_changes():
+    frappe.local.olya_lesson_changes = None
+
+def flush_lesson_changes():
+    """Publish the queued changes, one message per teacher/student room"""
+    from olya_bootstrap.api.calendar import serialize_calendar_event
+    
+    pending = getattr(frappe.local, "olya_lesson_changes", None)
+    frappe.local.olya_lesson_changes = None
+    if not pending:
+        return
+    
+    try:
+        lessons = {
+            lesson.name: lesson
+            for lesson in frappe.db.sql("""
+                select
+                    lesson.name, lesson.title, lesson.student, lesson.teacher,
+                    lesson.scheduled_time, lesson.scheduled_end, lesson.duration, lesson.status,
+                    lesson.meet_link, lesson.modified, student.student_name, student.email as student_email
+                from `tabESL Lesson` lesson
+                left join `tabESL Student` student on student.name = lesson.student
+                where lesson.name in %(names)s
+            """, {"names": list(pending)}, as_dict=True)
+        }
+        
+        # Emails of students who no longer (or never did) appear on a live lesson row
+        other_students = {student for change in pending.values() for _, student in change["owners"] if student}
+        student_emails = dict(frappe.get_all("ESL Student",
+            filters={"name": ["in", list(other_students)]},
+            fields=["name", "email"],
+            as_list=True
+        )) if other_students else {}
+        
+        messages = {}
+        for name, change in pending.items():
+            lesson = lessons.get(name)
+            current = set()
+            former = {user for teacher, student in change["owners"]
+                for user in (teacher, student_emails.get(student)) if user}
+            
+            if lesson:
+                current = {user for user in (lesson.teacher, lesson.student_email) if user}
+                payload = {
+                    "lesson": name,
+                    "action": change["action"],
+                    "changed": {field: lesson.get(field) for field in sorted(change["fields"])},
+                    "modified": str(lesson.modified),
+                    "event": serialize_calendar_event(lesson)
+                }
+                for user in current:
+                    messages.setdefault(user, []).append(payload)
+            
+            # Deleted lessons, and lessons moved to another teacher or student
+            for user in former - current:
+                messages.setdefault(user, []).append({"lesson": name, "action": "delete"})
+        
+        for user, changes in messages.items():
+            frappe.publish_realtime(LESSON_CHANGE_EVENT, {"changes": changes}, user=user)
+    except Exception as e:
+        # Clients still see the change on their next load
+        frappe.log_error(f"Failed to publish lesson changes: {str(e)}")
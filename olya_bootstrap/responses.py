@@ -0,0 +1,59 @@
+# Compact JSON responses for large calendar and portal payloads
+
+import gzip
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import frappe
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bodies at least this large are gzipped when the client accepts it
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+
+def json_default(value):
+    """Same string forms as frappe's JSON handler, so both modes return equal values"""
+    if isinstance(value, (datetime, date, time, timedelta)):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value):
+    """Serialize to UTF-8 JSON bytes, with orjson when it is installed"""
+    if orjson:
+        return orjson.dumps(value, default=json_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(value, default=json_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+def accepts_gzip():
+    request = getattr(frappe.local, "request", None)
+    return "gzip" in (request.headers.get("Accept-Encoding") or "").lower() if request else False
+
+def encode_compact(data, gzip_body=False):
+    """
+    Encode `data` in frappe's {"message": ...} envelope.
+    
+    Returns:
+        tuple: Body bytes and the response headers that go with them
+    """
+    body = dumps({"message": data})
+    headers = {"Vary": "Accept-Encoding"}
+    if gzip_body and len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body, GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+def compact_response(data):
+    """Return `data` as a pre-serialized JSON response, bypassing frappe's json.dumps"""
+    from werkzeug.wrappers import Response
+    
+    body, headers = encode_compact(data, accepts_gzip())
+    return Response(body, status=200, headers=headers, content_type="application/json; charset=utf-8")
@@ -0,0 +1 @@
+# OLYA Bootstrap background jobs
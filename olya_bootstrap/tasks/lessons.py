@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+import frappe
+
+from olya_bootstrap.portal.cache import clear_portal_cache_for_lessons
+from olya_bootstrap.realtime import queue_lesson_changes
+
+# Same rule as ESLLesson.before_save: Scheduled lessons are done 2 hours after start
+AUTO_COMPLETE_AFTER = timedelta(hours=2)
+AUTO_COMPLETE_CHUNK_SIZE = 5000
+
+def auto_complete_lessons():
+    """
+    Hourly job: mark overdue Scheduled lessons as Completed.
+    
+    Works in chunks over the (status, scheduled_time) index with set-based
+    UPDATEs and never loads the documents.
+    
+    Returns:
+        int: Number of lessons completed
+    """
+    cutoff = frappe.utils.now_datetime() - AUTO_COMPLETE_AFTER
+    completed = 0
+    
+    while True:
+        lessons = frappe.db.sql("""
+            select name, teacher, student
+            from `tabESL Lesson`
+            where status = 'Scheduled' and scheduled_time < %s
+            order by scheduled_time
+            limit %s
+        """, (cutoff, AUTO_COMPLETE_CHUNK_SIZE), as_dict=True)
+        if not lessons:
+            break
+        
+        frappe.db.sql("""
+            update `tabESL Lesson`
+            set status = 'Completed', modified = %s, modified_by = %s
+            where name in %s and status = 'Scheduled'
+        """, (frappe.utils.now(), "Administrator", [lesson.name for lesson in lessons]))
+        # Pushed to open forms and calendars when the chunk commits
+        queue_lesson_changes([lesson.name for lesson in lessons], "update", ["status"])
+        frappe.db.commit()
+        
+        clear_portal_cache_for_lessons(
+            {lesson.teacher for lesson in lessons if lesson.teacher},
+            {lesson.student for lesson in lessons}
+        )
+        completed += len(lessons)
+        
+        if len(lessons) < AUTO_COMPLETE_CHUNK_SIZE:
+            break
+    
+    if completed:
+        from olya_bootstrap.assignment import rebuild_teacher_load
+        rebuild_teacher_load()
+        
+        frappe.logger("olya_bootstrap").info(
+            f"Auto-completed {completed} lessons scheduled before {frappe.utils.format_datetime(cutoff)}"
+        )
+    
+    return completed
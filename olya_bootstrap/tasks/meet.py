@@ -0,0 +1,227 @@
+import frappe
+from frappe.utils.background_jobs import is_job_enqueued
+
+from olya_bootstrap.portal.cache import clear_portal_cache_for_lessons
+from olya_bootstrap.realtime import queue_lesson_changes
+
+# Lessons per job; larger sets (e.g. a new series) go to the long queue
+MEET_BATCH_SIZE = 50
+MEET_LINK_EVENT = "olya_meet_link_ready"
+
+# Pool events are created this far ahead and moved to the lesson time when claimed
+POOL_PLACEHOLDER_DAYS = 30
+POOL_PLACEHOLDER_TITLE = "Reserved ESL Lesson"
+
+def enqueue_meet_provisioning(lessons):
+    """
+    Queue Meet link creation for one or many lessons after the current commit.
+    
+    A single lesson with provisioning already queued is not queued twice.
+    """
+    from olya_bootstrap.integrations.google_calendar import is_calendar_configured
+    
+    lessons = [lesson for lesson in lessons if lesson]
+    if not lessons or not is_calendar_configured():
+        return
+    
+    job_id = f"olya_meet_link::{lessons[0]}" if len(lessons) == 1 else None
+    if job_id and is_job_enqueued(job_id):
+        return
+    
+    frappe.enqueue(
+        "olya_bootstrap.tasks.meet.provision_meet_links",
+        queue="default" if len(lessons) <= MEET_BATCH_SIZE else "long",
+        job_id=job_id,
+        enqueue_after_commit=True,
+        lessons=lessons
+    )
+
+def provision_meet_links(lessons):
+    """Background job: create Meet links for lessons that do not have one yet"""
+    rows = frappe.db.sql("""
+        select lesson.name, lesson.title, lesson.scheduled_time, lesson.duration,
+            lesson.teacher, lesson.student, student.email as student_email
+        from `tabESL Lesson` lesson
+        left join `tabESL Student` student on student.name = lesson.student
+        where lesson.name in %(lessons)s and ifnull(lesson.meet_link, '') = ''
+    """, {"lessons": tuple(lessons)}, as_dict=True)
+    if not rows:
+        return
+    
+    results = create_meet_links(rows)
+    failed = []
+    
+    for row in rows:
+        result = results.get(row.name)
+        if not result or not result.get("meet_link"):
+            failed.append(row.name)
+            publish_meet_link(row.name, error=(result or {}).get("error") or "No Meet link returned")
+            continue
+        
+        # Single-column update: no validate/save cycle just to store the link
+        modified = frappe.utils.now()
+        frappe.db.set_value("ESL Lesson", row.name, {
+            "meet_link": result["meet_link"],
+            "calendar_event_id": result["event_id"],
+            "modified": modified
+        }, update_modified=False)
+        publish_meet_link(row.name, result["meet_link"], result["event_id"], modified)
+    
+    clear_portal_cache_for_lessons([row.teacher for row in rows], [row.student for row in rows])
+    queue_lesson_changes([row.name for row in rows if row.name not in failed], "update", ["meet_link"])
+    
+    if failed:
+        frappe.log_error(f"Failed to create Google Meet links for: {', '.join(failed)}")
+
+def create_meet_links(rows):
+    """
+    Create Meet links for lesson rows through the batched Calendar dispatcher.
+    
+    Without Google Calendar configured every row gets an error: the stub link
+    generator must never put made-up Meet links on real lessons.
+    
+    Returns:
+        dict: {lesson: {"meet_link", "event_id"} or {"error"}}
+    """
+    from olya_bootstrap.integrations.google_calendar import (
+        build_meet_event,
+        extract_meet_link,
+        is_calendar_configured
+    )
+    
+    if not is_calendar_configured():
+        return {row.name: {"error": "Google Calendar is not configured"} for row in rows}
+    
+    from olya_bootstrap.integrations.calendar_dispatch import dispatch_calendar_requests, insert_event
+    
+    responses = dispatch_calendar_requests([
+        insert_event(build_meet_event(row.title, row.scheduled_time, row.student_email, row.duration))
+        for row in rows
+    ])
+    
+    results = {}
+    for row, response in zip(rows, responses):
+        if response["ok"]:
+            results[row.name] = {
+                "meet_link": extract_meet_link(response["response"]),
+                "event_id": response["response"].get("id")
+            }
+        else:
+            results[row.name] = {"error": response["error"]}
+    
+    return results
+
+def publish_meet_link(lesson, meet_link=None, event_id=None, modified=None, error=None):
+    """Push the provisioning result to users who have the lesson form open"""
+    frappe.publish_realtime(
+        MEET_LINK_EVENT,
+        {
+            "lesson": lesson,
+            "meet_link": meet_link,
+            "calendar_event_id": event_id,
+            "modified": modified,
+            "error": error
+        },
+        doctype="ESL Lesson",
+        docname=lesson,
+        after_commit=True
+    )
+
+def enqueue_claimed_event_updates(lessons):
+    """Queue moving claimed pool events to their lessons' time and attendees"""
+    from olya_bootstrap.integrations.google_calendar import is_calendar_configured
+    
+    lessons = [lesson for lesson in lessons if lesson]
+    if lessons and is_calendar_configured():
+        frappe.enqueue(
+            "olya_bootstrap.tasks.meet.update_claimed_events",
+            queue="default" if len(lessons) <= MEET_BATCH_SIZE else "long",
+            enqueue_after_commit=True,
+            lessons=lessons
+        )
+
+def update_claimed_events(lessons):
+    """Background job: patch claimed pool events with the real lesson details"""
+    from olya_bootstrap.integrations.calendar_dispatch import dispatch_calendar_requests, update_event
+    from olya_bootstrap.integrations.google_calendar import build_meet_event
+    
+    rows = frappe.db.sql("""
+        select lesson.name, lesson.title, lesson.scheduled_time, lesson.duration,
+            lesson.calendar_event_id, student.email as student_email
+        from `tabESL Lesson` lesson
+        left join `tabESL Student` student on student.name = lesson.student
+        where lesson.name in %(lessons)s and ifnull(lesson.calendar_event_id, '') != ''
+    """, {"lessons": tuple(lessons)}, as_dict=True)
+    if not rows:
+        return
+    
+    operations = []
+    for row in rows:
+        body = build_meet_event(row.title, row.scheduled_time, row.student_email, row.duration)
+        # Keep the conference that already exists on the pooled event
+        body.pop("conferenceData", None)
+        operations.append(update_event(row.calendar_event_id, body))
+    
+    failed = [row.name for row, result in zip(rows, dispatch_calendar_requests(operations)) if not result["ok"]]
+    if failed:
+        frappe.log_error(f"Failed to update claimed Calendar events for: {', '.join(failed)}")
+
+def enqueue_meet_pool_refill():
+    """Queue a pool refill unless one is already waiting"""
+    job_id = "olya_meet_pool_refill"
+    if not is_job_enqueued(job_id):
+        frappe.enqueue("olya_bootstrap.tasks.meet.refill_meet_pool", queue="long", job_id=job_id)
+
+def refill_meet_pool():
+    """
+    Scheduler job: top up every teacher's Meet link pool.
+    
+    Teachers below the low watermark are refilled up to the high watermark;
+    all missing links are created in one dispatch and stored with one bulk insert.
+    Does nothing until Google Calendar is configured.
+    """
+    from olya_bootstrap.assignment import get_esl_teachers
+    from olya_bootstrap.doctype.esl_meet_slot.esl_meet_slot import get_watermarks
+    from olya_bootstrap.integrations.google_calendar import is_calendar_configured
+    
+    if not is_calendar_configured():
+        return
+    
+    teachers = get_esl_teachers()
+    if not teachers:
+        return
+    
+    low, high = get_watermarks()
+    available = dict(frappe.db.sql("""
+        select teacher, count(*) from `tabESL Meet Slot`
+        where teacher in %s
+        group by teacher
+    """, (teachers,)))
+    
+    placeholder = frappe.utils.add_days(frappe.utils.now_datetime(), POOL_PLACEHOLDER_DAYS)
+    rows = []
+    for teacher in teachers:
+        count = frappe.utils.cint(available.get(teacher))
+        if count < low:
+            rows.extend(
+                frappe._dict(name=f"{teacher}::{index}", teacher=teacher, title=POOL_PLACEHOLDER_TITLE,
+                    scheduled_time=placeholder, duration=60, student_email=None)
+                for index in range(high - count)
+            )
+    if not rows:
+        return
+    
+    results = create_meet_links(rows)
+    now = frappe.utils.now()
+    slots = [
+        (frappe.generate_hash(length=10), row.teacher, results[row.name]["meet_link"],
+            results[row.name].get("event_id"), now, now, "Administrator", "Administrator")
+        for row in rows if results.get(row.name, {}).get("meet_link")
+    ]
+    
+    frappe.db.bulk_insert("ESL Meet Slot",
+        ["name", "teacher", "meet_link", "calendar_event_id", "creation", "modified", "owner", "modified_by"],
+        slots)
+    
+    if len(slots) < len(rows):
+        frappe.log_error(f"Meet pool refill created {len(slots)} of {len(rows)} links")
@@ -0,0 +1,129 @@
+import json
+import time
+
+import frappe
+from frappe.utils.background_jobs import get_queues_timeout, is_job_enqueued
+
+from olya_bootstrap.instrumentation import instrument
+
+# Dedicated RQ queue; configure a worker for it in common_site_config.json "workers"
+NOTIFICATION_QUEUE = "olya_notifications"
+MAX_ATTEMPTS = 3
+PENDING_NOTIFICATIONS_KEY = "olya_notifications_pending"
+
+# Failed notifications wait in a Redis sorted set, scored by when they are due,
+# until the per-minute scheduler job queues them again
+RETRY_NOTIFICATIONS_KEY = "olya_notifications_retry"
+RETRY_DELAYS = {2: 60, 3: 5 * 60}   # attempt: seconds after the previous failure
+
+def get_notification_queue():
+    """Use the dedicated queue when a worker is configured for it, else the default queue"""
+    return NOTIFICATION_QUEUE if NOTIFICATION_QUEUE in get_queues_timeout() else "default"
+
+# Controller method that renders and sends the notification for each doctype
+NOTIFICATION_METHODS = {
+    "ESL Lesson": "send_lesson_notification",
+    "ESL Lesson Series": "send_series_notification"
+}
+
+def get_job_id(doctype, name, attempt=1):
+    job_id = f"olya_notification::{doctype}::{name}"
+    return job_id if attempt == 1 else f"{job_id}::retry{attempt}"
+
+def enqueue_notification(doctype, name, attempt=1, sent=None):
+    """
+    Queue the notification emails for a lesson or lesson series.
+    
+    A document that already has a queued notification is not queued twice.
+    The job and the pending count both wait for the current commit, so a
+    rolled back transaction leaves neither behind.
+    
+    Args:
+        sent: Recipients an earlier attempt already emailed
+    """
+    job_id = get_job_id(doctype, name, attempt)
+    if is_job_enqueued(job_id):
+        return
+    
+    frappe.enqueue(
+        "olya_bootstrap.tasks.notifications.send_notification",
+        queue=get_notification_queue(),
+        job_id=job_id,
+        enqueue_after_commit=True,
+        doctype=doctype,
+        name=name,
+        attempt=attempt,
+        sent=sent or []
+    )
+    frappe.db.after_commit.add(increment_pending_count)
+
+def enqueue_lesson_notification(lesson, attempt=1):
+    """Queue the "lesson scheduled" emails for a lesson"""
+    enqueue_notification("ESL Lesson", lesson, attempt)
+
+def enqueue_series_notification(series, attempt=1):
+    """Queue one summary email per participant for a lesson series"""
+    enqueue_notification("ESL Lesson Series", series, attempt)
+
+def send_notification(doctype, name, attempt=1, sent=None):
+    """
+    Background job: send the notification, retrying on failure.
+    
+    The controller method adds each recipient to `sent` once their email is
+    queued, so a retry only emails the recipients that were missed.
+    """
+    sent = list(sent or [])
+    try:
+        if frappe.db.exists(doctype, name):
+            doc = frappe.get_doc(doctype, name)
+            getattr(doc, NOTIFICATION_METHODS[doctype])(sent=sent)
+    except Exception:
+        # The failure is already logged by the controller method
+        if attempt < MAX_ATTEMPTS:
+            schedule_retry(doctype, name, attempt + 1, sent)
+    finally:
+        update_pending_count(-1)
+
+def schedule_retry(doctype, name, attempt, sent):
+    """Hold a failed notification back for RETRY_DELAYS[attempt] seconds"""
+    retry = json.dumps({"doctype": doctype, "name": name, "attempt": attempt, "sent": sent}, sort_keys=True)
+    cache = frappe.cache()
+    cache.zadd(cache.make_key(RETRY_NOTIFICATIONS_KEY), {retry: time.time() + RETRY_DELAYS[attempt]})
+
+def enqueue_due_retries():
+    """Scheduler job (every minute): queue the notification retries that are due"""
+    cache = frappe.cache()
+    key = cache.make_key(RETRY_NOTIFICATIONS_KEY)
+    for retry in cache.zrangebyscore(key, 0, time.time()):
+        # zrem only succeeds for one scheduler, so each retry is queued once
+        if cache.zrem(key, retry):
+            retry = json.loads(frappe.safe_decode(retry))
+            enqueue_notification(retry["doctype"], retry["name"], retry["attempt"], retry["sent"])
+
+def increment_pending_count():
+    update_pending_count(1)
+
+def update_pending_count(delta):
+    cache = frappe.cache()
+    cache.incrby(cache.make_key(PENDING_NOTIFICATIONS_KEY), delta)
+
+@frappe.whitelist()
+@instrument
+def get_pending_notification_count():
+    """
+    Return the number of lesson and series notifications queued but not yet sent.
+    
+    Returns:
+        dict: pending count (retries waiting for their delay included), the
+            retries among them and the queue the jobs run on
+    """
+    frappe.only_for(["System Manager", "ESL Administrator"])
+    
+    cache = frappe.cache()
+    queued = frappe.utils.cint(frappe.safe_decode(cache.get(cache.make_key(PENDING_NOTIFICATIONS_KEY)) or 0))
+    retrying = cache.zcard(cache.make_key(RETRY_NOTIFICATIONS_KEY))
+    return {
+        "pending": max(queued, 0) + retrying,
+        "retrying": retrying,
+        "queue": get_notification_queue()
+    }
@@ -0,0 +1,52 @@
+# Run with: bench --site <site> run-tests --app olya_bootstrap
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from olya_bootstrap.api.calendar import get_lesson_calendar_data
+
+TEST_STUDENT = "_Test Calendar Student"
+TEST_TEACHER = "Administrator"
+
+# Far enough ahead that validate never sees them as past lessons
+LESSON_TIMES = ["2099-09-29 10:00:00", "2099-09-30 18:00:00", "2099-10-01 09:00:00"]
+
+class TestLessonCalendar(FrappeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if not frappe.db.exists("ESL Student", TEST_STUDENT):
+            frappe.get_doc({
+                "doctype": "ESL Student",
+                "student_name": TEST_STUDENT,
+                "email": "_test_calendar_student@example.com",
+                "teacher": TEST_TEACHER
+            }).insert()
+        
+        for scheduled_time in LESSON_TIMES:
+            frappe.get_doc({
+                "doctype": "ESL Lesson",
+                "title": "_Test Calendar Lesson",
+                "student": TEST_STUDENT,
+                "teacher": TEST_TEACHER,
+                "scheduled_time": scheduled_time,
+                "duration": 60
+            }).insert()
+    
+    def get_starts(self, **kwargs):
+        events = get_lesson_calendar_data(teacher=TEST_TEACHER, **kwargs)
+        return [event["start"] for event in events if event["extendedProps"]["student"] == TEST_STUDENT]
+    
+    def test_end_date_covers_the_whole_day(self):
+        starts = self.get_starts(start_date="2099-09-29", end_date="2099-09-30")
+        self.assertEqual(starts, ["2099-09-29T10:00:00", "2099-09-30T18:00:00"])
+    
+    def test_end_is_exclusive(self):
+        starts = self.get_starts(start="2099-09-29T00:00:00", end="2099-09-30T18:00:00")
+        self.assertEqual(starts, ["2099-09-29T10:00:00"])
+    
+    def test_calendar_window_is_one_query(self):
+        with self.assertQueryCount(1):
+            get_lesson_calendar_data(teacher=TEST_TEACHER, start="2099-09-01T00:00:00", end="2099-11-01T00:00:00")
+        with self.assertQueryCount(1):
+            get_lesson_calendar_data(student=TEST_STUDENT, start_date="2099-09-01", end_date="2099-10-31")